@@ -2,107 +2,364 @@
 """
 Demo script to analyze the extracted questions using the Question Analysis Service
 This script demonstrates how to use the service with the existing Qdrant collection
+
+Run without arguments for the interactive menu, or pass a subcommand
+(analyze, search, list, test, serve) to drive it non-interactively.
 """
 
 import os
 import sys
-from pathlib import Path
+import atexit
+import asyncio
+import threading
+import logging
+import logging.handlers
+import argparse
+import importlib
+import importlib.util
+import subprocess
+from functools import lru_cache
+
+logger = logging.getLogger('demo')
+
+# ASCII stand-ins for the emoji used in demo output, for terminals that cannot encode them
+EMOJI_FALLBACKS = {
+    '✅': '[OK]',
+    '❌': '[ERROR]',
+    '🔍': '[..]',
+    '🧪': '[TEST]',
+    '🚀': '[>>]',
+    '👋': '[BYE]',
+    '🎯': '[*]',
+    '💡': '[i]',
+}
+
+class _DemoFormatter(logging.Formatter):
+    """Plain message formatter that drops emoji when the output stream cannot encode them"""
+
+    def __init__(self, encoding: str):
+        super().__init__('%(message)s')
+        self.use_emoji = (encoding or '').lower().replace('-', '').startswith('utf')
+
+    def format(self, record):
+        message = super().format(record)
+        if not self.use_emoji:
+            for emoji, fallback in EMOJI_FALLBACKS.items():
+                message = message.replace(emoji, fallback)
+            message = message.encode('ascii', 'replace').decode('ascii')
+        return message
+
+def _setup_logging() -> logging.handlers.MemoryHandler:
+    """Send demo output through one buffered stdout handler"""
+    formatter = _DemoFormatter(getattr(sys.stdout, 'encoding', None))
+    if not formatter.use_emoji and hasattr(sys.stdout, 'reconfigure'):
+        # Service modules print emoji directly; replace them instead of crashing
+        sys.stdout.reconfigure(errors='replace')
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    # Buffer output and write it in one go whenever the demo waits or dispatches
+    buffer = logging.handlers.MemoryHandler(capacity=100, flushLevel=logging.ERROR, target=stream_handler)
+    logger.handlers[:] = [buffer]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return buffer
+
+def _flush():
+    """Write out any buffered demo output"""
+    for handler in logger.handlers:
+        handler.flush()
+
+@lru_cache(maxsize=None)
+def _service_dir():
+    """Locate the installed question_analysis_service package, or None if it is missing"""
+    spec = importlib.util.find_spec('question_analysis_service')
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return list(spec.submodule_search_locations)[0]
+
+@lru_cache(maxsize=None)
+def _load(name: str):
+    """Import a question_analysis_service submodule once and reuse it"""
+    # Service modules import their siblings by bare name, as in the container image
+    service_dir = _service_dir()
+    if service_dir not in sys.path:
+        sys.path.append(service_dir)
+    return importlib.import_module(f"question_analysis_service.{name}")
+
+# One event loop for the whole session, so async clients bound to it can be reused
+_LOOP = None
+
+# Processors created so far, keyed by kind ('analysis' or 'search')
+_PROCESSORS = {}
+
+def _close_session():
+    """Close shared async clients and the session event loop"""
+    if _LOOP is None or _LOOP.is_closed():
+        return
+    for processor in _PROCESSORS.values():
+        if processor is not None and processor.vector_store:
+            _LOOP.run_until_complete(processor.vector_store.aclose())
+    _LOOP.close()
+
+def _run(coro):
+    """Run a coroutine on the session event loop"""
+    global _LOOP
+    if _LOOP is None:
+        _LOOP = asyncio.new_event_loop()
+        asyncio.set_event_loop(_LOOP)
+        atexit.register(_close_session)
+    return _LOOP.run_until_complete(coro)
+
+# Held while a processor is being created, so a menu choice waits for an in-flight warmup
+_PROCESSOR_LOCK = threading.Lock()
+
+def _processor(kind: str):
+    """Get the shared processor of the given kind, creating it on first use"""
+    with _PROCESSOR_LOCK:
+        if _PROCESSORS.get(kind) is None:
+            example_usage = _load('example_usage')
+            factory = {
+                'analysis': example_usage._create_analysis_processor,
+                'search': example_usage._create_search_processor,
+            }[kind]
+            _PROCESSORS[kind] = factory()
+        return _PROCESSORS[kind]
+
+def _warmup():
+    """Create the shared processors so Qdrant and Vertex AI connections are ready before the first choice"""
+    for kind in ('search', 'analysis'):
+        try:
+            _processor(kind)
+        except Exception as e:
+            logger.debug(f"Warmup of {kind} processor failed: {str(e)}")
+
+def run_analyze(args):
+    """Analyze extracted questions from GCS"""
+    logger.info("\n🔍 Analyzing extracted questions from GCS...")
+    _flush()
+    try:
+        example_usage = _load('example_usage')
+        _run(example_usage.analyze_extracted_questions_async(
+            concurrency=args.concurrency, processor=_processor('analysis')
+        ))
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+
+def run_search(args):
+    """Search existing analysis results"""
+    query = (args.query or '').strip()
+    if not query:
+        return
+    try:
+        example_usage = _load('example_usage')
+        _run(example_usage.search_analysis_results_async(
+            query, limit=args.limit, chapter=args.chapter, processor=_processor('search')
+        ))
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+
+def run_list(args):
+    """List Qdrant collections"""
+    try:
+        _run(_load('example_usage').list_collections_async(processor=_processor('search')))
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+
+def run_tests(args):
+    """Run the service test suite"""
+    logger.info("\n🧪 Running test suite...")
+    _flush()
+    try:
+        if importlib.util.find_spec('pytest') is None:
+            # Without pytest, fall back to the sequential script runner
+            _load('test_service').main()
+            return
+
+        service_dir = _service_dir()
+        cmd = [sys.executable, '-m', 'pytest', os.path.join(service_dir, 'test_service.py'), '-rA']
+        if args.workers != '0' and importlib.util.find_spec('xdist') is not None:
+            cmd += ['-n', args.workers]
+
+        # Service modules import their siblings by bare name
+        pythonpath = os.pathsep.join(filter(None, [service_dir, os.environ.get('PYTHONPATH')]))
+        subprocess.run(cmd, env={**os.environ, 'PYTHONPATH': pythonpath})
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+
+def _serve_production(args):
+    """Serve the Flask app under gunicorn with threaded workers"""
+    subprocess.run([
+        sys.executable, '-m', 'gunicorn',
+        '--workers', str(args.workers),
+        '--worker-class', 'gthread',
+        '--threads', str(args.threads),
+        '--timeout', '0',
+        '--bind', f"{args.host}:{args.port}",
+        # Service modules import their siblings by bare name
+        '--pythonpath', _service_dir(),
+        'question_analysis_service.main:app'
+    ], check=True)
+
+def run_serve(args):
+    """Start the service locally"""
+    logger.info(
+        "\n🚀 Starting service locally...\n"
+        f"   Service will be available at: http://localhost:{args.port}\n"
+        "   Press Ctrl+C to stop"
+    )
+    _flush()
+    try:
+        if args.dev:
+            app = _load('main').app
+            app.run(host=args.host, port=args.port, debug=True)
+        else:
+            _serve_production(args)
+    except KeyboardInterrupt:
+        logger.info("\n👋 Service stopped")
+    except Exception as e:
+        logger.error(f"❌ Error: {str(e)}")
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line parser"""
+    parser = argparse.ArgumentParser(
+        prog='analyze_questions_demo',
+        description='Question Analysis Service Demo'
+    )
+    subparsers = parser.add_subparsers(dest='cmd', help='Available commands')
+
+    analyze_parser = subparsers.add_parser('analyze', help='Analyze extracted questions from GCS')
+    analyze_parser.add_argument('--concurrency', type=int, default=16,
+                                help='Maximum number of files analyzed at the same time (default: 16)')
+    analyze_parser.set_defaults(func=run_analyze)
+
+    search_parser = subparsers.add_parser('search', help='Search existing analysis results')
+    search_parser.add_argument('--query', required=True, help='Search query')
+    search_parser.add_argument('--limit', type=int, default=5, help='Maximum number of results (default: 5)')
+    search_parser.add_argument('--chapter', type=int, help='Only return content from this chapter')
+    search_parser.set_defaults(func=run_search)
 
-# Add current directory to path
-sys.path.append(str(Path(__file__).parent))
+    list_parser = subparsers.add_parser('list', help='List Qdrant collections')
+    list_parser.set_defaults(func=run_list)
 
-def main():
+    test_parser = subparsers.add_parser('test', help='Run test suite')
+    test_parser.add_argument('--workers', default='auto',
+                             help="pytest-xdist worker count, or 0 to run serially (default: auto)")
+    test_parser.set_defaults(func=run_tests)
+
+    serve_parser = subparsers.add_parser('serve', help='Start the service locally')
+    serve_parser.add_argument('--host', default='0.0.0.0', help='Host to bind (default: 0.0.0.0)')
+    serve_parser.add_argument('--port', type=int, default=8080, help='Port to bind (default: 8080)')
+    serve_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                              help='Number of gunicorn worker processes (default: CPU count)')
+    serve_parser.add_argument('--threads', type=int, default=16,
+                              help='Threads per gunicorn worker (default: 16)')
+    serve_parser.add_argument('--dev', action='store_true',
+                              help='Use the Flask development server with debug and reload enabled')
+    serve_parser.set_defaults(func=run_serve)
+
+    return parser
+
+# Environment variables the demo cannot run without
+REQUIRED_ENV_VARS = frozenset({'GEMINI_API_KEY', 'QDRANT_API_KEY'})
+
+# Optional environment variables and the defaults used for the demo
+OPTIONAL_ENV_DEFAULTS = {
+    'GCP_PROJECT_ID': 'book-qc-cf',
+    'BUCKET_NAME': 'book-qc-cf-pdf-storage',
+    'QDRANT_URL': 'https://9becb4cf-82b6-456f-ae0c-d797c6c946cc.us-east4-0.gcp.cloud.qdrant.io',
+}
+
+# Interactive menu choice -> (subcommand, description)
+DISPATCH = {
+    '1': ('analyze', 'Analyze extracted questions from GCS'),
+    '2': ('search', 'Search existing analysis results'),
+    '3': ('list', 'List Qdrant collections'),
+    '4': ('test', 'Run test suite'),
+    '5': ('serve', 'Start the service locally'),
+}
+
+def prompt_for_args(parser: argparse.ArgumentParser):
+    """Show the interactive menu and translate the choice into parsed arguments, or None to quit"""
+    options = "\n".join(f"{key}. {description}" for key, (_, description) in DISPATCH.items())
+
+    while True:
+        logger.info(f"\n🎯 Available options:\n{options}\nq. Quit")
+        _flush()
+
+        choice = input("\nSelect an option (1-5, q to quit): ").strip().lower()
+
+        if choice in ('q', 'quit', 'exit'):
+            return None
+
+        if choice in DISPATCH:
+            break
+
+        logger.error("❌ Invalid choice. Please select 1-5.")
+
+    cmd = DISPATCH[choice][0]
+    if cmd == 'search':
+        query = input("Enter search query: ").strip()
+        return parser.parse_args([cmd, '--query', query])
+    return parser.parse_args([cmd])
+
+def main(argv=None):
     """Main demo function"""
-    print("🚀 Question Analysis Service Demo")
-    print("=" * 50)
-    
-    # Check if we're in the right directory
-    if not Path("question_analysis_service").exists():
-        print("❌ Please run this script from the project root directory")
-        print("   The question_analysis_service folder should be in the current directory")
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser = build_parser()
+    args = parser.parse_args(argv) if argv else None
+
+    _setup_logging()
+    logger.info("🚀 Question Analysis Service Demo\n" + "=" * 50)
+
+    # Check that the service package is importable
+    if _service_dir() is None:
+        logger.error(
+            "❌ The question_analysis_service package could not be found\n"
+            "   Install the project (pip install -e .) or run this script from the project root directory"
+        )
         return
-    
+
     # Check environment variables
-    print("🔍 Checking environment...")
-    required_vars = ['GEMINI_API_KEY', 'QDRANT_API_KEY']
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
+    logger.info("🔍 Checking environment...")
+    missing_vars = sorted(var for var in REQUIRED_ENV_VARS if not os.environ.get(var))
+
     if missing_vars:
-        print(f"❌ Missing required environment variables: {', '.join(missing_vars)}")
-        print("\n💡 Please set the following environment variables:")
-        for var in missing_vars:
-            print(f"   export {var}=your_api_key_here")
+        exports = "\n".join(f"   export {var}=your_api_key_here" for var in missing_vars)
+        logger.error(
+            f"❌ Missing required environment variables: {', '.join(missing_vars)}\n"
+            f"\n💡 Please set the following environment variables:\n{exports}"
+        )
         return
-    
-    print("✅ All required environment variables are set")
-    
+
     # Set default values for optional variables
-    os.environ.setdefault('GCP_PROJECT_ID', 'book-qc-cf')
-    os.environ.setdefault('BUCKET_NAME', 'book-qc-cf-pdf-storage')
-    os.environ.setdefault('QDRANT_URL', 'https://9becb4cf-82b6-456f-ae0c-d797c6c946cc.us-east4-0.gcp.cloud.qdrant.io')
-    
-    print(f"   GCP_PROJECT_ID: {os.getenv('GCP_PROJECT_ID')}")
-    print(f"   BUCKET_NAME: {os.getenv('BUCKET_NAME')}")
-    print(f"   QDRANT_URL: {os.getenv('QDRANT_URL')}")
-    
-    print("\n🎯 Available options:")
-    print("1. Analyze extracted questions from GCS")
-    print("2. Search existing analysis results")
-    print("3. List Qdrant collections")
-    print("4. Run test suite")
-    print("5. Start the service locally")
-    
-    choice = input("\nSelect an option (1-5): ").strip()
-    
-    if choice == '1':
-        print("\n🔍 Analyzing extracted questions from GCS...")
-        try:
-            from question_analysis_service.example_usage import analyze_extracted_questions
-            analyze_extracted_questions()
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-    
-    elif choice == '2':
-        query = input("Enter search query: ").strip()
-        if query:
-            try:
-                from question_analysis_service.example_usage import search_analysis_results
-                search_analysis_results(query)
-            except Exception as e:
-                print(f"❌ Error: {str(e)}")
-    
-    elif choice == '3':
-        try:
-            from question_analysis_service.example_usage import list_collections
-            list_collections()
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-    
-    elif choice == '4':
-        print("\n🧪 Running test suite...")
-        try:
-            from question_analysis_service.test_service import main as run_tests
-            run_tests()
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-    
-    elif choice == '5':
-        print("\n🚀 Starting service locally...")
-        print("   Service will be available at: http://localhost:8080")
-        print("   Press Ctrl+C to stop")
-        try:
-            from question_analysis_service.main import app
-            app.run(host='0.0.0.0', port=8080, debug=True)
-        except KeyboardInterrupt:
-            print("\n👋 Service stopped")
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-    
+    defaults = "\n".join(
+        f"   {var}: {os.environ.setdefault(var, default)}" for var, default in OPTIONAL_ENV_DEFAULTS.items()
+    )
+    logger.info(f"✅ All required environment variables are set\n{defaults}")
+
+    if args is not None:
+        _flush()
+        args.func(args)
     else:
-        print("❌ Invalid choice. Please select 1-5.")
-    
-    print("\n💡 For more options, use the CLI directly:")
-    print("   python question_analysis_service/cli_main.py --help")
+        # No subcommand given: connect in the background while the user reads the menu
+        threading.Thread(target=_warmup, name='demo-warmup', daemon=True).start()
+
+        # Keep offering the menu until the user quits
+        try:
+            while (args := prompt_for_args(parser)) is not None:
+                args.func(args)
+        except (EOFError, KeyboardInterrupt):
+            logger.info("\n👋 Bye")
+
+    logger.info(
+        "\n💡 For more options, use the CLI directly:\n"
+        "   python question_analysis_service/cli_main.py --help"
+    )
+    _flush()
 
 if __name__ == '__main__':
     main()
@@ -7,19 +7,25 @@ Replaces the Flask web server for Cloud Run Jobs
 
 import os
 import sys
-import json
+import orjson
+import asyncio
 import argparse
-import tempfile
 import logging
-from typing import Dict, Any, Optional
+import threading
+import time
+import posixpath
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, List, Callable, Tuple
 
 # Import our modules
 from vertex.extractor import VertexAIPDFExtractor
+from vertex.adaptive_semaphore import AdaptiveSemaphore
 from vertex.subject_mapper import SubjectExtractorFactory
 
 # Add parent directory to path for utils import
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.gcp.bucket_manager import BucketManager
+from utils.gcp.bucket_manager import BucketManager, DOCUMENT_FORMATS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -30,148 +36,328 @@ PROJECT_ID = os.getenv('GOOGLE_CLOUD_PROJECT', 'book-qc-cf')
 BUCKET_NAME = os.getenv('BUCKET_NAME', 'book-qc-cf-pdf-storage')
 VERTEX_AI_LOCATION = os.getenv('VERTEX_AI_LOCATION', 'us-central1')
 
+# Number of PDFs processed at the same time in folder operations (CONCURRENCY takes precedence)
+DEFAULT_WORKERS = int(os.getenv('CONCURRENCY', os.getenv('EXTRACTION_WORKERS', '8')))
+
+# Storage format of extraction results ('json', 'msgpack' or 'ndjson'); --format overrides it
+OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'json')
+if OUTPUT_FORMAT not in DOCUMENT_FORMATS:
+    logger.warning("Unknown OUTPUT_FORMAT %r (expected one of %s), using json",
+                   OUTPUT_FORMAT, ', '.join(sorted(DOCUMENT_FORMATS)))
+    OUTPUT_FORMAT = 'json'
+
+# Bounds on concurrent Gemini calls; the limit adapts between them as Vertex AI throttles
+VERTEX_CONCURRENCY = int(os.getenv('VERTEX_CONCURRENCY', '8'))
+VERTEX_MAX_CONCURRENCY = int(os.getenv('VERTEX_MAX_CONCURRENCY', '32'))
+
+# Folder operations log one progress line per this many finished files; per-file detail is DEBUG
+PROGRESS_LOG_INTERVAL = int(os.getenv('PROGRESS_LOG_INTERVAL', '50'))
+
+# Seconds a folder listing is reused before GCS is listed again
+LIST_CACHE_TTL = float(os.getenv('LIST_CACHE_TTL', '60'))
+
 # Initialize services
-bucket_manager = BucketManager(PROJECT_ID, BUCKET_NAME)
+# Both book subfolders can run at once, each with DEFAULT_WORKERS threads on the shared client
+bucket_manager = BucketManager(PROJECT_ID, BUCKET_NAME, pool_size=max(2 * DEFAULT_WORKERS, 32))
+extractor_factory = SubjectExtractorFactory()
+
+# The Vertex AI extractor is created once and shared by all worker threads
+_vertex_extractor = None
+_vertex_extractor_lock = threading.Lock()
+
+def get_vertex_extractor() -> VertexAIPDFExtractor:
+    """Get the shared Vertex AI extractor, initializing Vertex AI on first use"""
+    global _vertex_extractor
+    if _vertex_extractor is None:
+        with _vertex_extractor_lock:
+            if _vertex_extractor is None:
+                limiter = AdaptiveSemaphore(initial=VERTEX_CONCURRENCY, maximum=VERTEX_MAX_CONCURRENCY)
+                _vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION, limiter)
+    return _vertex_extractor
+
+@lru_cache(maxsize=None)
+def get_subject_extractor(subject: str):
+    """Get the cached subject-specific extractor"""
+    return extractor_factory.get_extractor(subject)
+
+# folder_path -> (expires_at, pdf_files)
+_pdf_listing_cache: Dict[str, Tuple[float, List[str]]] = {}
+_pdf_listing_lock = threading.Lock()
+
+def list_pdf_files(folder_path: str) -> List[str]:
+    """
+    List the PDF files in a folder (recursively), reusing recent listings
+    
+    Listings are kept for LIST_CACHE_TTL seconds so retries and repeated runs against
+    the same book don't pay for another LIST call. Empty listings are not cached.
+    
+    Args:
+        folder_path: Folder path in the bucket or full GCS path
+        
+    Returns:
+        List[str]: Relative GCS paths of the PDF files
+    """
+    now = time.monotonic()
+    with _pdf_listing_lock:
+        cached = _pdf_listing_cache.get(folder_path)
+        if cached and cached[0] > now:
+            return list(cached[1])
+    
+    pdf_files = bucket_manager.list_files_in_folder(folder_path, ".pdf", return_full_paths=False)
+    
+    if pdf_files:
+        with _pdf_listing_lock:
+            _pdf_listing_cache[folder_path] = (now + LIST_CACHE_TTL, pdf_files)
+    return list(pdf_files)
+
+GS_PREFIX = 'gs://'
 
 def extract_filename_from_gcs_path(gcs_path: str) -> str:
     """Extract filename from GCS path"""
-    if gcs_path.startswith('gs://'):
-        # Remove gs://bucket-name/ prefix to get the relative path
-        parts = gcs_path.split('/', 3)
-        if len(parts) >= 4:
-            return parts[3]  # Return the relative path (e.g., question_papers/SQP-2.pdf)
-        return gcs_path.split('/')[-1]  # Fallback to just filename
+    if gcs_path.startswith(GS_PREFIX):
+        # Slice off gs://bucket-name/ to get the relative path (e.g., question_papers/SQP-2.pdf)
+        i = gcs_path.find('/', len(GS_PREFIX))
+        return gcs_path[i + 1:] if i != -1 else gcs_path[len(GS_PREFIX):]
     return gcs_path
 
-def process_question_paper(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Process question paper PDF and extract questions"""
+def strip_pdf_extension(path: str) -> str:
+    """Remove a trailing .pdf extension (any case) without touching the rest of the path"""
+    return path[:-4] if path.lower().endswith('.pdf') else path
+
+async def gather_files(pdf_files: List[str], process_one: Callable[[str], Dict[str, Any]],
+                       concurrency: int, label: str) -> Tuple[List[Dict[str, Any]], int, int]:
+    """
+    Fan the PDF files out on the event loop, bounded by a semaphore
+    
+    The GCS and Vertex AI clients are blocking, so each file runs in an executor
+    thread; the semaphore decides how many are in flight at once.
+    
+    Args:
+        pdf_files: Relative GCS paths of the PDF files
+        process_one: Function processing a single PDF file and returning its result dict
+        concurrency: Maximum number of files processed at the same time
+        label: Description of the files used in log messages
+        
+    Returns:
+        Tuple of (results in the order of pdf_files, successful count, failed count)
+    """
+    concurrency = max(1, concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    total = len(pdf_files)
+    # Only touched from the event loop thread, so no lock is needed
+    finished = 0
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        async def _run_one(pdf_file: str) -> Dict[str, Any]:
+            nonlocal finished
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(executor, process_one, pdf_file)
+                finally:
+                    finished += 1
+                    if finished % PROGRESS_LOG_INTERVAL == 0 or finished == total:
+                        logger.info("Processed %d/%d %s files", finished, total, label)
+        
+        outcomes = await asyncio.gather(*(_run_one(pdf_file) for pdf_file in pdf_files), return_exceptions=True)
+    
+    results: List[Dict[str, Any]] = []
+    for pdf_file, outcome in zip(pdf_files, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error("Failed to process %s %s: %s", label, pdf_file, outcome)
+            outcome = {
+                'pdf_file': pdf_file,
+                'status': 'error',
+                'error': str(outcome)
+            }
+        else:
+            logger.debug("Successfully processed %s: %s", label, pdf_file)
+        results.append(outcome)
+    
+    successful_extractions = sum(1 for result in results if result['status'] == 'success')
+    return results, successful_extractions, len(results) - successful_extractions
+
+def process_files_concurrently(pdf_files: List[str], process_one: Callable[[str], Dict[str, Any]],
+                               max_workers: int, label: str) -> Tuple[List[Dict[str, Any]], int, int]:
+    """Run gather_files from synchronous code (see gather_files for the arguments)"""
+    return asyncio.run(gather_files(pdf_files, process_one, max_workers, label))
+
+def skip_existing_outputs(pdf_files: List[str], output_paths: Dict[str, str],
+                          output_folder: str) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """
+    Split off the PDFs whose extraction JSON is already in the bucket
+    
+    One listing of the output folder replaces a HEAD request per file.
+    
+    Args:
+        pdf_files: Relative GCS paths of the PDF files
+        output_paths: Expected output path for each PDF file
+        output_folder: Folder holding the output paths
+        
+    Returns:
+        Tuple of (PDF files still to extract, 'skipped' results for the others)
+    """
+    extension = DOCUMENT_FORMATS[OUTPUT_FORMAT][0]
+    existing = set(bucket_manager.list_files_in_folder(output_folder, extension, return_full_paths=False))
+    
+    pending, skipped = [], []
+    for pdf_file in pdf_files:
+        if output_paths[pdf_file] in existing:
+            skipped.append({
+                'pdf_file': pdf_file,
+                'status': 'skipped',
+                'output_path': output_paths[pdf_file]
+            })
+        else:
+            pending.append(pdf_file)
+    
+    if skipped:
+        logger.info(f"Skipping {len(skipped)} PDFs already extracted to {output_folder} (use --force to re-extract)")
+    return pending, skipped
+
+def merge_skipped_results(pdf_files: List[str], results: List[Dict[str, Any]],
+                          skipped: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Combine extraction and skipped results back into the order of pdf_files"""
+    by_file = {r['pdf_file']: r for r in skipped + results}
+    return [by_file[pdf_file] for pdf_file in pdf_files]
+
+# Per-kind settings shared by the single-file and folder flows
+EXTRACTION_KINDS = {
+    'questions': {
+        'label': 'question paper',
+        'get_config': lambda subject_extractor: subject_extractor.get_question_config(),
+        'count_key': 'question',
+    },
+    'answers': {
+        'label': 'answer key',
+        'get_config': lambda subject_extractor: subject_extractor.get_answer_config(),
+        'count_key': 'answer',
+    },
+}
+
+def process_pdf(kind: str, pdf_gcs_path: str, subject: str = "computer_applications",
+                output_path: Optional[str] = None, pdf_bytes: Optional[bytes] = None,
+                upload_result: bool = True) -> Dict[str, Any]:
+    """
+    Extract questions or answers from a single PDF
+    
+    Args:
+        kind: 'questions' or 'answers'
+        pdf_gcs_path: GCS path to the PDF
+        subject: Subject for extraction
+        output_path: GCS path for the extracted JSON; defaults to extractions/<kind>/<pdf name>_<kind>.json
+            (.msgpack or .ndjson when OUTPUT_FORMAT selects that format)
+        pdf_bytes: PDF contents if already downloaded
+        upload_result: Upload the JSON here; if False it is returned under 'result' for the caller to upload
+        
+    Returns:
+        Dict[str, Any]: Extraction summary with a 'status' key
+    """
+    settings = EXTRACTION_KINDS[kind]
+    label = settings['label']
+    count_key = settings['count_key']
+    
     try:
         # Extract filename from GCS path
         pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
-        logger.info(f"Processing question paper: {pdf_filename}")
-        
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor
-            extractor_factory = SubjectExtractorFactory()
-            subject_extractor = extractor_factory.get_extractor(subject)
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Get question extraction config
-            question_config = subject_extractor.get_question_config()
-            
-            # Extract questions
-            logger.info(f"Starting question extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, question_config, subject_extractor)
-            
-            if not result:
-                raise Exception("Question extraction failed")
-            
-            # Upload result to GCS
-            output_filename = f"extractions/questions/{pdf_filename.replace('.pdf', '_questions.json')}"
-            if not bucket_manager.upload_json(result, output_filename):
-                raise Exception(f"Failed to upload questions to GCS: {output_filename}")
-            
-            return {
+        logger.debug("Processing %s: %s", label, pdf_filename)
+        
+        # Download PDF from GCS into memory unless the caller already staged it
+        if pdf_bytes is None:
+            pdf_bytes = bucket_manager.download_bytes(pdf_filename)
+        if pdf_bytes is None:
+            raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
+        
+        # Get subject-specific extractor and config, and the shared Vertex AI extractor
+        subject_extractor = get_subject_extractor(subject)
+        config = settings['get_config'](subject_extractor)
+        vertex_extractor = get_vertex_extractor()
+        
+        # Extract content
+        logger.debug("Starting %s extraction for: %s", count_key, pdf_filename)
+        result = vertex_extractor.process_pdf(pdf_bytes, config, subject_extractor)
+        
+        if not result:
+            raise Exception(f"{count_key.capitalize()} extraction failed")
+        
+        if output_path is None:
+            # Default location used by the single-file operations
+            output_filename = f"extractions/{kind}/{strip_pdf_extension(pdf_filename)}_{kind}{DOCUMENT_FORMATS[OUTPUT_FORMAT][0]}"
+            response = {
                 'status': 'success',
-                'extraction_type': 'questions',
+                'extraction_type': kind,
                 'subject': subject,
                 'extraction_gcs_path': f"gs://{BUCKET_NAME}/{output_filename}",
                 'pdf_path': pdf_gcs_path,
-                'total_questions': len(result.get('questions', [])),
+                f'total_{kind}': len(result.get(kind, [])),
                 'document_info': result.get('document_info', {})
             }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-                
-    except Exception as e:
-        logger.error(f"Error processing question paper: {str(e)}")
-        return {
-            'status': 'error',
-            'error': str(e),
-            'pdf_path': pdf_gcs_path
-        }
-
-def process_answer_key(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Process answer key PDF and extract answers"""
-    try:
-        # Extract filename from GCS path
-        pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
-        logger.info(f"Processing answer key: {pdf_filename}")
-        
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor
-            extractor_factory = SubjectExtractorFactory()
-            subject_extractor = extractor_factory.get_extractor(subject)
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Get answer extraction config
-            answer_config = subject_extractor.get_answer_config()
-            
-            # Extract answers
-            logger.info(f"Starting answer extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, answer_config, subject_extractor)
-            
-            if not result:
-                raise Exception("Answer extraction failed")
-            
-            # Upload result to GCS
-            output_filename = f"extractions/answers/{pdf_filename.replace('.pdf', '_answers.json')}"
-            if not bucket_manager.upload_json(result, output_filename):
-                raise Exception(f"Failed to upload answers to GCS: {output_filename}")
-            
-            return {
+        else:
+            output_filename = output_path
+            response = {
                 'status': 'success',
-                'extraction_type': 'answers',
-                'subject': subject,
-                'extraction_gcs_path': f"gs://{BUCKET_NAME}/{output_filename}",
+                'message': f'{kind.capitalize()} extracted successfully',
                 'pdf_path': pdf_gcs_path,
-                'total_answers': len(result.get('answers', [])),
+                'subject': subject,
+                'output_path': output_path,
+                f'{count_key}_count': len(result.get(kind, [])),
                 'document_info': result.get('document_info', {})
             }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-                
+        
+        # Save the result, or hand it back for a batched upload
+        if upload_result:
+            if not bucket_manager.upload_json(result, output_filename, fmt=OUTPUT_FORMAT):
+                raise Exception(f"Failed to upload {kind} to GCS: {output_filename}")
+        else:
+            response['result'] = result
+        
+        return response
+        
     except Exception as e:
-        logger.error(f"Error processing answer key: {str(e)}")
+        logger.error("Error processing %s %s: %s", label, pdf_gcs_path, e)
         return {
             'status': 'error',
             'error': str(e),
             'pdf_path': pdf_gcs_path
         }
 
-def process_folder_questions(folder_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Extract questions from all PDFs in a folder"""
+def process_question_paper(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
+    """Process question paper PDF and extract questions"""
+    return process_pdf('questions', pdf_gcs_path, subject)
+
+def process_answer_key(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
+    """Process answer key PDF and extract answers"""
+    return process_pdf('answers', pdf_gcs_path, subject)
+
+def process_question_paper_with_output(pdf_path: str, subject: str, output_path: str,
+                                       pdf_bytes: Optional[bytes] = None, upload_result: bool = True) -> Dict[str, Any]:
+    """Process question paper and save to specific output path (see process_pdf)"""
+    return process_pdf('questions', pdf_path, subject, output_path, pdf_bytes, upload_result)
+
+def process_answer_key_with_output(pdf_path: str, subject: str, output_path: str,
+                                   pdf_bytes: Optional[bytes] = None, upload_result: bool = True) -> Dict[str, Any]:
+    """Process answer key and save to specific output path (see process_pdf)"""
+    return process_pdf('answers', pdf_path, subject, output_path, pdf_bytes, upload_result)
+
+async def process_folder(kind: str, folder_path: str, subject: str = "computer_applications",
+                         max_workers: int = DEFAULT_WORKERS, force: bool = False) -> Dict[str, Any]:
+    """
+    Extract questions or answers from all PDFs in a folder
+    
+    Args:
+        kind: 'questions' or 'answers'
+        folder_path: Folder holding the PDF files
+        subject: Subject used to pick the extractor
+        max_workers: Maximum number of files processed at the same time
+        force: Re-extract PDFs whose output JSON already exists
+    """
+    label = EXTRACTION_KINDS[kind]['label']
+    
     try:
-        logger.info(f"Starting folder extraction: {folder_path}, subject: {subject}")
+        logger.info(f"Starting folder {label} extraction: {folder_path}, subject: {subject}")
         
         # List all PDF files in the folder
-        pdf_files = bucket_manager.list_files_in_folder(folder_path, ".pdf", return_full_paths=False)
+        pdf_files = list_pdf_files(folder_path)
         
         if not pdf_files:
             return {
@@ -179,35 +365,26 @@ def process_folder_questions(folder_path: str, subject: str = "computer_applicat
                 'message': f'No PDF files found in folder: {folder_path}'
             }
         
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
-        
-        for pdf_file in pdf_files:
-            logger.info(f"Processing {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Process the PDF
-                result = process_question_paper(pdf_gcs_path, subject)
-                result['pdf_file'] = pdf_file
-                results.append(result)
-                if result['status'] == 'success':
-                    successful_extractions += 1
-                else:
-                    failed_extractions += 1
-                logger.info(f"Successfully processed {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
+        # Leave out PDFs already extracted to their default location
+        pending, skipped = pdf_files, []
+        if not force:
+            extension = DOCUMENT_FORMATS[OUTPUT_FORMAT][0]
+            output_paths = {
+                pdf_file: f"extractions/{kind}/{strip_pdf_extension(pdf_file)}_{kind}{extension}" for pdf_file in pdf_files
+            }
+            output_folder = f"extractions/{kind}/{extract_filename_from_gcs_path(folder_path).strip('/')}"
+            pending, skipped = skip_existing_outputs(pdf_files, output_paths, output_folder)
+        
+        def _process_one(pdf_file: str) -> Dict[str, Any]:
+            logger.debug("Processing %s", pdf_file)
+            result = process_pdf(kind, f"gs://{BUCKET_NAME}/{pdf_file}", subject)
+            result['pdf_file'] = pdf_file
+            return result
+        
+        # Process the PDF files concurrently
+        results, successful_extractions, failed_extractions = await gather_files(
+            pending, _process_one, max_workers, label
+        )
         
         return {
             'status': 'success',
@@ -216,24 +393,39 @@ def process_folder_questions(folder_path: str, subject: str = "computer_applicat
             'total_files': len(pdf_files),
             'successful_extractions': successful_extractions,
             'failed_extractions': failed_extractions,
-            'results': results
+            'skipped_extractions': len(skipped),
+            'results': merge_skipped_results(pdf_files, results, skipped)
         }
         
     except Exception as e:
-        logger.error(f"Error in folder extraction: {str(e)}")
+        logger.error(f"Error in folder {label} extraction: {str(e)}")
         return {
             'status': 'error',
             'error': str(e),
             'folder_path': folder_path
         }
 
-def process_folder_answers(folder_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Extract answers from all PDFs in a folder"""
+def process_folder_with_output(kind: str, folder_path: str, subject: str, output_folder: str,
+                               max_workers: int = DEFAULT_WORKERS,
+                               pdf_files: Optional[List[str]] = None, force: bool = False) -> Dict[str, Any]:
+    """
+    Extract questions or answers from all PDFs in a folder and save to specific output folder
+    
+    Args:
+        kind: 'questions' or 'answers'
+        folder_path: Folder holding the PDF files
+        subject: Subject used to pick the extractor
+        output_folder: Folder the extracted JSON files are written to
+        max_workers: Maximum number of files processed at the same time
+        pdf_files: Already listed PDF files of the folder; listed here when omitted
+        force: Re-extract PDFs whose output JSON already exists
+    """
+    label = EXTRACTION_KINDS[kind]['label']
+    
     try:
-        logger.info(f"Starting folder answer extraction: {folder_path}, subject: {subject}")
-        
-        # List all PDF files in the folder
-        pdf_files = bucket_manager.list_files_in_folder(folder_path, ".pdf", return_full_paths=False)
+        # Get list of PDF files unless the caller already has it
+        if pdf_files is None:
+            pdf_files = list_pdf_files(folder_path)
         
         if not pdf_files:
             return {
@@ -241,66 +433,99 @@ def process_folder_answers(folder_path: str, subject: str = "computer_applicatio
                 'message': f'No PDF files found in folder: {folder_path}'
             }
         
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
-        
-        for pdf_file in pdf_files:
-            logger.info(f"Processing {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Process the PDF
-                result = process_answer_key(pdf_gcs_path, subject)
-                result['pdf_file'] = pdf_file
-                results.append(result)
-                if result['status'] == 'success':
-                    successful_extractions += 1
-                else:
-                    failed_extractions += 1
-                logger.info(f"Successfully processed {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
+        # Extract filename without extension for output naming
+        extension = DOCUMENT_FORMATS[OUTPUT_FORMAT][0]
+        output_paths = {
+            pdf_file: f"{output_folder}/{strip_pdf_extension(posixpath.basename(pdf_file))}_{kind}{extension}"
+            for pdf_file in pdf_files
+        }
+        
+        # Leave out PDFs whose output already exists
+        pending, skipped = pdf_files, []
+        if not force:
+            pending, skipped = skip_existing_outputs(pdf_files, output_paths, output_folder)
+        
+        # Downloads run ahead of extraction on their own threads: taking PDF i for extraction
+        # queues the download of PDF i + prefetch_depth, so fetching overlaps extraction while
+        # at most prefetch_depth downloaded PDFs wait in memory
+        prefetch_depth = max(1, max_workers)
+        prefetched: Dict[str, Future] = {}
+        started: set = set()
+        prefetch_lock = threading.Lock()
+        next_prefetch = 0
+        
+        def _prefetch_next() -> None:
+            nonlocal next_prefetch
+            with prefetch_lock:
+                # PDFs extraction already started on (without a download) are passed over
+                while next_prefetch < len(pending) and pending[next_prefetch] in started:
+                    next_prefetch += 1
+                if next_prefetch < len(pending):
+                    pdf_file = pending[next_prefetch]
+                    next_prefetch += 1
+                    prefetched[pdf_file] = download_executor.submit(bucket_manager.download_bytes, pdf_file)
+        
+        def _process_one(pdf_file: str) -> Dict[str, Any]:
+            output_path = output_paths[pdf_file]
+            
+            with prefetch_lock:
+                started.add(pdf_file)
+                download = prefetched.pop(pdf_file, None)
+            # A PDF whose download was never queued is fetched by process_pdf itself
+            pdf_bytes = download.result() if download is not None else None
+            _prefetch_next()
+            
+            # Process the PDF with custom output path; the JSON is uploaded as soon as it is extracted
+            result = process_pdf(kind, f"gs://{BUCKET_NAME}/{pdf_file}", subject, output_path,
+                                 pdf_bytes=pdf_bytes)
+            result['pdf_file'] = pdf_file
+            result['output_path'] = output_path
+            return result
+        
+        # One pool, fed continuously, extracts the PDFs
+        with ThreadPoolExecutor(max_workers=prefetch_depth, thread_name_prefix='pdf-prefetch') as download_executor:
+            for _ in range(prefetch_depth):
+                _prefetch_next()
+            results, _, _ = process_files_concurrently(pending, _process_one, max_workers, label)
+        
+        successful_extractions = sum(1 for r in results if r['status'] == 'success')
+        failed_extractions = len(results) - successful_extractions
+        results = merge_skipped_results(pdf_files, results, skipped)
         
         return {
             'status': 'success',
             'folder_path': folder_path,
+            'output_folder': output_folder,
             'subject': subject,
             'total_files': len(pdf_files),
             'successful_extractions': successful_extractions,
             'failed_extractions': failed_extractions,
+            'skipped_extractions': len(skipped),
             'results': results
         }
         
     except Exception as e:
-        logger.error(f"Error in folder answer extraction: {str(e)}")
+        logger.error(f"Error in folder {label} extraction with output: {str(e)}")
         return {
             'status': 'error',
             'error': str(e),
             'folder_path': folder_path
         }
 
-def process_book_folder_complete(folder_path: str, subject: str = 'computer_applications') -> Dict[str, Any]:
+def process_book_folder_complete(folder_path: str, subject: str = 'computer_applications',
+                                  max_workers: int = DEFAULT_WORKERS, force: bool = False) -> Dict[str, Any]:
     """
     Process complete book folder structure:
     - Process all PDFs in question_papers/ subfolder -> save to extracted_questions/
     - Process all PDFs in answer_keys/ subfolder -> save to extracted_answers/
+    
+    PDFs that already have their output JSON are skipped unless force is set.
     """
     try:
         logger.info(f"Starting complete book folder processing for: {folder_path}")
         
         # Ensure folder_path doesn't start with gs://
-        if folder_path.startswith('gs://'):
-            folder_path = folder_path.replace(f'gs://{BUCKET_NAME}/', '')
+        folder_path = folder_path.removeprefix(f'gs://{BUCKET_NAME}/')
         
         # Define subfolder paths
         question_papers_path = f"{folder_path}/question_papers"
@@ -317,37 +542,60 @@ def process_book_folder_complete(folder_path: str, subject: str = 'computer_appl
         
         results = {}
         
-        # Process question papers
-        try:
-            questions_result = process_folder_questions_with_output(question_papers_path, subject, extracted_questions_path)
-            results['questions'] = questions_result
-            logger.info(f"Question processing completed: {questions_result.get('successful_extractions', 0)} successful")
-        except Exception as e:
-            logger.error(f"Failed to process question papers: {str(e)}")
-            results['questions'] = {
-                'status': 'error',
-                'error': str(e),
-                'folder_path': question_papers_path
-            }
+        # One listing of the book folder covers both subfolders
+        book_pdfs = list_pdf_files(folder_path)
+        subfolders = {
+            'questions': (question_papers_path, extracted_questions_path),
+            'answers': (answer_keys_path, extracted_answers_path),
+        }
+        pdfs_by_kind = {
+            kind: [f for f in book_pdfs if f.startswith(f"{source}/")]
+            for kind, (source, _) in subfolders.items()
+        }
         
-        # Process answer keys
-        try:
-            answers_result = process_folder_answers_with_output(answer_keys_path, subject, extracted_answers_path)
-            results['answers'] = answers_result
-            logger.info(f"Answer processing completed: {answers_result.get('successful_extractions', 0)} successful")
-        except Exception as e:
-            logger.error(f"Failed to process answer keys: {str(e)}")
-            results['answers'] = {
+        # Fail fast before any worker or Vertex AI client is started
+        if not any(pdfs_by_kind.values()):
+            return {
                 'status': 'error',
-                'error': str(e),
-                'folder_path': answer_keys_path
+                'message': f'No PDF files found in {question_papers_path} or {answer_keys_path}',
+                'folder_path': folder_path
             }
         
+        # Process question papers and answer keys at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {}
+            for kind, (source, output) in subfolders.items():
+                if pdfs_by_kind[kind]:
+                    futures[kind] = executor.submit(
+                        process_folder_with_output, kind, source, subject, output, max_workers,
+                        pdfs_by_kind[kind], force
+                    )
+                else:
+                    results[kind] = {
+                        'status': 'error',
+                        'message': f'No PDF files found in folder: {source}'
+                    }
+            
+            for kind, future in futures.items():
+                try:
+                    kind_result = future.result()
+                    results[kind] = kind_result
+                    logger.info(f"{kind.capitalize()} processing completed: {kind_result.get('successful_extractions', 0)} successful")
+                except Exception as e:
+                    logger.error(f"Failed to process {EXTRACTION_KINDS[kind]['label']}s: {str(e)}")
+                    results[kind] = {
+                        'status': 'error',
+                        'error': str(e),
+                        'folder_path': subfolders[kind][0]
+                    }
+        
         # Calculate overall statistics
         total_questions = results.get('questions', {}).get('successful_extractions', 0)
         total_answers = results.get('answers', {}).get('successful_extractions', 0)
         total_failed = (results.get('questions', {}).get('failed_extractions', 0) + 
                        results.get('answers', {}).get('failed_extractions', 0))
+        total_skipped = (results.get('questions', {}).get('skipped_extractions', 0) + 
+                        results.get('answers', {}).get('skipped_extractions', 0))
         
         return {
             'status': 'success',
@@ -357,6 +605,7 @@ def process_book_folder_complete(folder_path: str, subject: str = 'computer_appl
             'total_questions_extracted': total_questions,
             'total_answers_extracted': total_answers,
             'total_failed': total_failed,
+            'total_skipped': total_skipped,
             'extracted_questions_path': extracted_questions_path,
             'extracted_answers_path': extracted_answers_path,
             'results': results
@@ -370,259 +619,10 @@ def process_book_folder_complete(folder_path: str, subject: str = 'computer_appl
             'folder_path': folder_path
         }
 
-def process_folder_questions_with_output(folder_path: str, subject: str, output_folder: str) -> Dict[str, Any]:
-    """Process folder questions and save to specific output folder"""
-    try:
-        # Get list of PDF files
-        pdf_files = bucket_manager.list_files_in_folder(folder_path, file_extension='.pdf', return_full_paths=False)
-        
-        if not pdf_files:
-            return {
-                'status': 'error',
-                'message': f'No PDF files found in folder: {folder_path}'
-            }
-        
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
-        
-        for pdf_file in pdf_files:
-            logger.info(f"Processing question paper: {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Extract filename without extension for output naming
-                filename = pdf_file.split('/')[-1].replace('.pdf', '')
-                output_path = f"{output_folder}/{filename}_questions.json"
-                
-                # Process the PDF with custom output path
-                result = process_question_paper_with_output(pdf_gcs_path, subject, output_path)
-                result['pdf_file'] = pdf_file
-                result['output_path'] = output_path
-                results.append(result)
-                
-                if result['status'] == 'success':
-                    successful_extractions += 1
-                else:
-                    failed_extractions += 1
-                logger.info(f"Successfully processed question paper: {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process question paper {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
-        
-        return {
-            'status': 'success',
-            'folder_path': folder_path,
-            'output_folder': output_folder,
-            'subject': subject,
-            'total_files': len(pdf_files),
-            'successful_extractions': successful_extractions,
-            'failed_extractions': failed_extractions,
-            'results': results
-        }
-
-    except Exception as e:
-        logger.error(f"Error in folder question extraction with output: {str(e)}")
-        return {
-            'status': 'error',
-            'error': str(e),
-            'folder_path': folder_path
-        }
-
-def process_folder_answers_with_output(folder_path: str, subject: str, output_folder: str) -> Dict[str, Any]:
-    """Process folder answers and save to specific output folder"""
-    try:
-        # Get list of PDF files
-        pdf_files = bucket_manager.list_files_in_folder(folder_path, file_extension='.pdf', return_full_paths=False)
-        
-        if not pdf_files:
-            return {
-                'status': 'error',
-                'message': f'No PDF files found in folder: {folder_path}'
-            }
-        
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
-        
-        for pdf_file in pdf_files:
-            logger.info(f"Processing answer key: {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Extract filename without extension for output naming
-                filename = pdf_file.split('/')[-1].replace('.pdf', '')
-                output_path = f"{output_folder}/{filename}_answers.json"
-                
-                # Process the PDF with custom output path
-                result = process_answer_key_with_output(pdf_gcs_path, subject, output_path)
-                result['pdf_file'] = pdf_file
-                result['output_path'] = output_path
-                results.append(result)
-                
-                if result['status'] == 'success':
-                    successful_extractions += 1
-                else:
-                    failed_extractions += 1
-                logger.info(f"Successfully processed answer key: {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process answer key {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
-        
-        return {
-            'status': 'success',
-            'folder_path': folder_path,
-            'output_folder': output_folder,
-            'subject': subject,
-            'total_files': len(pdf_files),
-            'successful_extractions': successful_extractions,
-            'failed_extractions': failed_extractions,
-            'results': results
-        }
-        
-    except Exception as e:
-        logger.error(f"Error in folder answer extraction with output: {str(e)}")
-        return {
-            'status': 'error',
-            'error': str(e),
-            'folder_path': folder_path
-        }
-
-def process_question_paper_with_output(pdf_path: str, subject: str, output_path: str) -> Dict[str, Any]:
-    """Process question paper and save to specific output path"""
-    try:
-        # Extract filename from GCS path
-        pdf_filename = extract_filename_from_gcs_path(pdf_path)
-        logger.info(f"Processing question paper: {pdf_filename}")
-        
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor and config
-            factory = SubjectExtractorFactory()
-            subject_extractor = factory.get_extractor(subject)
-            question_config = subject_extractor.get_question_config()
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Extract questions
-            logger.info(f"Starting question extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, question_config, subject_extractor)
-            
-            if not result:
-                raise Exception("Question extraction failed")
-            
-            # Save to specified output path
-            bucket_manager.upload_json(result, output_path)
-            
-            return {
-                'status': 'success',
-                'message': 'Questions extracted successfully',
-                'pdf_path': pdf_path,
-                'subject': subject,
-                'output_path': output_path,
-                'question_count': len(result.get('questions', [])),
-                'document_info': result.get('document_info', {})
-            }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-        
-    except Exception as e:
-        logger.error(f"Error processing question paper with output: {str(e)}")
-        return {
-            'status': 'error',
-            'error': str(e),
-            'pdf_path': pdf_path
-        }
-
-def process_answer_key_with_output(pdf_path: str, subject: str, output_path: str) -> Dict[str, Any]:
-    """Process answer key and save to specific output path"""
-    try:
-        # Extract filename from GCS path
-        pdf_filename = extract_filename_from_gcs_path(pdf_path)
-        logger.info(f"Processing answer key: {pdf_filename}")
-        
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
-        
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor and config
-            factory = SubjectExtractorFactory()
-            subject_extractor = factory.get_extractor(subject)
-            answer_config = subject_extractor.get_answer_config()
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Extract answers
-            logger.info(f"Starting answer extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, answer_config, subject_extractor)
-            
-            if not result:
-                raise Exception("Answer extraction failed")
-            
-            # Save to specified output path
-            bucket_manager.upload_json(result, output_path)
-            
-            return {
-                'status': 'success',
-                'message': 'Answers extracted successfully',
-                'pdf_path': pdf_path,
-                'subject': subject,
-                'output_path': output_path,
-                'answer_count': len(result.get('answers', [])),
-                'document_info': result.get('document_info', {})
-            }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
-        
-    except Exception as e:
-        logger.error(f"Error processing answer key with output: {str(e)}")
-        return {
-            'status': 'error',
-            'error': str(e),
-            'pdf_path': pdf_path
-        }
-
 def get_available_subjects() -> Dict[str, Any]:
     """Get list of available subjects"""
     try:
-        factory = SubjectExtractorFactory()
-        subjects = factory.get_available_subjects()
+        subjects = extractor_factory.get_available_subjects()
         
         return {
             'status': 'success',
@@ -636,73 +636,81 @@ def get_available_subjects() -> Dict[str, Any]:
             'error': str(e)
         }
 
+def extract_all(question_pdf_path: Optional[str], answer_pdf_path: Optional[str], subject: str) -> Dict[str, Any]:
+    """Extract a question paper and/or an answer key"""
+    if not question_pdf_path and not answer_pdf_path:
+        raise ValueError("At least one of --question-pdf-path or --answer-pdf-path is required")
+    
+    results = {}
+    if question_pdf_path:
+        results['questions'] = process_question_paper(question_pdf_path, subject)
+    if answer_pdf_path:
+        results['answers'] = process_answer_key(answer_pdf_path, subject)
+    
+    return {
+        'status': 'success',
+        'message': 'Extraction completed successfully',
+        'results': results
+    }
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser; each operation is a subcommand carrying its handler in 'func'"""
+    parser = argparse.ArgumentParser(description='Book Extraction CLI')
+    subparsers = parser.add_subparsers(dest='operation', required=True, help='Operation to perform')
+    
+    # Arguments shared by the extraction operations
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--subject', default='computer_applications', help='Subject for extraction')
+    common.add_argument('--format', choices=sorted(DOCUMENT_FORMATS), default=OUTPUT_FORMAT,
+                        help=f'Storage format of extraction results (default: {OUTPUT_FORMAT}); stdout stays JSON')
+    
+    # Arguments shared by the folder operations
+    folder = argparse.ArgumentParser(add_help=False, parents=[common])
+    folder.add_argument('--folder-path', required=True, help='GCS folder path for batch processing')
+    folder.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of PDFs processed concurrently (default: {DEFAULT_WORKERS})')
+    folder.add_argument('--force', action='store_true',
+                        help='Re-extract PDFs even if their output JSON already exists')
+    
+    sub = subparsers.add_parser('extract-questions', parents=[common], help='Extract questions from one PDF')
+    sub.add_argument('--pdf-path', required=True, help='GCS path to PDF file')
+    sub.set_defaults(func=lambda a: process_question_paper(a.pdf_path, a.subject))
+    
+    sub = subparsers.add_parser('extract-answers', parents=[common], help='Extract answers from one PDF')
+    sub.add_argument('--pdf-path', required=True, help='GCS path to PDF file')
+    sub.set_defaults(func=lambda a: process_answer_key(a.pdf_path, a.subject))
+    
+    sub = subparsers.add_parser('extract-all', parents=[common], help='Extract a question paper and/or answer key')
+    sub.add_argument('--question-pdf-path', help='GCS path to question paper PDF')
+    sub.add_argument('--answer-pdf-path', help='GCS path to answer key PDF')
+    sub.set_defaults(func=lambda a: extract_all(a.question_pdf_path, a.answer_pdf_path, a.subject))
+    
+    sub = subparsers.add_parser('extract-folder-questions', parents=[folder], help='Extract questions from a folder')
+    sub.set_defaults(func=lambda a: asyncio.run(
+        process_folder('questions', a.folder_path, a.subject, a.workers, a.force)))
+    
+    sub = subparsers.add_parser('extract-folder-answers', parents=[folder], help='Extract answers from a folder')
+    sub.set_defaults(func=lambda a: asyncio.run(
+        process_folder('answers', a.folder_path, a.subject, a.workers, a.force)))
+    
+    sub = subparsers.add_parser('process-book-folder', parents=[folder], help='Process a complete book folder')
+    sub.set_defaults(func=lambda a: process_book_folder_complete(a.folder_path, a.subject, a.workers, a.force))
+    
+    sub = subparsers.add_parser('get-subjects', help='List available subjects')
+    sub.set_defaults(func=lambda a: get_available_subjects())
+    
+    return parser
+
 def main():
     """Main CLI entry point"""
-    parser = argparse.ArgumentParser(description='Book Extraction CLI')
-    parser.add_argument('operation', choices=[
-        'extract-questions',
-        'extract-answers', 
-        'extract-all',
-        'extract-folder-questions',
-        'extract-folder-answers',
-        'process-book-folder',
-        'get-subjects'
-    ], help='Operation to perform')
-    
-    # Common arguments
-    parser.add_argument('--pdf-path', help='GCS path to PDF file')
-    parser.add_argument('--subject', default='computer_applications', help='Subject for extraction')
-    parser.add_argument('--folder-path', help='GCS folder path for batch processing')
-    parser.add_argument('--question-pdf-path', help='GCS path to question paper PDF')
-    parser.add_argument('--answer-pdf-path', help='GCS path to answer key PDF')
-    
-    args = parser.parse_args()
-    
-    result = {}
+    global OUTPUT_FORMAT
     
-    try:
-        if args.operation == 'extract-questions':
-            if not args.pdf_path:
-                raise ValueError("--pdf-path is required for extract-questions")
-            result = process_question_paper(args.pdf_path, args.subject)
-            
-        elif args.operation == 'extract-answers':
-            if not args.pdf_path:
-                raise ValueError("--pdf-path is required for extract-answers")
-            result = process_answer_key(args.pdf_path, args.subject)
-            
-        elif args.operation == 'extract-all':
-            results = {}
-            if args.question_pdf_path:
-                results['questions'] = process_question_paper(args.question_pdf_path, args.subject)
-            if args.answer_pdf_path:
-                results['answers'] = process_answer_key(args.answer_pdf_path, args.subject)
-            if not args.question_pdf_path and not args.answer_pdf_path:
-                raise ValueError("At least one of --question-pdf-path or --answer-pdf-path is required")
-            result = {
-                'status': 'success',
-                'message': 'Extraction completed successfully',
-                'results': results
-            }
-            
-        elif args.operation == 'extract-folder-questions':
-            if not args.folder_path:
-                raise ValueError("--folder-path is required for extract-folder-questions")
-            result = process_folder_questions(args.folder_path, args.subject)
-            
-        elif args.operation == 'extract-folder-answers':
-            if not args.folder_path:
-                raise ValueError("--folder-path is required for extract-folder-answers")
-            result = process_folder_answers(args.folder_path, args.subject)
-            
-        elif args.operation == 'process-book-folder':
-            if not args.folder_path:
-                raise ValueError("--folder-path is required for process-book-folder")
-            result = process_book_folder_complete(args.folder_path, args.subject)
-            
-        elif args.operation == 'get-subjects':
-            result = get_available_subjects()
+    args = build_parser().parse_args()
+    
+    OUTPUT_FORMAT = getattr(args, 'format', OUTPUT_FORMAT)
     
+    try:
+        result = args.func(args)
     except Exception as e:
         logger.error(f"Error in main: {str(e)}")
         result = {
@@ -711,7 +719,8 @@ def main():
         }
     
     # Output result as JSON
-    print(json.dumps(result, indent=2))
+    sys.stdout.buffer.write(orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.flush()
     
     # Set exit code based on status
     if result.get('status') != 'success':
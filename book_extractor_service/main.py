@@ -1,13 +1,22 @@
 import os
-import json
+import orjson
 import tempfile
+import time
 import logging
-from flask import Flask, request, jsonify
+import threading
+from uuid import uuid4
+from collections import OrderedDict
+from functools import lru_cache, partial
+from contextlib import contextmanager
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 from werkzeug.exceptions import BadRequest
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Iterator, List, Callable, Tuple, Union, BinaryIO
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
 
 # Import our modules
-from vertex.extractor import VertexAIPDFExtractor
+from vertex.extractor import VertexAIPDFExtractor, ExtractionConfig
+from vertex.rate_limiter import RateLimiter
 from vertex.subject_mapper import SubjectExtractorFactory
 
 # Add parent directory to path for utils import
@@ -16,145 +25,452 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.gcp.bucket_manager import BucketManager
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Attributes every LogRecord has; anything else on a record came from extra={...}
+_LOG_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+class JSONLogFormatter(logging.Formatter):
+    """Format each record as one JSON line (severity, message, logger and any extra fields) for Cloud Logging"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'severity': record.levelname,
+            'message': record.getMessage(),
+            'logger': record.name
+        }
+        for key, value in record.__dict__.items():
+            if key not in _LOG_RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
+# Configure logging; LOG_FORMAT=text keeps the plain format for local runs
+_log_handler = logging.StreamHandler()
+if os.getenv('LOG_FORMAT', 'json').lower() == 'json':
+    _log_handler.setFormatter(JSONLogFormatter())
+logging.basicConfig(level=logging.INFO, handlers=[_log_handler])
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs) -> Any:
+        return orjson.loads(s)
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Environment variables
 PROJECT_ID = os.getenv('GOOGLE_CLOUD_PROJECT', 'book-qc-cf')
 BUCKET_NAME = os.getenv('BUCKET_NAME', 'book-qc-cf-pdf-storage')
 VERTEX_AI_LOCATION = os.getenv('VERTEX_AI_LOCATION', 'us-central1')
 
+# Let Vertex AI read PDFs straight from GCS; set to false to download them to a temporary file first
+VERTEX_READ_FROM_GCS = os.getenv('VERTEX_READ_FROM_GCS', 'true').lower() == 'true'
+
+# PDFs smaller than this stay in memory when downloaded locally; larger ones spill to a temporary file
+PDF_SPOOL_MAX_SIZE = int(os.getenv('PDF_SPOOL_MAX_SIZE', str(64 * 1024 * 1024)))
+
+# Where spilled PDFs go: tmpfs (/dev/shm) when available so large copies never touch disk
+PDF_SPOOL_DIR = os.getenv('PDF_SPOOL_DIR') or ('/dev/shm' if os.access('/dev/shm', os.W_OK) else None)
+
+# Number of PDFs extracted at the same time by the folder endpoints
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', '8'))
+
+# Background extraction jobs run at the same time, and finished jobs remembered for GET /jobs/<id>
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', str(EXTRACT_WORKERS)))
+JOB_HISTORY = int(os.getenv('JOB_HISTORY', '1000'))
+
+# Bucket folder holding one status object per job, so GET /jobs/<id> works from any
+# gunicorn worker or Cloud Run instance, not only the one running the job
+JOB_STATUS_PREFIX = os.getenv('JOB_STATUS_PREFIX', 'jobs').strip('/')
+
+# Request threads per gunicorn worker (see serve)
+GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', '16'))
+
+# Kept-alive GCS connections shared by request, folder and job threads; sized so they
+# each reuse a pooled connection instead of opening a new TLS session per call
+GCS_POOL_SIZE = int(os.getenv('GCS_POOL_SIZE', str(max(32, GUNICORN_THREADS + EXTRACT_WORKERS + JOB_WORKERS))))
+
+# Maximum Gemini calls started per second across all request threads
+VERTEX_RPS = float(os.getenv('VERTEX_RPS', '5'))
+
 # Initialize services
-bucket_manager = BucketManager(PROJECT_ID, BUCKET_NAME)
+bucket_manager = BucketManager(PROJECT_ID, BUCKET_NAME, pool_size=GCS_POOL_SIZE)
+vertex_rate_limiter = RateLimiter(VERTEX_RPS)
+
+# Created once per worker process so every request reuses the Vertex AI client and its channel
+extractor_factory = SubjectExtractorFactory()
+vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION, rate_limiter=vertex_rate_limiter)
+AVAILABLE_SUBJECTS = frozenset(extractor_factory.get_available_subjects())
+
+# Jobs queued with "async": true and run by this worker process; job_id -> Future. Jobs
+# of other workers are looked up through their status object (see job_status_path)
+job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='extract-job')
+jobs: "OrderedDict[str, Future]" = OrderedDict()
+jobs_lock = threading.Lock()
+
+@lru_cache(maxsize=16)
+def get_subject_extractor(subject: str):
+    """Get the cached subject-specific extractor"""
+    return extractor_factory.get_extractor(subject)
+
+@lru_cache(maxsize=16)
+def get_subject_configs(subject: str) -> Tuple[Any, ExtractionConfig, ExtractionConfig]:
+    """Get the subject extractor with its question and answer configs, built once per subject"""
+    subject_extractor = get_subject_extractor(subject)
+    return subject_extractor, subject_extractor.get_question_config(), subject_extractor.get_answer_config()
+
+GS_PREFIX = 'gs://'
 
 def extract_filename_from_gcs_path(gcs_path: str) -> str:
     """Extract filename from GCS path"""
-    if gcs_path.startswith('gs://'):
-        # Remove gs://bucket-name/ prefix to get the relative path
-        parts = gcs_path.split('/', 3)
-        if len(parts) >= 4:
-            return parts[3]  # Return the relative path (e.g., question_papers/SQP-2.pdf)
-        return gcs_path.split('/')[-1]  # Fallback to just filename
+    if gcs_path.startswith(GS_PREFIX):
+        # Slice off gs://bucket-name/ to get the relative path (e.g., question_papers/SQP-2.pdf)
+        i = gcs_path.find('/', len(GS_PREFIX))
+        return gcs_path[i + 1:] if i != -1 else gcs_path[len(GS_PREFIX):]
     return gcs_path
 
-def process_question_paper(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Process question paper PDF and extract questions"""
+def strip_pdf_extension(path: str) -> str:
+    """Remove a trailing .pdf extension (any case) without touching the rest of the path"""
+    return path[:-4] if path.lower().endswith('.pdf') else path
+
+def extraction_output_path(pdf_filename: str, extraction_type: str) -> str:
+    """Get the GCS path of a PDF's extraction output, e.g. extractions/questions/<stem>_questions.json"""
+    return f"extractions/{extraction_type}/{strip_pdf_extension(pdf_filename)}_{extraction_type}.json"
+
+def to_gcs_uri(gcs_path: str) -> str:
+    """Return the gs:// URI of a path, qualifying bucket-relative object names with BUCKET_NAME"""
+    return gcs_path if gcs_path.startswith(GS_PREFIX) else f"{GS_PREFIX}{BUCKET_NAME}/{gcs_path}"
+
+def validate_subject(subject: str) -> None:
+    """Raise BadRequest unless the subject has a registered extractor"""
+    if not isinstance(subject, str) or subject.lower().strip() not in AVAILABLE_SUBJECTS:
+        raise BadRequest(f"Unknown subject: {subject}. Available subjects: {', '.join(sorted(AVAILABLE_SUBJECTS))}")
+
+def validate_extraction_request(pdf_gcs_path: str, subject: str) -> None:
+    """
+    Reject a request before any work is queued for it
+    
+    Args:
+        pdf_gcs_path: GCS path of the PDF to extract
+        subject: Subject for extraction
+        
+    Raises:
+        BadRequest: If the subject is unknown, the path is not a PDF, or the PDF does not exist
+    """
+    validate_subject(subject)
+    
+    if not isinstance(pdf_gcs_path, str) or not pdf_gcs_path.lower().endswith('.pdf'):
+        raise BadRequest(f"pdf_path must point to a .pdf file: {pdf_gcs_path}")
+    
+    pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
+    if not bucket_manager.file_exists(pdf_filename):
+        raise BadRequest(f"PDF not found in gs://{BUCKET_NAME}: {pdf_filename}")
+
+@contextmanager
+def pdf_source(pdf_gcs_path: str) -> Iterator[Union[str, BinaryIO]]:
+    """
+    Yield what Vertex AI should read the PDF from
+    
+    That is the gs:// URI itself, so no bytes pass through this service, unless
+    VERTEX_READ_FROM_GCS is off, in which case a spooled local copy is yielded:
+    held in memory up to PDF_SPOOL_MAX_SIZE, spilled to PDF_SPOOL_DIR beyond that,
+    and removed automatically on close.
+    """
+    if VERTEX_READ_FROM_GCS:
+        yield to_gcs_uri(pdf_gcs_path)
+        return
+    
+    pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
+    with tempfile.SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_SIZE, suffix='.pdf', dir=PDF_SPOOL_DIR) as spool:
+        # Download PDF from bucket
+        if not bucket_manager.download_to_fileobj(pdf_filename, spool):
+            raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
+        spool.seek(0)
+        yield spool
+
+def output_is_current(output_filename: str, pdf_filename: str) -> bool:
+    """Check whether an extraction output exists and is at least as new as its PDF"""
+    output_updated = bucket_manager.get_updated_time(output_filename)
+    if output_updated is None:
+        return False
+    pdf_updated = bucket_manager.get_updated_time(pdf_filename)
+    return pdf_updated is not None and output_updated >= pdf_updated
+
+def skipped_result(extraction_type: str, subject: str, pdf_gcs_path: str, output_filename: str) -> Dict[str, Any]:
+    """Build the result returned for a PDF whose extraction output is already up to date"""
+    logger.info("extract.skipped", extra={'pdf': pdf_gcs_path, 'extraction_type': extraction_type, 'output': output_filename})
+    return {
+        'status': 'skipped',
+        'extraction_type': extraction_type,
+        'subject': subject,
+        'extraction_gcs_path': f"gs://{BUCKET_NAME}/{output_filename}",
+        'pdf_path': to_gcs_uri(pdf_gcs_path)
+    }
+
+def process_question_paper(pdf_gcs_path: str, subject: str = "computer_applications",
+                           force: bool = False) -> Dict[str, Any]:
+    """Process question paper PDF and extract questions, unless its output is already up to date"""
     try:
         # Extract filename from GCS path
         pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
-        logger.info(f"Processing question paper: {pdf_filename}")
+        output_filename = extraction_output_path(pdf_filename, 'questions')
         
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
+        if not force and output_is_current(output_filename, pdf_filename):
+            return skipped_result('questions', subject, pdf_gcs_path, output_filename)
         
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor
-            extractor_factory = SubjectExtractorFactory()
-            subject_extractor = extractor_factory.get_extractor(subject)
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Get question extraction config
-            question_config = subject_extractor.get_question_config()
+        logger.info("extract.start", extra={'pdf': pdf_filename, 'subject': subject, 'extraction_type': 'questions'})
+        started = time.perf_counter()
+        
+        # Point Vertex AI at the PDF in GCS (or a temporary local copy)
+        with pdf_source(pdf_gcs_path) as pdf_input:
+            # Get subject-specific extractor and question extraction config
+            subject_extractor, question_config, _ = get_subject_configs(subject)
             
             # Extract questions
-            logger.info(f"Starting question extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, question_config, subject_extractor)
+            result = vertex_extractor.process_pdf(pdf_input, question_config, subject_extractor)
             
             if not result:
                 raise Exception("Question extraction failed")
             
             # Upload result to GCS
-            output_filename = f"extractions/questions/{pdf_filename.replace('.pdf', '_questions.json')}"
             if not bucket_manager.upload_json(result, output_filename):
                 raise Exception(f"Failed to upload questions to GCS: {output_filename}")
             
+            total = len(result.get('questions', []))
+            logger.info("extract.done", extra={
+                'pdf': pdf_filename, 'subject': subject, 'extraction_type': 'questions',
+                'total_questions': total, 'duration_s': round(time.perf_counter() - started, 3)
+            })
+            
             return {
                 'status': 'success',
                 'extraction_type': 'questions',
                 'subject': subject,
                 'extraction_gcs_path': f"gs://{BUCKET_NAME}/{output_filename}",
-                'pdf_path': pdf_gcs_path,
-                'total_questions': len(result.get('questions', [])),
+                'pdf_path': to_gcs_uri(pdf_gcs_path),
+                'total_questions': total,
                 'document_info': result.get('document_info', {})
             }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
                 
     except Exception as e:
         logger.error(f"Error processing question paper: {str(e)}")
         raise
 
-def process_answer_key(pdf_gcs_path: str, subject: str = "computer_applications") -> Dict[str, Any]:
-    """Process answer key PDF and extract answers"""
+def process_answer_key(pdf_gcs_path: str, subject: str = "computer_applications",
+                       force: bool = False) -> Dict[str, Any]:
+    """Process answer key PDF and extract answers, unless its output is already up to date"""
     try:
         # Extract filename from GCS path
         pdf_filename = extract_filename_from_gcs_path(pdf_gcs_path)
-        logger.info(f"Processing answer key: {pdf_filename}")
+        output_filename = extraction_output_path(pdf_filename, 'answers')
         
-        # Download PDF from GCS to temporary file
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_pdf:
-            temp_pdf_path = temp_pdf.name
+        if not force and output_is_current(output_filename, pdf_filename):
+            return skipped_result('answers', subject, pdf_gcs_path, output_filename)
         
-        try:
-            # Download PDF from bucket
-            if not bucket_manager.download_file(pdf_filename, temp_pdf_path):
-                raise Exception(f"Failed to download PDF from GCS: {pdf_filename}")
-            
-            # Get subject-specific extractor
-            extractor_factory = SubjectExtractorFactory()
-            subject_extractor = extractor_factory.get_extractor(subject)
-            
-            # Initialize Vertex AI extractor
-            vertex_extractor = VertexAIPDFExtractor(PROJECT_ID, VERTEX_AI_LOCATION)
-            
-            # Get answer extraction config
-            answer_config = subject_extractor.get_answer_config()
+        logger.info("extract.start", extra={'pdf': pdf_filename, 'subject': subject, 'extraction_type': 'answers'})
+        started = time.perf_counter()
+        
+        # Point Vertex AI at the PDF in GCS (or a temporary local copy)
+        with pdf_source(pdf_gcs_path) as pdf_input:
+            # Get subject-specific extractor and answer extraction config
+            subject_extractor, _, answer_config = get_subject_configs(subject)
             
             # Extract answers
-            logger.info(f"Starting answer extraction for: {pdf_filename}")
-            result = vertex_extractor.process_pdf(temp_pdf_path, answer_config, subject_extractor)
+            result = vertex_extractor.process_pdf(pdf_input, answer_config, subject_extractor)
             
             if not result:
                 raise Exception("Answer extraction failed")
             
             # Upload result to GCS
-            output_filename = f"extractions/answers/{pdf_filename.replace('.pdf', '_answers.json')}"
             if not bucket_manager.upload_json(result, output_filename):
                 raise Exception(f"Failed to upload answers to GCS: {output_filename}")
             
+            total = len(result.get('answers', []))
+            logger.info("extract.done", extra={
+                'pdf': pdf_filename, 'subject': subject, 'extraction_type': 'answers',
+                'total_answers': total, 'duration_s': round(time.perf_counter() - started, 3)
+            })
+            
             return {
                 'status': 'success',
                 'extraction_type': 'answers',
                 'subject': subject,
                 'extraction_gcs_path': f"gs://{BUCKET_NAME}/{output_filename}",
-                'pdf_path': pdf_gcs_path,
-                'total_answers': len(result.get('answers', [])),
+                'pdf_path': to_gcs_uri(pdf_gcs_path),
+                'total_answers': total,
                 'document_info': result.get('document_info', {})
             }
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_pdf_path):
-                os.unlink(temp_pdf_path)
                 
     except Exception as e:
         logger.error(f"Error processing answer key: {str(e)}")
         raise
 
+def iter_extraction_tasks(tasks: List[Tuple[str, Callable[[str, str], Dict[str, Any]]]],
+                          subject: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Run (pdf_file, process_fn) tasks in one thread pool, yielding results as they finish
+    
+    The work is network-bound (GCS and Vertex AI), so threads overlap it well. The
+    bucket-relative names are passed straight through; nothing re-parses a gs:// URI.
+    
+    Args:
+        tasks: Pairs of relative GCS path and process_question_paper or process_answer_key
+        subject: Subject for extraction
+        
+    Yields:
+        Tuples of (index into tasks, result dictionary with 'pdf_file' set)
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(EXTRACT_WORKERS, len(tasks)))) as executor:
+        futures = {
+            executor.submit(process_fn, pdf_file, subject): i
+            for i, (pdf_file, process_fn) in enumerate(tasks)
+        }
+        
+        for future in as_completed(futures):
+            i = futures[future]
+            pdf_file = tasks[i][0]
+            try:
+                result = future.result()
+                result['pdf_file'] = pdf_file
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Successfully processed {pdf_file}")
+            except Exception as e:
+                logger.error(f"Failed to process {pdf_file}: {str(e)}")
+                result = {
+                    'pdf_file': pdf_file,
+                    'status': 'error',
+                    'error': str(e)
+                }
+            yield i, result
+
+def iter_folder_results(pdf_files: List[str], process_fn: Callable[[str, str], Dict[str, Any]],
+                        subject: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Run process_fn over the folder's PDFs, yielding (index into pdf_files, result) as each finishes"""
+    return iter_extraction_tasks([(pdf_file, process_fn) for pdf_file in pdf_files], subject)
+
+def process_folder_pdfs(pdf_files: List[str], process_fn: Callable[[str, str], Dict[str, Any]],
+                        subject: str) -> Tuple[List[Dict[str, Any]], int, int, int]:
+    """
+    Run process_fn over the folder's PDFs and collect every result
+    
+    Args:
+        pdf_files: Relative GCS paths of the PDF files
+        process_fn: process_question_paper or process_answer_key
+        subject: Subject for extraction
+        
+    Returns:
+        Tuple of (results in the order of pdf_files, successful count, failed count, skipped count)
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(pdf_files)
+    counts = {'success': 0, 'error': 0, 'skipped': 0}
+    
+    for i, result in iter_folder_results(pdf_files, process_fn, subject):
+        results[i] = result
+        counts[result['status']] += 1
+    
+    return results, counts['success'], counts['error'], counts['skipped']
+
+def stream_folder_results(pdf_files: List[str], process_fn: Callable[[str, str], Dict[str, Any]],
+                          folder_path: str, subject: str) -> Response:
+    """
+    Stream folder results as NDJSON, one line per PDF as soon as it finishes
+    
+    Nothing is buffered, so clients see progress immediately. The last line is
+    a summary with 'type': 'summary' and the success/failure counts.
+    
+    Args:
+        pdf_files: Relative GCS paths of the PDF files
+        process_fn: process_question_paper or process_answer_key
+        folder_path: Folder the PDFs were listed from
+        subject: Subject for extraction
+        
+    Returns:
+        Streaming application/x-ndjson response
+    """
+    def generate() -> Iterator[bytes]:
+        counts = {'success': 0, 'error': 0, 'skipped': 0}
+        
+        for _, result in iter_folder_results(pdf_files, process_fn, subject):
+            counts[result['status']] += 1
+            yield orjson.dumps(result, option=orjson.OPT_APPEND_NEWLINE)
+        
+        yield orjson.dumps({
+            'type': 'summary',
+            'status': 'success',
+            'folder_path': folder_path,
+            'subject': subject,
+            'total_files': len(pdf_files),
+            'successful_extractions': counts['success'],
+            'failed_extractions': counts['error'],
+            'skipped_extractions': counts['skipped']
+        }, option=orjson.OPT_APPEND_NEWLINE)
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def wants_stream(data: Dict[str, Any]) -> bool:
+    """Check whether the client asked for folder results streamed as NDJSON"""
+    if str(data.get('stream', False)).lower() == 'true':
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+def job_status_path(job_id: str) -> str:
+    """Get the bucket path of a job's status object"""
+    return f"{JOB_STATUS_PREFIX}/{job_id}.json"
+
+def save_job_status(job_id: str, status: str, **fields) -> None:
+    """Write a job's status object; raises if it can't be stored"""
+    if not bucket_manager.upload_json({'job_id': job_id, 'status': status, **fields}, job_status_path(job_id)):
+        raise Exception(f"Failed to save status of job {job_id}")
+
+def run_job(job_id: str, fn: Callable[..., Dict[str, Any]], *args) -> Dict[str, Any]:
+    """Run fn(*args) as a job, recording its progress and outcome in its status object"""
+    save_job_status(job_id, 'running', done=False)
+    try:
+        result = fn(*args)
+    except Exception as e:
+        save_job_status(job_id, 'error', done=True, error=str(e))
+        raise
+    save_job_status(job_id, 'completed', done=True, result=result)
+    return result
+
+def submit_job(fn: Callable[..., Dict[str, Any]], *args) -> str:
+    """
+    Run fn(*args) on the background job pool
+    
+    Args:
+        fn: Function producing the job's result dictionary
+        *args: Arguments passed to fn
+        
+    Returns:
+        Job id to poll with GET /jobs/<job_id>
+    """
+    job_id = uuid4().hex
+    # Stored before the id is handed out, so a poll landing on any worker finds the job
+    save_job_status(job_id, 'queued', done=False)
+    future = job_executor.submit(run_job, job_id, fn, *args)
+    
+    with jobs_lock:
+        jobs[job_id] = future
+        # Forget the oldest finished jobs once the history is full
+        for old_id in [i for i, f in jobs.items() if f.done()][:max(0, len(jobs) - JOB_HISTORY)]:
+            del jobs[old_id]
+    
+    return job_id
+
+def wants_force(data: Dict[str, Any]) -> bool:
+    """Check whether the request asked to re-extract PDFs whose outputs are already up to date"""
+    return str(data.get('force', False)).lower() == 'true'
+
+def wants_async(data: Dict[str, Any]) -> bool:
+    """Check whether the request asked to be queued as a job instead of waiting for the result"""
+    return str(data.get('async', False)).lower() == 'true'
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -174,16 +490,23 @@ def extract_questions():
         
         subject = data.get('subject', 'computer_applications')
         bucket_name = data.get('bucket_name', BUCKET_NAME)
+        force = wants_force(data)
         
         # Handle nested pdf_path structure from workflow
         if isinstance(pdf_gcs_path, dict) and 'pdf_path' in pdf_gcs_path:
             pdf_gcs_path = pdf_gcs_path['pdf_path']
-            logger.info(f"Extracted nested pdf_path: {pdf_gcs_path}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Extracted nested pdf_path: {pdf_gcs_path}")
         
         logger.info(f"Received question extraction request: {pdf_gcs_path}, subject: {subject}")
+        validate_extraction_request(pdf_gcs_path, subject)
+        
+        if wants_async(data):
+            job_id = submit_job(process_question_paper, pdf_gcs_path, subject, force)
+            return jsonify({'job_id': job_id, 'status': 'queued'}), 202
         
         # Process question paper
-        result = process_question_paper(pdf_gcs_path, subject)
+        result = process_question_paper(pdf_gcs_path, subject, force)
         
         return jsonify(result), 200
         
@@ -207,16 +530,23 @@ def extract_answers():
         
         subject = data.get('subject', 'computer_applications')
         bucket_name = data.get('bucket_name', BUCKET_NAME)
+        force = wants_force(data)
         
         # Handle nested pdf_path structure from workflow
         if isinstance(pdf_gcs_path, dict) and 'pdf_path' in pdf_gcs_path:
             pdf_gcs_path = pdf_gcs_path['pdf_path']
-            logger.info(f"Extracted nested pdf_path: {pdf_gcs_path}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Extracted nested pdf_path: {pdf_gcs_path}")
         
         logger.info(f"Received answer extraction request: {pdf_gcs_path}, subject: {subject}")
+        validate_extraction_request(pdf_gcs_path, subject)
+        
+        if wants_async(data):
+            job_id = submit_job(process_answer_key, pdf_gcs_path, subject, force)
+            return jsonify({'job_id': job_id, 'status': 'queued'}), 202
         
         # Process answer key
-        result = process_answer_key(pdf_gcs_path, subject)
+        result = process_answer_key(pdf_gcs_path, subject, force)
         
         return jsonify(result), 200
         
@@ -237,21 +567,38 @@ def extract_all():
         question_pdf_path = data.get('question_pdf_path')
         answer_pdf_path = data.get('answer_pdf_path')
         subject = data.get('subject', 'computer_applications')
+        force = wants_force(data)
         
         if not question_pdf_path and not answer_pdf_path:
             raise BadRequest("At least one PDF path is required (question_pdf_path or answer_pdf_path)")
         
-        results = {}
+        for pdf_path in (question_pdf_path, answer_pdf_path):
+            if pdf_path:
+                validate_extraction_request(pdf_path, subject)
         
-        # Process question paper if provided
-        if question_pdf_path:
-            logger.info(f"Processing question paper: {question_pdf_path}")
-            results['questions'] = process_question_paper(question_pdf_path, subject)
+        results = {}
         
-        # Process answer key if provided
-        if answer_pdf_path:
-            logger.info(f"Processing answer key: {answer_pdf_path}")
-            results['answers'] = process_answer_key(answer_pdf_path, subject)
+        # The question paper and answer key are independent, so process them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = {}
+            if question_pdf_path:
+                futures['questions'] = executor.submit(process_question_paper, question_pdf_path, subject, force)
+            if answer_pdf_path:
+                futures['answers'] = executor.submit(process_answer_key, answer_pdf_path, subject, force)
+            
+            # Collect each result separately so one failure doesn't hide the other's outcome
+            for kind, future in futures.items():
+                try:
+                    results[kind] = future.result()
+                except Exception as e:
+                    results[kind] = {'status': 'error', 'error': str(e)}
+        
+        if any(result['status'] == 'error' for result in results.values()):
+            return jsonify({
+                'status': 'error',
+                'message': 'Extraction failed',
+                'results': results
+            }), 500
         
         return jsonify({
             'status': 'success',
@@ -269,8 +616,7 @@ def extract_all():
 def get_available_subjects():
     """Get list of available subjects"""
     try:
-        factory = SubjectExtractorFactory()
-        subjects = factory.get_available_subjects()
+        subjects = extractor_factory.get_available_subjects()
         
         return jsonify({
             'status': 'success',
@@ -294,7 +640,9 @@ def extract_folder_questions():
             raise BadRequest("folder_path is required")
         
         subject = data.get('subject', 'computer_applications')
+        force = wants_force(data)
         
+        validate_subject(subject)
         logger.info(f"Starting folder extraction: {folder_path}, subject: {subject}")
         
         # List all PDF files in the folder
@@ -306,32 +654,24 @@ def extract_folder_questions():
                 'message': f'No PDF files found in folder: {folder_path}'
             }), 404
         
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
+        if wants_async(data):
+            return jsonify({
+                'status': 'queued',
+                'folder_path': folder_path,
+                'subject': subject,
+                'total_files': len(pdf_files),
+                'jobs': [
+                    {'pdf_file': pdf_file, 'job_id': submit_job(process_question_paper, pdf_file, subject, force)}
+                    for pdf_file in pdf_files
+                ]
+            }), 202
         
-        for pdf_file in pdf_files:
-            logger.info(f"Processing {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Process the PDF
-                result = process_question_paper(pdf_gcs_path, subject)
-                result['pdf_file'] = pdf_file
-                results.append(result)
-                successful_extractions += 1
-                logger.info(f"Successfully processed {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
+        process_fn = partial(process_question_paper, force=force)
+        if wants_stream(data):
+            return stream_folder_results(pdf_files, process_fn, folder_path, subject)
+        
+        # Process the PDF files in parallel
+        results, successful_extractions, failed_extractions, skipped_extractions = process_folder_pdfs(pdf_files, process_fn, subject)
         
         return jsonify({
             'status': 'success',
@@ -340,6 +680,7 @@ def extract_folder_questions():
             'total_files': len(pdf_files),
             'successful_extractions': successful_extractions,
             'failed_extractions': failed_extractions,
+            'skipped_extractions': skipped_extractions,
             'results': results
         }), 200
         
@@ -362,7 +703,9 @@ def extract_folder_answers():
             raise BadRequest("folder_path is required")
         
         subject = data.get('subject', 'computer_applications')
+        force = wants_force(data)
         
+        validate_subject(subject)
         logger.info(f"Starting folder answer extraction: {folder_path}, subject: {subject}")
         
         # List all PDF files in the folder
@@ -374,32 +717,24 @@ def extract_folder_answers():
                 'message': f'No PDF files found in folder: {folder_path}'
             }), 404
         
-        # Process each PDF file
-        results = []
-        successful_extractions = 0
-        failed_extractions = 0
+        if wants_async(data):
+            return jsonify({
+                'status': 'queued',
+                'folder_path': folder_path,
+                'subject': subject,
+                'total_files': len(pdf_files),
+                'jobs': [
+                    {'pdf_file': pdf_file, 'job_id': submit_job(process_answer_key, pdf_file, subject, force)}
+                    for pdf_file in pdf_files
+                ]
+            }), 202
         
-        for pdf_file in pdf_files:
-            logger.info(f"Processing {pdf_file}")
-            try:
-                # Create full GCS path
-                pdf_gcs_path = f"gs://{BUCKET_NAME}/{pdf_file}"
-                
-                # Process the PDF
-                result = process_answer_key(pdf_gcs_path, subject)
-                result['pdf_file'] = pdf_file
-                results.append(result)
-                successful_extractions += 1
-                logger.info(f"Successfully processed {pdf_file}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process {pdf_file}: {str(e)}")
-                results.append({
-                    'pdf_file': pdf_file,
-                    'status': 'error',
-                    'error': str(e)
-                })
-                failed_extractions += 1
+        process_fn = partial(process_answer_key, force=force)
+        if wants_stream(data):
+            return stream_folder_results(pdf_files, process_fn, folder_path, subject)
+        
+        # Process the PDF files in parallel
+        results, successful_extractions, failed_extractions, skipped_extractions = process_folder_pdfs(pdf_files, process_fn, subject)
         
         return jsonify({
             'status': 'success',
@@ -408,6 +743,7 @@ def extract_folder_answers():
             'total_files': len(pdf_files),
             'successful_extractions': successful_extractions,
             'failed_extractions': failed_extractions,
+            'skipped_extractions': skipped_extractions,
             'results': results
         }), 200
         
@@ -417,6 +753,104 @@ def extract_folder_answers():
         logger.error(f"Error in extract_folder_answers: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/extract-folder-all', methods=['POST'])
+def extract_folder_all():
+    """Extract questions and answers from a book folder's question_papers/ and answer_keys/ in one pass"""
+    try:
+        data = request.get_json()
+        if not data:
+            raise BadRequest("No JSON data provided")
+        
+        folder_path = data.get('folder_path')
+        if not folder_path:
+            raise BadRequest("folder_path is required")
+        
+        subject = data.get('subject', 'computer_applications')
+        force = wants_force(data)
+        
+        validate_subject(subject)
+        logger.info(f"Starting folder question and answer extraction: {folder_path}, subject: {subject}")
+        
+        # One listing of the book folder covers both subfolders
+        folder_path = extract_filename_from_gcs_path(folder_path).strip('/')
+        subfolders = {
+            'questions': (data.get('question_subfolder', 'question_papers'), partial(process_question_paper, force=force)),
+            'answers': (data.get('answer_subfolder', 'answer_keys'), partial(process_answer_key, force=force)),
+        }
+        book_pdfs = bucket_manager.list_files_in_folder(folder_path, ".pdf", return_full_paths=False)
+        
+        tasks = []
+        kinds = []
+        for kind, (subfolder, process_fn) in subfolders.items():
+            prefix = f"{folder_path}/{subfolder}/"
+            for pdf_file in book_pdfs:
+                if pdf_file.startswith(prefix):
+                    tasks.append((pdf_file, process_fn))
+                    kinds.append(kind)
+        
+        if not tasks:
+            return jsonify({
+                'status': 'error',
+                'message': f'No PDF files found in {folder_path}/{subfolders["questions"][0]} or {folder_path}/{subfolders["answers"][0]}'
+            }), 404
+        
+        # Questions and answers share one pool, so both kinds keep all workers busy
+        results = {
+            kind: {'total_files': kinds.count(kind), 'successful_extractions': 0, 'failed_extractions': 0,
+                   'skipped_extractions': 0, 'results': []}
+            for kind in subfolders
+        }
+        ordered: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        count_keys = {'success': 'successful_extractions', 'error': 'failed_extractions', 'skipped': 'skipped_extractions'}
+        for i, result in iter_extraction_tasks(tasks, subject):
+            ordered[i] = result
+            results[kinds[i]][count_keys[result['status']]] += 1
+        
+        for kind, result in zip(kinds, ordered):
+            results[kind]['results'].append(result)
+        
+        return jsonify({
+            'status': 'success',
+            'folder_path': folder_path,
+            'subject': subject,
+            'total_files': len(tasks),
+            'successful_extractions': sum(r['successful_extractions'] for r in results.values()),
+            'failed_extractions': sum(r['failed_extractions'] for r in results.values()),
+            'skipped_extractions': sum(r['skipped_extractions'] for r in results.values()),
+            'results': results
+        }), 200
+        
+    except BadRequest as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error in extract_folder_all: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    """Get the status of a queued extraction job and, once done, its result or error"""
+    with jobs_lock:
+        future = jobs.get(job_id)
+    
+    if future is None:
+        # Queued by another worker or instance; its status object is the shared record
+        status = None
+        if len(job_id) == 32 and job_id.isalnum():
+            status = bucket_manager.download_json(job_status_path(job_id))
+        if status is None:
+            return jsonify({'error': f'Unknown job: {job_id}'}), 404
+        return jsonify(status), 200
+    
+    if not future.done():
+        status = 'running' if future.running() else 'queued'
+        return jsonify({'job_id': job_id, 'status': status, 'done': False}), 200
+    
+    error = future.exception()
+    if error is not None:
+        return jsonify({'job_id': job_id, 'status': 'error', 'done': True, 'error': str(error)}), 200
+    
+    return jsonify({'job_id': job_id, 'status': 'completed', 'done': True, 'result': future.result()}), 200
+
 @app.route('/list-folder-files', methods=['POST'])
 def list_folder_files():
     """List all PDF files in a folder"""
@@ -450,6 +884,29 @@ def list_folder_files():
         logger.error(f"Error in list_folder_files: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+def serve(port: int) -> None:
+    """
+    Replace this process with gunicorn serving the app
+    
+    Handlers mostly wait on GCS and Vertex AI, so threaded workers (workers x threads
+    concurrent requests) keep the instance busy where the Werkzeug dev server would
+    handle one request at a time.
+    """
+    workers = os.getenv('WEB_CONCURRENCY', str(os.cpu_count() or 1))
+    os.execv(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '--workers', workers,
+        '--worker-class', 'gthread',
+        '--threads', str(GUNICORN_THREADS),
+        '--timeout', '600',
+        '--bind', f"0.0.0.0:{port}",
+        '--chdir', os.path.dirname(os.path.abspath(__file__)),
+        'main:app'
+    ])
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    if os.environ.get('FLASK_DEV_SERVER', 'false').lower() == 'true':
+        app.run(host='0.0.0.0', port=port, debug=False)
+    else:
+        serve(port)
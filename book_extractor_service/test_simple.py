@@ -4,8 +4,14 @@ Simple test script to verify book extractor structure
 """
 
 import sys
+import time
+import tempfile
+import threading
 from pathlib import Path
 
+# Add parent directory to path for utils import
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 def test_file_structure():
     """Test that all required files exist"""
     required_files = [
@@ -141,6 +147,261 @@ def test_workflow_files():
         print("✅ All workflow files exist")
         return True
 
+def test_json_recovery():
+    """Test that JSON is recovered from the shapes of Gemini responses seen in practice"""
+    try:
+        from vertex.extractor import VertexAIPDFExtractor
+        
+        # clean_json_response needs no client, so skip Vertex AI initialization
+        extractor = object.__new__(VertexAIPDFExtractor)
+        
+        cases = [
+            ("bare JSON", '{"questions": [{"question_number": 1}]}', None,
+             {"questions": [{"question_number": 1}]}),
+            ("fenced", '```json\n{"questions": [{"question_number": 1}]}\n```', None,
+             {"questions": [{"question_number": 1}]}),
+            ("fence without language", '```\n{"answers": []}\n```', None, {"answers": []}),
+            ("trailing commas", '{"questions": [{"question_number": 1,},],}', None,
+             {"questions": [{"question_number": 1}]}),
+            ("prose around", 'Here is the JSON:\n{"questions": []}\nLet me know {if} you need more.', None,
+             {"questions": []}),
+            ("stray brace before", 'Using {braces} loosely {"questions": []}', None, {"questions": []}),
+            ("key selects object", '{"note": "first"} then {"questions": [1]}', "questions", {"questions": [1]}),
+            ("no JSON", 'Sorry, I could not read this document.', None, None),
+            ("no object with key", '{"note": "only this"}', "questions", None),
+            ("empty", '', None, None),
+        ]
+        
+        failed = []
+        for name, text, key, expected in cases:
+            if extractor.clean_json_response(text, key) != expected:
+                failed.append(name)
+        
+        if failed:
+            print(f"❌ JSON recovery failed for: {failed}")
+            return False
+        else:
+            print("✅ JSON recovery handles all response shapes")
+            return True
+            
+    except Exception as e:
+        print(f"❌ JSON recovery test failed: {e}")
+        return False
+
+def drain(generator):
+    """Collect a generator's items and its return value"""
+    items = []
+    while True:
+        try:
+            items.append(next(generator))
+        except StopIteration as stop:
+            return items, stop.value
+
+def test_stream_items():
+    """Test that streamed items are parsed whatever the chunk boundaries"""
+    try:
+        from vertex.extractor import iter_stream_items
+        
+        # Strings hold brackets, braces and the array key itself to trip naive marker logic
+        text = ('{"batch_info": {"batch_number": 1}, "questions": [\n'
+                '  {"question_number": 1, "question_text": "Fill in: [ ] and { }"},\n'
+                '  {"question_number": 2, "question_text": "Quote \\"questions\\": [1]", "parts": [{"a": 1}]}\n'
+                ']}')
+        expected = [
+            {"question_number": 1, "question_text": "Fill in: [ ] and { }"},
+            {"question_number": 2, "question_text": 'Quote "questions": [1]', "parts": [{"a": 1}]},
+        ]
+        
+        failed = []
+        # Every single split point, then one character per chunk
+        splits = [[text[:i], text[i:]] for i in range(len(text) + 1)] + [list(text)]
+        for chunks in splits:
+            items, complete = drain(iter_stream_items(iter(chunks), 'questions'))
+            if items != expected or complete is not True:
+                failed.append(len(chunks[0]) if len(chunks) == 2 else 'per character')
+        
+        # A stream cut off mid-array yields the complete items and reports it is incomplete
+        cut = text.index('"question_number": 2') + 5
+        items, complete = drain(iter_stream_items(iter([text[:cut]]), 'questions'))
+        if items != expected[:1] or complete is not False:
+            failed.append('truncated')
+        
+        # No array at all
+        items, complete = drain(iter_stream_items(iter(['{"error": "none"}']), 'questions'))
+        if items or complete is not False:
+            failed.append('missing array')
+        
+        if failed:
+            print(f"❌ Stream parsing failed for splits: {failed[:10]}")
+            return False
+        else:
+            print("✅ Stream parsing handles every chunk boundary")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Stream parsing test failed: {e}")
+        return False
+
+def test_concurrency_limits():
+    """Test the adaptive semaphore and the rate limiter"""
+    try:
+        from vertex.adaptive_semaphore import AdaptiveSemaphore
+        from vertex.rate_limiter import RateLimiter
+        
+        errors = []
+        
+        semaphore = AdaptiveSemaphore(initial=4, minimum=1, maximum=5, increase_after=2)
+        limits = []
+        for _ in range(3):
+            semaphore.on_failure()
+            limits.append(semaphore.limit)
+        if limits != [2, 1, 1]:
+            errors.append(f"failures should halve the limit down to the minimum, got {limits}")
+        
+        for _ in range(2):
+            semaphore.on_success()
+        if semaphore.limit != 2:
+            errors.append(f"increase_after successes should add one, got {semaphore.limit}")
+        
+        # A third holder waits until a slot is released
+        semaphore.acquire()
+        semaphore.acquire()
+        waiter = threading.Thread(target=semaphore.acquire)
+        waiter.start()
+        waiter.join(0.2)
+        if not waiter.is_alive():
+            errors.append("acquire did not wait at the limit")
+        semaphore.release()
+        waiter.join(2)
+        if waiter.is_alive():
+            errors.append("release did not wake the waiting holder")
+        
+        # 5 calls at 20 per second take at least 4 intervals of 50 ms
+        limiter = RateLimiter(20)
+        started = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        if time.monotonic() - started < 0.19:
+            errors.append("rate limiter let calls start too fast")
+        
+        started = time.monotonic()
+        unlimited = RateLimiter(0)
+        for _ in range(1000):
+            unlimited.acquire()
+        if time.monotonic() - started > 0.5:
+            errors.append("rate 0 should not limit")
+        
+        if errors:
+            print(f"❌ Concurrency limits: {errors}")
+            return False
+        else:
+            print("✅ Concurrency limits behave as configured")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Concurrency limit test failed: {e}")
+        return False
+
+def test_response_cache():
+    """Test the on-disk response cache"""
+    try:
+        from vertex.response_cache import ResponseCache
+        
+        errors = []
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            key = ResponseCache.make_key("model", b"%PDF-1.4", "prompt")
+            
+            if cache.get(key) is not None:
+                errors.append("empty cache returned a value")
+            cache.put(key, '{"questions": ["ü"]}')
+            if cache.get(key) != '{"questions": ["ü"]}':
+                errors.append("stored response not returned")
+            if (cache.hits, cache.misses) != (1, 1):
+                errors.append(f"counters are {(cache.hits, cache.misses)}")
+            if ResponseCache(cache_dir).get(key) is None:
+                errors.append("entry not visible to a new cache on the same directory")
+            if list(Path(cache_dir).glob('*.tmp')):
+                errors.append("temporary files left behind")
+        
+        if ResponseCache.make_key("ab", "c") == ResponseCache.make_key("a", "bc"):
+            errors.append("different splits of the same text share a key")
+        if ResponseCache.make_key("prompt") != ResponseCache.make_key(b"prompt"):
+            errors.append("str and its UTF-8 bytes should share a key")
+        
+        if errors:
+            print(f"❌ Response cache: {errors}")
+            return False
+        else:
+            print("✅ Response cache stores and finds responses")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Response cache test failed: {e}")
+        return False
+
+def test_merge_batches():
+    """Test that consecutive batches are merged up to the per-call item limit"""
+    try:
+        from vertex.extractor import VertexAIPDFExtractor
+        
+        cases = [
+            ([(1, 1, 5), (2, 6, 10), (3, 11, 15)], 10, [(1, 1, 10), (2, 11, 15)]),
+            ([(1, 1, 5), (2, 6, 10), (3, 11, 15)], 15, [(1, 1, 15)]),
+            ([(1, 1, 5), (2, 6, 10)], 4, [(1, 1, 5), (2, 6, 10)]),
+            # A gap between ranges is never bridged
+            ([(1, 1, 5), (2, 8, 10)], 20, [(1, 1, 5), (2, 8, 10)]),
+            ([], 10, []),
+        ]
+        
+        failed = [
+            (batches, items_per_call) for batches, items_per_call, expected in cases
+            if VertexAIPDFExtractor.merge_batches(batches, items_per_call) != expected
+        ]
+        
+        if failed:
+            print(f"❌ Batch merging failed for: {failed}")
+            return False
+        else:
+            print("✅ Batch merging looks good")
+            return True
+            
+    except Exception as e:
+        print(f"❌ Batch merging test failed: {e}")
+        return False
+
+def test_ndjson_documents():
+    """Test that NDJSON extraction documents round-trip"""
+    try:
+        from utils.gcp.bucket_manager import iter_ndjson, parse_ndjson, serialize_document
+        
+        documents = [
+            {"document_info": {"title": "Paper"}, "questions": [{"question_number": 1, "question_text": "a\nb"},
+                                                              {"question_number": 2}]},
+            {"document_info": {"title": "Key"}, "answers": []},
+            {"status": "no items"},
+        ]
+        
+        failed = []
+        for document in documents:
+            lines = list(iter_ndjson(document))
+            items = document.get("questions", document.get("answers", []))
+            if len(lines) != 1 + len(items) or not all(line.endswith(b"\n") for line in lines):
+                failed.append(f"line layout of {document}")
+            if parse_ndjson(serialize_document(document, 'ndjson')) != document:
+                failed.append(f"round trip of {document}")
+        
+        if failed:
+            print(f"❌ NDJSON documents: {failed}")
+            return False
+        else:
+            print("✅ NDJSON documents round-trip")
+            return True
+            
+    except Exception as e:
+        print(f"❌ NDJSON test failed: {e}")
+        return False
+
 def main():
     """Run simple tests"""
     print("🧪 Book Extractor Simple Tests")
@@ -152,6 +413,12 @@ def main():
         ("Subject Mapper", test_subject_mapper_structure),
         ("Dockerfile", test_dockerfile),
         ("Workflow Files", test_workflow_files),
+        ("JSON Recovery", test_json_recovery),
+        ("Stream Parsing", test_stream_items),
+        ("Concurrency Limits", test_concurrency_limits),
+        ("Response Cache", test_response_cache),
+        ("Batch Merging", test_merge_batches),
+        ("NDJSON Documents", test_ndjson_documents),
     ]
     
     passed = 0
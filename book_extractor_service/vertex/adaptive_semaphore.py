@@ -0,0 +1,71 @@
+# Adaptive Concurrency Limiter Module
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveSemaphore:
+    """
+    Semaphore whose limit adapts to backend throttling (AIMD)
+    
+    The limit is halved whenever a call is rate limited and grows by one after
+    every `increase_after` consecutive successes, keeping the number of in-flight
+    Vertex AI calls near what the quota can sustain.
+    """
+    
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 32, increase_after: int = 5):
+        """
+        Initialize the adaptive semaphore
+        
+        Args:
+            initial: Starting number of concurrent holders
+            minimum: Lowest limit a failure can shrink to
+            maximum: Highest limit successes can grow to
+            increase_after: Consecutive successes needed to raise the limit by one
+        """
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(max(initial, self.minimum), self.maximum)
+        self.increase_after = max(1, increase_after)
+        
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = threading.Condition()
+    
+    def acquire(self) -> None:
+        """Wait until fewer than `limit` holders are in flight, then take a slot"""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+    
+    def release(self) -> None:
+        """Give a slot back"""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+    
+    def on_success(self) -> None:
+        """Record a successful call; additively raise the limit"""
+        with self._condition:
+            self._successes += 1
+            if self._successes >= self.increase_after and self.limit < self.maximum:
+                self._successes = 0
+                self.limit += 1
+                self._condition.notify()
+    
+    def on_failure(self) -> None:
+        """Record a rate-limited call; multiplicatively lower the limit"""
+        with self._condition:
+            self._successes = 0
+            new_limit = max(self.minimum, self.limit // 2)
+            if new_limit != self.limit:
+                logger.warning(f"Vertex AI throttled, reducing concurrency from {self.limit} to {new_limit}")
+                self.limit = new_limit
+    
+    def __enter__(self) -> "AdaptiveSemaphore":
+        self.acquire()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -1,31 +1,260 @@
 import vertexai
 from vertexai.generative_models import GenerativeModel, Part
+from vertexai.batch_prediction import BatchPredictionJob
+from vertexai.preview import caching
+from google.cloud import storage
+import io
 import json
+import base64
+import hashlib
+import weakref
+import orjson
+import asyncio
 import re
-from typing import Dict, Optional, List, Any
-from dataclasses import dataclass
+import time
+import datetime
+import threading
+import itertools
+from string import Template
+from uuid import uuid4
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Optional, List, Any, Union, BinaryIO, Tuple, Callable, Iterator, Generator, Mapping
+from dataclasses import dataclass, field
 import os
 import pathlib
 from google.auth import default
+from google.api_core.exceptions import ResourceExhausted
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from PyPDF2 import PdfReader, PdfWriter
 import logging
+from .adaptive_semaphore import AdaptiveSemaphore
+from .rate_limiter import RateLimiter
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Split PDFs longer than this many pages into page windows extracted separately (0 disables splitting)
+PAGES_PER_REQUEST = int(os.getenv('PAGES_PER_REQUEST', '0'))
+
+# Page windows of one PDF extracted at the same time
+PAGE_CHUNK_WORKERS = int(os.getenv('PAGE_CHUNK_WORKERS', '3'))
+
+# Patterns used to clean up and recover JSON from model responses, compiled once
+_RE_JSON_FENCE = re.compile(r'```json\s*')
+_RE_FENCE = re.compile(r'```\s*')
+_RE_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_RE_CODE_BLOCK = re.compile(r'```[\s\S]*?```')
+_RE_FENCE_LANG = re.compile(r'```[a-z]*\s*')
+_RE_BACKTICKS = re.compile(r'```')
+
+# Parts built from local PDF files kept for reuse, keyed by (path, mtime, size); each holds a whole PDF
+PDF_PART_CACHE_SIZE = int(os.getenv('PDF_PART_CACHE_SIZE', '4'))
+
+# Lifetime of a PDF's context cache; it is deleted as soon as its batches finish
+CONTEXT_CACHE_TTL = datetime.timedelta(seconds=int(os.getenv('VERTEX_CONTEXT_CACHE_TTL', '3600')))
+
+# Seconds between status checks of a Gemini batch prediction job
+BATCH_POLL_SECONDS = float(os.getenv('VERTEX_BATCH_POLL_SECONDS', '30'))
+
+# Generic prompts used when no subject extractor is given; parsed once, filled per call
+GENERIC_EXTRACTION_PROMPT = Template("""
+You are a precision document extraction specialist. Extract ${item_name}s $start_num to $end_num from this PDF document with ABSOLUTE ACCURACY.
+
+MANDATORY REQUIREMENTS:
+1. Focus EXCLUSIVELY on ${item_name}s $start_num through $end_num - ignore all others
+2. Extract EVERY SINGLE WORD exactly as written
+3. Preserve ALL formatting: newlines, spacing, indentation, bullet points
+4. Include ALL content for each $item_name - no truncation or summarization
+5. For multi-part questions/answers: include ALL parts (a), (b), (c), etc.
+6. Copy tables cell by cell if present
+7. Return ONLY valid JSON - no explanations, notes, or markdown
+
+For each $item_name, provide:
+$field_descriptions
+
+RETURN ONLY THIS JSON STRUCTURE:
+
+$json_schema
+
+Begin extraction now. Start response with { and end with }. Extract ${item_name}s $start_num-$end_num ONLY.
+        """)
+
+GENERIC_QUESTION_OVERVIEW = """
+Analyze this PDF question paper and provide:
+1. Document title and subject information
+2. Total number of questions
+3. Section breakdown if applicable
+4. Question number ranges for each section
+
+This appears to be an educational question paper. Count all questions carefully.
+"""
+
+GENERIC_ANSWER_OVERVIEW = """
+Analyze this PDF answer key and provide:
+1. Document title and subject information  
+2. Total number of answers/solutions
+3. Section breakdown if applicable
+4. Answer number ranges for each section
+
+This appears to be an answer key or solution manual. Count all answers/solutions carefully.
+"""
+
+OVERVIEW_PROMPT = Template("""
+$analysis_prompt
+
+Return JSON only:
+{
+  "document_info": {
+    "title": "document title",
+    "subject": "subject name", 
+    "class": "class level",
+    "total_${item_name}s": $expected_total,
+    "document_type": "$content_type"
+  },
+  "sections": [
+    {"name": "section_name", "start": 1, "end": 16}
+  ]
+}
+        """)
+
+def split_gcs_uri(uri: str) -> Tuple[str, str]:
+    """Split gs://bucket/path into (bucket, path)"""
+    bucket, _, path = uri[len('gs://'):].partition('/')
+    return bucket, path
+
+def read_batch_output(output_path: str) -> Tuple[Optional[Dict], List[Dict]]:
+    """
+    Read a batch output file written by extract_all_content
+    
+    Returns (header, batch records), where the header holds document_info and the
+    batch plan the file was written for; a partly written last line from an
+    interrupted run is ignored.
+    """
+    header = None
+    records = []
+    with open(output_path, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                continue
+            if 'document_info' in record:
+                header = record
+            elif 'batch' in record:
+                records.append(record)
+    return header, records
+
+def iter_batch_output_items(output_path: str) -> Iterator[Dict]:
+    """Yield the items of a batch output file one at a time, in item order"""
+    _, records = read_batch_output(output_path)
+    for record in sorted(records, key=lambda r: r['start']):
+        yield from record['items']
+
+def iter_stream_items(chunks: Iterator[str], key: str) -> Generator[Dict, None, bool]:
+    """
+    Yield the objects of the key array of a streamed JSON response as each one completes
+    
+    Text after the array's opening bracket is decoded one element at a time with
+    raw_decode; an element cut off at the end of the text so far is retried once more
+    text arrives. The chunks are always consumed to the end, and the generator returns
+    whether the array's closing bracket was reached.
+    """
+    decoder = json.JSONDecoder()
+    marker = f'"{key}"'
+    buf = ''
+    in_array = False
+    done = False
+    for chunk in chunks:
+        if done:
+            continue
+        buf += chunk
+        
+        if not in_array:
+            i = buf.find(marker)
+            j = buf.find('[', i + len(marker)) if i != -1 else -1
+            if j == -1:
+                continue
+            buf = buf[j + 1:]
+            in_array = True
+        
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buf):
+                break
+            if buf[pos] == ']':
+                done = True
+                break
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                break
+            if isinstance(item, dict):
+                yield item
+        buf = buf[pos:]
+    
+    return done
+
+def split_pdf_pages(pdf_data: bytes, pages_per_chunk: int) -> List[bytes]:
+    """
+    Split a PDF into in-memory PDFs of at most pages_per_chunk pages each
+    
+    Args:
+        pdf_data: Raw PDF bytes
+        pages_per_chunk: Maximum pages per chunk
+        
+    Returns:
+        List of PDF chunks in page order (just [pdf_data] if it fits in one chunk)
+    """
+    reader = PdfReader(io.BytesIO(pdf_data))
+    total_pages = len(reader.pages)
+    if total_pages <= pages_per_chunk:
+        return [pdf_data]
+    
+    chunks = []
+    for start in range(0, total_pages, pages_per_chunk):
+        writer = PdfWriter()
+        for page_num in range(start, min(start + pages_per_chunk, total_pages)):
+            writer.add_page(reader.pages[page_num])
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        chunks.append(buffer.getvalue())
+    
+    return chunks
+
 @dataclass
+class CachedPdf:
+    """A PDF held in a Vertex AI context cache, used by batch calls in place of its Part"""
+    part: Part
+    cached_content: Any
+    model: GenerativeModel
+
+@dataclass(frozen=True, slots=True)
 class ExtractionConfig:
-    """Configuration for different types of content extraction"""
+    """Configuration for different types of content extraction (immutable, so one instance can be shared across threads)"""
     content_type: str
     item_name: str  # "question" or "answer"
     batch_size: int
     expected_total: int
-    fields: Dict[str, str]  # field_name: description
+    fields: Mapping[str, str]  # field_name: description
+    
+    # Rendered from fields once, since every batch prompt repeats them
+    field_examples_block: str = field(init=False, repr=False)
+    field_descriptions_block: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        # Frozen, so the derived blocks are set through object.__setattr__
+        object.__setattr__(self, 'field_examples_block', "\n".join(
+            f'      "{field_name}": "{description}"' for field_name, description in self.fields.items()
+        ))
+        object.__setattr__(self, 'field_descriptions_block', "\n".join(
+            f"- {field_name}: {description}" for field_name, description in self.fields.items()
+        ))
     
     def get_json_schema(self, batch_number: int, start_num: int, end_num: int) -> str:
         """Generate JSON schema based on fields"""
-        field_examples = []
-        for field_name, description in self.fields.items():
-            field_examples.append(f'      "{field_name}": "{description}"')
-        
         return f'''{{
   "batch_info": {{
     "batch_number": {batch_number},
@@ -34,49 +263,326 @@ class ExtractionConfig:
   }},
   "{self.item_name}s": [
     {{
-{chr(10).join(field_examples)}
+{self.field_examples_block}
     }}
   ]
 }}'''
 
 class VertexAIPDFExtractor:
-    def __init__(self, project_id: str, location: str = "us-central1"):
-        """Initialize Vertex AI with project and location"""
+    # Shared by all instances: the same file yields the same Part whichever extractor loads it
+    _pdf_parts: "OrderedDict[tuple, Part]" = OrderedDict()
+    _pdf_parts_lock = threading.Lock()
+    # Response cache identity of each PDF Part (URI or content digest), worked out once per Part
+    _pdf_identities: "weakref.WeakKeyDictionary[Part, str]" = weakref.WeakKeyDictionary()
+    
+    def __init__(self, project_id: str, location: str = "us-central1",
+                 limiter: Optional[AdaptiveSemaphore] = None,
+                 api_transport: str = os.getenv('VERTEX_AI_TRANSPORT', 'grpc'),
+                 rate_limiter: Optional[RateLimiter] = None,
+                 api_endpoint: Optional[str] = os.getenv('VERTEX_AI_API_ENDPOINT'),
+                 batch_workers: int = int(os.getenv('BATCH_WORKERS', '8')),
+                 use_batch_api: bool = os.getenv('VERTEX_USE_BATCH_API', 'false').lower() == 'true',
+                 batch_output_uri: Optional[str] = os.getenv('VERTEX_BATCH_OUTPUT_URI'),
+                 use_async: bool = os.getenv('VERTEX_AI_ASYNC', 'false').lower() == 'true',
+                 cache_dir: Optional[str] = os.getenv('VERTEX_CACHE_DIR'),
+                 skip_overview: bool = os.getenv('VERTEX_SKIP_OVERVIEW', 'false').lower() == 'true',
+                 items_per_call: int = int(os.getenv('VERTEX_ITEMS_PER_CALL', '0')),
+                 use_context_cache: bool = os.getenv('VERTEX_CONTEXT_CACHE', 'false').lower() == 'true',
+                 stream_responses: bool = os.getenv('VERTEX_STREAM_RESPONSES', 'false').lower() == 'true'):
+        """
+        Initialize Vertex AI with project and location
+        
+        limiter bounds concurrent Gemini calls and rate_limiter caps how many start per
+        second; api_transport selects 'grpc' (protobuf over one multiplexed HTTP/2 channel) or 'rest';
+        api_endpoint optionally pins the client to one endpoint (e.g. us-central1-aiplatform.googleapis.com).
+        Create one instance per process and share it so that channel is reused by every call.
+        batch_workers is how many batches of one document are extracted at the same time,
+        as threads or, with use_async, as generate_content_async calls on one long-lived event
+        loop thread owned by the extractor (the SDK's async client is bound to the loop that first uses it).
+        use_batch_api sends the batches of gs:// PDFs as one Gemini batch prediction job
+        (about half the price, but minutes of queueing) whose files go under batch_output_uri.
+        cache_dir enables an on-disk cache of responses keyed by (model, PDF, prompt).
+        skip_overview batches straight from config.expected_total, saving the overview call.
+        items_per_call merges consecutive batches into calls of up to that many items (0 keeps config.batch_size).
+        use_context_cache puts each PDF in a context cache that all of its batch calls reuse.
+        stream_responses streams threaded batch calls and parses items as they are generated.
+        """
         self.project_id = project_id
         self.location = location
+        self.limiter = limiter
+        self.rate_limiter = rate_limiter
+        self.batch_workers = batch_workers
+        self.use_async = use_async
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.skip_overview = skip_overview
+        self.items_per_call = items_per_call
+        self.use_context_cache = use_context_cache
+        self.stream_responses = stream_responses
+        self.model_name = "gemini-2.5-pro"
+        self.use_batch_api = use_batch_api and bool(batch_output_uri)
+        self.batch_output_uri = batch_output_uri.rstrip('/') if batch_output_uri else None
+        self._storage_client = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        
+        if use_batch_api and not batch_output_uri:
+            logger.warning("VERTEX_USE_BATCH_API is set without VERTEX_BATCH_OUTPUT_URI; using online calls")
         
         # Initialize Vertex AI
         try:
-            vertexai.init(project=project_id, location=location)
-            self.model = GenerativeModel("gemini-2.5-pro")
-            logger.info(f"Vertex AI initialized successfully - Project: {project_id}, Location: {location}")
+            vertexai.init(project=project_id, location=location, api_transport=api_transport,
+                          api_endpoint=api_endpoint)
+            self.model = GenerativeModel(self.model_name)
+            logger.info(f"Vertex AI initialized successfully - Project: {project_id}, Location: {location}, Transport: {api_transport}")
         except Exception as e:
             logger.error(f"Failed to initialize Vertex AI: {e}")
             raise
     
-    def upload_pdf(self, pdf_path: str) -> Optional[Part]:
-        """Convert PDF to Part object for Vertex AI"""
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, max=20),
+           retry=retry_if_exception_type(ResourceExhausted), reraise=True)
+    def generate_content(self, contents: List[Any], model: Optional[GenerativeModel] = None):
+        """Call Gemini (self.model unless another model is given) under the configured limits, retrying throttled calls with backoff"""
+        model = model or self.model
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        if self.limiter is None:
+            return model.generate_content(contents)
+        
+        with self.limiter:
+            try:
+                response = model.generate_content(contents)
+            except ResourceExhausted:
+                self.limiter.on_failure()
+                raise
+        
+        self.limiter.on_success()
+        return response
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, max=20),
+           retry=retry_if_exception_type(ResourceExhausted), reraise=True)
+    async def generate_content_async(self, contents: List[Any], model: Optional[GenerativeModel] = None):
+        """Async generate_content; the blocking limiter waits are moved off the event loop"""
+        model = model or self.model
+        if self.rate_limiter is not None:
+            await asyncio.to_thread(self.rate_limiter.acquire)
+        
+        if self.limiter is None:
+            return await model.generate_content_async(contents)
+        
+        await self.acquire_limiter_async()
         try:
-            # Check file size
-            file_size = os.path.getsize(pdf_path)
-            file_size_mb = file_size / (1024 * 1024)
-            logger.info(f"File size: {file_size_mb:.2f} MB")
+            response = await model.generate_content_async(contents)
+        except ResourceExhausted:
+            self.limiter.on_failure()
+            raise
+        finally:
+            self.limiter.release()
+        
+        self.limiter.on_success()
+        return response
+    
+    async def acquire_limiter_async(self) -> None:
+        """Take a concurrency slot without blocking the event loop
+        
+        The blocking acquire runs in a worker thread that can't be interrupted, so if the
+        waiting task is cancelled the slot is given back as soon as that thread gets it.
+        """
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.limiter.acquire))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            acquire.add_done_callback(
+                lambda done: done.cancelled() or done.exception() is not None or self.limiter.release()
+            )
+            raise
+    
+    def run_async(self, coro):
+        """Run a coroutine on the extractor's event loop thread and wait for its result
+        
+        Every document shares this one loop, so the SDK's async client is always used from
+        the loop it was created on, however many threads call in.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="vertex-ai-async", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, max=20),
+           retry=retry_if_exception_type(ResourceExhausted), reraise=True)
+    def start_stream(self, contents: List[Any], model: Optional[GenerativeModel] = None) -> Tuple[Any, Iterator[Any]]:
+        """Start a streamed Gemini call and wait for its first chunk, retrying throttled calls with backoff"""
+        model = model or self.model
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        responses = iter(model.generate_content(contents, stream=True))
+        return next(responses, None), responses
+    
+    def generate_text_stream(self, pdf_part: Union[Part, CachedPdf], prompt: str) -> Iterator[str]:
+        """Yield Gemini's response text chunk by chunk as it is generated; the whole text is cached once complete"""
+        key = self.response_cache_key(pdf_part, prompt) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        contents, model = self.request_contents(pdf_part, prompt)
+        parts = []
+        
+        # The concurrency slot is held until the last chunk arrives
+        if self.limiter is not None:
+            self.limiter.acquire()
+        try:
+            try:
+                first, responses = self.start_stream(contents, model)
+            except ResourceExhausted:
+                if self.limiter is not None:
+                    self.limiter.on_failure()
+                raise
+            
+            for response in itertools.chain([first] if first is not None else [], responses):
+                try:
+                    text = response.text
+                except ValueError:
+                    # A chunk without text parts (e.g. only the finish reason)
+                    continue
+                if text:
+                    parts.append(text)
+                    yield text
+        finally:
+            if self.limiter is not None:
+                self.limiter.release()
+        
+        if self.limiter is not None:
+            self.limiter.on_success()
+        
+        text = ''.join(parts).strip()
+        if key and text:
+            self.cache.put(key, text)
+    
+    def response_cache_key(self, pdf_part: Union[Part, CachedPdf], prompt: str) -> str:
+        """Cache key of a call: GCS PDFs are identified by URI, inline PDFs by a digest of their content"""
+        if isinstance(pdf_part, CachedPdf):
+            pdf_part = pdf_part.part
+        return ResponseCache.make_key(self.model_name, self.pdf_identity(pdf_part), prompt)
+    
+    def pdf_identity(self, pdf_part: Part) -> str:
+        """Get a Part's response cache identity; Parts not built by pdf_part_from_data are inspected once"""
+        with self._pdf_parts_lock:
+            identity = self._pdf_identities.get(pdf_part)
+        if identity is not None:
+            return identity
+        
+        part = pdf_part.to_dict()
+        if 'file_data' in part:
+            identity = part['file_data'].get('file_uri', '')
+        else:
+            identity = hashlib.sha256(base64.b64decode(part.get('inline_data', {}).get('data', ''))).hexdigest()
+        
+        with self._pdf_parts_lock:
+            self._pdf_identities[pdf_part] = identity
+        return identity
+    
+    def pdf_part_from_data(self, pdf_data: bytes) -> Part:
+        """Build an inline PDF Part, hashing its bytes up front when responses are cached"""
+        pdf_part = Part.from_data(data=pdf_data, mime_type="application/pdf")
+        if self.cache:
+            with self._pdf_parts_lock:
+                self._pdf_identities[pdf_part] = hashlib.sha256(pdf_data).hexdigest()
+        return pdf_part
+    
+    def request_contents(self, pdf_part: Union[Part, CachedPdf], prompt: str) -> Tuple[List[Any], Optional[GenerativeModel]]:
+        """Get the contents and model of a call; a cached PDF is already in its model's context"""
+        if isinstance(pdf_part, CachedPdf):
+            return [prompt], pdf_part.model
+        return [pdf_part, prompt], None
+    
+    def cache_pdf(self, pdf_part: Part) -> Optional[CachedPdf]:
+        """Put the PDF in a Vertex AI context cache so batch calls send only their prompt; None if that fails"""
+        try:
+            cached_content = caching.CachedContent.create(model_name=self.model_name, contents=[pdf_part],
+                                                          ttl=CONTEXT_CACHE_TTL)
+            logger.info(f"Created context cache {cached_content.name} for the PDF")
+            return CachedPdf(pdf_part, cached_content, GenerativeModel.from_cached_content(cached_content=cached_content))
+        except Exception as e:
+            logger.warning(f"Could not create context cache, sending the PDF with every call: {e}")
+            return None
+    
+    def generate_text(self, pdf_part: Union[Part, CachedPdf], prompt: str) -> Optional[str]:
+        """Get Gemini's stripped response text for a prompt about the PDF, served from the cache when possible"""
+        key = self.response_cache_key(pdf_part, prompt) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = self.generate_content(*self.request_contents(pdf_part, prompt))
+        text = response.text.strip() if response.text else None
+        
+        if key and text:
+            self.cache.put(key, text)
+        return text
+    
+    async def generate_text_async(self, pdf_part: Union[Part, CachedPdf], prompt: str) -> Optional[str]:
+        """Async counterpart of generate_text"""
+        key = self.response_cache_key(pdf_part, prompt) if self.cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = await self.generate_content_async(*self.request_contents(pdf_part, prompt))
+        text = response.text.strip() if response.text else None
+        
+        if key and text:
+            self.cache.put(key, text)
+        return text
+    
+    def upload_pdf(self, pdf_path: Union[str, bytes, BinaryIO]) -> Optional[Part]:
+        """Convert PDF (a gs:// URI, file path, raw bytes or a binary file object) to Part object for Vertex AI"""
+        try:
+            # GCS objects are read by Vertex AI directly, without passing through this process
+            if isinstance(pdf_path, str) and pdf_path.startswith('gs://'):
+                logger.info(f"Referencing {pdf_path} for Vertex AI processing")
+                return Part.from_uri(uri=pdf_path, mime_type="application/pdf")
+            
+            # In-memory PDFs skip the filesystem entirely
+            if not isinstance(pdf_path, str):
+                pdf_data = pdf_path if isinstance(pdf_path, bytes) else pdf_path.read()
+                logger.info(f"File size: {len(pdf_data) / (1024 * 1024):.2f} MB")
+                logger.info("Processing in-memory PDF with Vertex AI...")
+                return self.pdf_part_from_data(pdf_data)
             
-            if not os.path.exists(pdf_path):
+            # One stat gives both existence and size (and the cache key)
+            try:
+                stat = os.stat(pdf_path)
+            except FileNotFoundError:
                 logger.error(f"File not found: {pdf_path}")
                 return None
             
+            logger.info(f"File size: {stat.st_size / (1024 * 1024):.2f} MB")
+            
+            cache_key = (os.path.abspath(pdf_path), stat.st_mtime_ns, stat.st_size)
+            with self._pdf_parts_lock:
+                pdf_part = self._pdf_parts.get(cache_key)
+                if pdf_part is not None:
+                    self._pdf_parts.move_to_end(cache_key)
+                    logger.info(f"Reusing loaded {os.path.basename(pdf_path)} for Vertex AI processing")
+                    return pdf_part
+            
             logger.info(f"Processing {os.path.basename(pdf_path)} with Vertex AI...")
             
-            # Read PDF file and create Part object
-            with open(pdf_path, "rb") as f:
-                pdf_data = f.read()
+            # Read PDF file and create Part object; the bytes are handed over without another copy
+            pdf_part = self.pdf_part_from_data(pathlib.Path(pdf_path).read_bytes())
             
-            # Create Part object for Vertex AI
-            pdf_part = Part.from_data(
-                data=pdf_data,
-                mime_type="application/pdf"
-            )
+            if PDF_PART_CACHE_SIZE > 0:
+                with self._pdf_parts_lock:
+                    self._pdf_parts[cache_key] = pdf_part
+                    while len(self._pdf_parts) > PDF_PART_CACHE_SIZE:
+                        self._pdf_parts.popitem(last=False)
             
             logger.info("PDF loaded successfully for Vertex AI processing")
             return pdf_part
@@ -96,35 +602,14 @@ class VertexAIPDFExtractor:
                 return subject_extractor.get_answer_extraction_prompt(batch_number, start_num, end_num)
         
         # Fallback to generic prompt if no subject extractor provided
-        field_descriptions = []
-        for field_name, description in config.fields.items():
-            field_descriptions.append(f"- {field_name}: {description}")
-        
         json_schema = config.get_json_schema(batch_number, start_num, end_num)
         
-        return f"""
-You are a precision document extraction specialist. Extract {config.item_name}s {start_num} to {end_num} from this PDF document with ABSOLUTE ACCURACY.
-
-MANDATORY REQUIREMENTS:
-1. Focus EXCLUSIVELY on {config.item_name}s {start_num} through {end_num} - ignore all others
-2. Extract EVERY SINGLE WORD exactly as written
-3. Preserve ALL formatting: newlines, spacing, indentation, bullet points
-4. Include ALL content for each {config.item_name} - no truncation or summarization
-5. For multi-part questions/answers: include ALL parts (a), (b), (c), etc.
-6. Copy tables cell by cell if present
-7. Return ONLY valid JSON - no explanations, notes, or markdown
-
-For each {config.item_name}, provide:
-{chr(10).join(field_descriptions)}
-
-RETURN ONLY THIS JSON STRUCTURE:
-
-{json_schema}
-
-Begin extraction now. Start response with {{ and end with }}. Extract {config.item_name}s {start_num}-{end_num} ONLY.
-        """
+        return GENERIC_EXTRACTION_PROMPT.substitute(
+            item_name=config.item_name, start_num=start_num, end_num=end_num,
+            field_descriptions=config.field_descriptions_block, json_schema=json_schema
+        )
     
-    def extract_content_batch(self, pdf_part: Part, config: ExtractionConfig, 
+    def extract_content_batch(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig, 
                              batch_number: int, start_num: int, end_num: int, subject_extractor=None) -> Optional[str]:
         """Extract a specific batch of content using Vertex AI"""
         
@@ -132,10 +617,10 @@ Begin extraction now. Start response with {{ and end with }}. Extract {config.it
         
         try:
             # Generate content using Vertex AI
-            response = self.model.generate_content([pdf_part, prompt])
+            text = self.generate_text(pdf_part, prompt)
             
-            if response.text:
-                return response.text.strip()
+            if text:
+                return text
             else:
                 logger.error(f"No response text received for batch {batch_number}")
                 return None
@@ -151,50 +636,18 @@ Begin extraction now. Start response with {{ and end with }}. Extract {config.it
             analysis_prompt = subject_extractor.get_document_overview_prompt(config.content_type)
         else:
             # Fallback to generic prompt
-            if config.content_type == "questions":
-                analysis_prompt = f"""
-Analyze this PDF question paper and provide:
-1. Document title and subject information
-2. Total number of questions
-3. Section breakdown if applicable
-4. Question number ranges for each section
-
-This appears to be an educational question paper. Count all questions carefully.
-"""
-            else:  # answers
-                analysis_prompt = f"""
-Analyze this PDF answer key and provide:
-1. Document title and subject information  
-2. Total number of answers/solutions
-3. Section breakdown if applicable
-4. Answer number ranges for each section
-
-This appears to be an answer key or solution manual. Count all answers/solutions carefully.
-"""
-
-        prompt = f"""
-{analysis_prompt}
-
-Return JSON only:
-{{
-  "document_info": {{
-    "title": "document title",
-    "subject": "subject name", 
-    "class": "class level",
-    "total_{config.item_name}s": {config.expected_total},
-    "document_type": "{config.content_type}"
-  }},
-  "sections": [
-    {{"name": "section_name", "start": 1, "end": 16}}
-  ]
-}}
-        """
+            analysis_prompt = GENERIC_QUESTION_OVERVIEW if config.content_type == "questions" else GENERIC_ANSWER_OVERVIEW
+        
+        prompt = OVERVIEW_PROMPT.substitute(
+            analysis_prompt=analysis_prompt, item_name=config.item_name,
+            expected_total=config.expected_total, content_type=config.content_type
+        )
         
         try:
-            response = self.model.generate_content([pdf_part, prompt])
+            text = self.generate_text(pdf_part, prompt)
             
-            if response.text:
-                return self.clean_json_response(response.text.strip())
+            if text:
+                return self.clean_json_response(text)
             else:
                 return None
             
@@ -202,74 +655,282 @@ Return JSON only:
             logger.error(f"Error getting overview: {e}")
             return None
 
-    def clean_json_response(self, response_text: str) -> Optional[Dict]:
-        """Clean and extract JSON from response"""
+    def clean_json_response(self, response_text: str, key: Optional[str] = None) -> Optional[Dict]:
+        """
+        Clean and extract JSON from response
+        
+        Tries the text as-is, then without markdown fences, then also without trailing
+        commas, and finally with whole code blocks dropped. With key set, only an object
+        containing key is accepted.
+        """
         if not response_text:
             return None
+        
+        # The prompts ask for bare JSON, which most responses are; skip the cleanup for those
+        try:
+            result = orjson.loads(response_text)
+            if isinstance(result, dict) and (key is None or key in result):
+                return result
+        except orjson.JSONDecodeError:
+            pass
             
         # Remove markdown backticks completely - handle cases with or without json keyword
-        response_text = re.sub(r'```json\s*', '', response_text)
-        response_text = re.sub(r'```\s*', '', response_text)  # Handle backticks without language specifier too
+        text = _RE_JSON_FENCE.sub('', response_text)
+        text = _RE_FENCE.sub('', text)  # Handle backticks without language specifier too
         
-        # Extract JSON - find the first opening and last closing brace
-        start = response_text.find('{')
-        end = response_text.rfind('}') + 1
-        
-        if start == -1 or end == 0:
+        if text.find('{') == -1:
             logger.error("No valid JSON structure found in response")
             return None
+        
+        result = self.decode_first_object(text, key)
+        if result is None:
+            # Fix trailing commas which are common JSON parsing errors
+            result = self.decode_first_object(_RE_TRAILING_COMMA.sub(r'\1', text), key)
+        if result is None:
+            # The JSON may sit outside code blocks holding something else, so drop them whole
+            text = _RE_CODE_BLOCK.sub('', response_text)
+            text = _RE_BACKTICKS.sub('', _RE_FENCE_LANG.sub('', text))
+            result = self.decode_first_object(text, key)
+        if result is None:
+            logger.error("All JSON parsing attempts failed")
+        return result
+    
+    @staticmethod
+    def decode_first_object(text: str, key: Optional[str] = None) -> Optional[Dict]:
+        """
+        Decode the first complete JSON object in text (the first one containing key, if given)
+        
+        Walks forward from each '{' with raw_decode, so surrounding prose or trailing
+        garbage is ignored without any backtracking regex. After a failed decode the walk
+        resumes past the error position, so text is never rescanned and long non-JSON
+        responses stay linear.
+        """
+        decoder = json.JSONDecoder()
+        i = text.find('{')
+        
+        # Usually the object runs to the last brace; orjson parses that in one go
+        end = text.rfind('}')
+        if i != -1 and end > i:
+            try:
+                obj = orjson.loads(text[i:end + 1])
+                if isinstance(obj, dict) and (key is None or key in obj):
+                    return obj
+            except orjson.JSONDecodeError:
+                pass
+        
+        while i != -1:
+            try:
+                obj, _ = decoder.raw_decode(text, i)
+                if isinstance(obj, dict) and (key is None or key in obj):
+                    return obj
+                # Objects nested in this one may still hold key
+                i = text.find('{', i + 1)
+            except json.JSONDecodeError as e:
+                i = text.find('{', max(e.pos, i + 1))
+            except RecursionError:
+                # Nested deeper than the decoder can follow
+                i = text.find('{', i + 1)
+        return None
+    
+    @staticmethod
+    def section_number_range(overview: Dict, total_items: int) -> Optional[Tuple[int, int]]:
+        """Get the (first, last) item numbers covered by the overview's sections, if it lists usable ones"""
+        bounds = [
+            (section.get('start'), section.get('end'))
+            for section in overview.get('sections') or []
+            if isinstance(section, dict)
+        ]
+        starts = [start for start, _ in bounds if isinstance(start, int)]
+        ends = [end for _, end in bounds if isinstance(end, int)]
+        if not starts or not ends:
+            return None
+        
+        first = min(starts)
+        return first, max(max(ends), first + total_items - 1)
+    
+    async def extract_content_batch_async(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig,
+                                          batch_number: int, start_num: int, end_num: int,
+                                          subject_extractor=None) -> Optional[str]:
+        """Async counterpart of extract_content_batch"""
+        prompt = self.create_extraction_prompt(config, batch_number, start_num, end_num, subject_extractor)
+        
+        try:
+            text = await self.generate_text_async(pdf_part, prompt)
+            
+            if text:
+                return text
+            else:
+                logger.error(f"No response text received for batch {batch_number}")
+                return None
             
-        json_text = response_text[start:end]
+        except Exception as e:
+            logger.error(f"Error in batch {batch_number}: {e}")
+            return None
+    
+    def extract_batch_items(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig, batch_num: int,
+                            start_num: int, end_num: int, subject_extractor=None) -> List[Dict]:
+        """Extract one batch and parse its items"""
+        if end_num == start_num:
+            item_range = f"{config.item_name.title()} {start_num}"
+        else:
+            item_range = f"{config.item_name.title()}s {start_num}-{end_num}"
+        
+        logger.info(f"Extracting batch {batch_num}: {item_range}")
+        
+        if self.stream_responses:
+            return self.stream_batch_items(pdf_part, config, batch_num, start_num, end_num, subject_extractor)
+        
+        raw_response = self.extract_content_batch(pdf_part, config, batch_num, start_num, end_num, subject_extractor)
+        return self.parse_batch_items(raw_response, config, batch_num)
+    
+    def stream_batch_items(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig, batch_num: int,
+                           start_num: int, end_num: int, subject_extractor=None) -> List[Dict]:
+        """
+        Extract one batch over a streamed call, decoding items while later ones are still generated
         
+        If the array can't be decoded to its end incrementally (e.g. the JSON needs
+        repair), the full text goes through parse_batch_items instead.
+        """
+        prompt = self.create_extraction_prompt(config, batch_num, start_num, end_num, subject_extractor)
+        parts: List[str] = []
+        
+        def chunks() -> Iterator[str]:
+            for text in self.generate_text_stream(pdf_part, prompt):
+                parts.append(text)
+                yield text
+        
+        items = []
+        stream = iter_stream_items(chunks(), f'{config.item_name}s')
         try:
-            return json.loads(json_text)
-        except json.JSONDecodeError as e:
-            logger.error(f"JSON error: {e}")
-            # Try fixing common issues
-            try:
-                # Fix trailing commas which are common JSON parsing errors
-                fixed_json = re.sub(r',(\s*[}\]])', r'\1', json_text)
-                return json.loads(fixed_json)
-            except json.JSONDecodeError as e2:
-                logger.error(f"Additional fix attempt failed: {e2}")
-                # If we still can't parse, try more aggressive cleaning
+            while True:
+                items.append(next(stream))
+        except StopIteration as stop:
+            complete = stop.value
+        except Exception as e:
+            logger.error(f"Error in batch {batch_num}: {e}")
+            return []
+        
+        if not complete:
+            return self.parse_batch_items(''.join(parts).strip() or None, config, batch_num)
+        
+        logger.info(f"Batch {batch_num}: {len(items)} {config.item_name}s extracted (streamed)")
+        return items
+    
+    def parse_batch_items(self, raw_response: Optional[str], config: ExtractionConfig, batch_num: int) -> List[Dict]:
+        """Parse a batch response into its items (see clean_json_response for the recovery steps); returns [] if nothing usable came back"""
+        if not raw_response:
+            logger.error(f"Batch {batch_num}: No response received")
+            return []
+        
+        batch_result = self.clean_json_response(raw_response, f'{config.item_name}s')
+        if not batch_result:
+            logger.error(f"Batch {batch_num}: Failed to parse response - manual inspection required")
+            return []
+        
+        items = batch_result[f'{config.item_name}s']
+        logger.info(f"Batch {batch_num}: {len(items)} {config.item_name}s extracted")
+        
+        # Show extracted item numbers for verification
+        if items:
+            number_field = f'{config.item_name}_number'
+            numbers = [item.get(number_field) for item in items if item.get(number_field)]
+            if numbers:
+                logger.info(f"Extracted {config.item_name} numbers: {numbers}")
+        
+        return items
+    
+    def extract_batches(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig, batches: List[Tuple[int, int, int]],
+                        subject_extractor=None,
+                        on_batch: Optional[Callable[[int, List[Dict]], None]] = None) -> Dict[int, List[Dict]]:
+        """
+        Extract batches concurrently on a thread pool; returns batch_num -> items
+        
+        When on_batch is given each batch's items are handed to it as the batch
+        completes instead of being kept in the returned dict.
+        """
+        # Batches are independent network-bound calls, so run them concurrently (the
+        # extractor's rate limiter and concurrency limiter still bound the Gemini calls)
+        batch_items: Dict[int, List[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.batch_workers, len(batches)))) as executor:
+            futures = {
+                executor.submit(self.extract_batch_items, pdf_part, config, batch_num, start_num, end_num,
+                                subject_extractor): batch_num
+                for batch_num, start_num, end_num in batches
+            }
+            for future in as_completed(futures):
+                batch_num = futures[future]
                 try:
-                    # Try removing all non-JSON characters around the braces
-                    cleaner_json = re.search(r'({.*})', json_text, re.DOTALL)
-                    if cleaner_json:
-                        return json.loads(cleaner_json.group(1))
-                    return None
-                except:
-                    logger.error("All JSON parsing attempts failed")
-                    return None
+                    items = future.result()
+                except Exception as e:
+                    logger.error(f"Batch {batch_num}: {e}")
+                    continue
+                if on_batch:
+                    on_batch(batch_num, items)
+                else:
+                    batch_items[batch_num] = items
+        
+        return batch_items
+    
+    async def extract_batches_async(self, pdf_part: Union[Part, CachedPdf], config: ExtractionConfig,
+                                    batches: List[Tuple[int, int, int]], subject_extractor=None,
+                                    on_batch: Optional[Callable[[int, List[Dict]], None]] = None) -> Dict[int, List[Dict]]:
+        """Extract batches as overlapping async calls, at most batch_workers in flight; returns batch_num -> items (see extract_batches for on_batch)"""
+        semaphore = asyncio.Semaphore(max(1, self.batch_workers))
+        
+        async def run_one(batch_num: int, start_num: int, end_num: int) -> List[Dict]:
+            async with semaphore:
+                logger.info(f"Extracting batch {batch_num}: {config.item_name}s {start_num}-{end_num}")
+                raw_response = await self.extract_content_batch_async(pdf_part, config, batch_num, start_num,
+                                                                      end_num, subject_extractor)
+            items = self.parse_batch_items(raw_response, config, batch_num)
+            if on_batch:
+                on_batch(batch_num, items)
+                return []
+            return items
+        
+        responses = await asyncio.gather(*(run_one(*batch) for batch in batches), return_exceptions=True)
+        
+        batch_items: Dict[int, List[Dict]] = {}
+        for (batch_num, _, _), response in zip(batches, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Batch {batch_num}: {response}")
+            elif not on_batch:
+                batch_items[batch_num] = response
+        return batch_items
     
-    def extract_all_content(self, pdf_part: Part, config: ExtractionConfig, subject_extractor=None) -> Dict:
-        """Extract all content using batched approach with Vertex AI"""
+    def plan_batches(self, pdf_part: Part, config: ExtractionConfig, subject_extractor=None,
+                     use_section_range: bool = False) -> Tuple[List[Tuple[int, int, int]], Dict]:
+        """
+        Get the document overview and split its items into (batch_num, start, end) batches
         
-        logger.info(f"Getting document overview for {config.content_type}...")
-        overview = self.get_document_overview(pdf_part, config, subject_extractor)
+        With skip_overview (and no section range needed) the overview call is not made and
+        the batches cover 1..config.expected_total.
+        """
+        if self.skip_overview and not use_section_range and config.expected_total > 0:
+            logger.info(f"Skipping document overview, batching {config.expected_total} expected {config.item_name}s")
+            overview = None
+        else:
+            logger.info(f"Getting document overview for {config.content_type}...")
+            overview = self.get_document_overview(pdf_part, config, subject_extractor)
         
         if not overview:
-            logger.warning("Could not get document overview, using default batching...")
+            if not self.skip_overview:
+                logger.warning("Could not get document overview, using default batching...")
             total_items = config.expected_total
-            batch_size = config.batch_size
-            batches = []
-            for i in range(0, total_items, batch_size):
-                start = i + 1
-                end = min(i + batch_size, total_items)
-                batch_num = (i // batch_size) + 1
-                batches.append((batch_num, start, end))
         else:
             total_items = overview.get('document_info', {}).get(f'total_{config.item_name}s', config.expected_total)
-            batch_size = config.batch_size
-            batches = []
-            for i in range(0, total_items, batch_size):
-                start = i + 1
-                end = min(i + batch_size, total_items)
-                batch_num = (i // batch_size) + 1
-                batches.append((batch_num, start, end))
         
-        all_items = []
+        number_range = self.section_number_range(overview, total_items) if overview and use_section_range else None
+        first_num, last_num = number_range or (1, total_items)
+        
+        batch_size = config.batch_size
+        batches = []
+        for i in range(first_num - 1, last_num, batch_size):
+            start = i + 1
+            end = min(i + batch_size, last_num)
+            batch_num = ((i - first_num + 1) // batch_size) + 1
+            batches.append((batch_num, start, end))
+        
         document_info = overview.get('document_info') if overview else {
             "title": f"Sample {config.content_type.title()}",
             "subject": "Computer Applications",
@@ -278,66 +939,210 @@ Return JSON only:
             "document_type": config.content_type
         }
         
-        logger.info(f"Processing {len(batches)} batches with {config.batch_size} {config.item_name}s each using Vertex AI Gemini 2.5 Pro...")
+        if self.items_per_call > batch_size:
+            batches = self.merge_batches(batches, self.items_per_call)
+        
+        return batches, document_info
+    
+    @staticmethod
+    def merge_batches(batches: List[Tuple[int, int, int]], items_per_call: int) -> List[Tuple[int, int, int]]:
+        """
+        Coalesce consecutive batches into ranges of at most items_per_call items
         
-        for batch_num, start_num, end_num in batches:
-            if end_num == start_num:
-                item_range = f"{config.item_name.title()} {start_num}"
+        Each call repeats the whole instruction prompt, so fewer, wider ranges cut input
+        tokens; the merged ranges are renumbered from 1.
+        """
+        merged: List[List[int]] = []
+        for _, start_num, end_num in batches:
+            if merged and merged[-1][1] + 1 == start_num and end_num - merged[-1][0] + 1 <= items_per_call:
+                merged[-1][1] = end_num
             else:
-                item_range = f"{config.item_name.title()}s {start_num}-{end_num}"
-            
-            logger.info(f"Extracting batch {batch_num}: {item_range}")
-            
-            raw_response = self.extract_content_batch(pdf_part, config, batch_num, start_num, end_num, subject_extractor)
+                merged.append([start_num, end_num])
+        
+        return [(batch_num, start_num, end_num) for batch_num, (start_num, end_num) in enumerate(merged, 1)]
+    
+    def extract_all_content(self, pdf_part: Part, config: ExtractionConfig, subject_extractor=None,
+                            use_section_range: bool = False, output_path: Optional[str] = None) -> Dict:
+        """
+        Extract all content using batched approach with Vertex AI
+        
+        Items are requested as numbers 1..total unless use_section_range is set, in which
+        case the numbers come from the overview's sections. Page windows of a split PDF
+        need that because their numbering does not start at 1.
+        
+        With output_path set, each batch is appended to that JSONL file as it completes
+        (after a document_info line) rather than kept in memory, and the result holds
+        output_path and item_count instead of the items. Batches already in an existing
+        file are not extracted again, so an interrupted run resumes where it stopped.
+        """
+        if output_path:
+            return self.extract_all_content_to_file(pdf_part, config, output_path, subject_extractor,
+                                                    use_section_range)
+        
+        batches, document_info = self.plan_batches(pdf_part, config, subject_extractor, use_section_range)
+        all_items = []
+        
+        batch_items = self.run_batches(pdf_part, config, batches, subject_extractor)
+        
+        # Merge in batch order so item numbers stay sorted
+        for batch_num, _, _ in batches:
+            all_items.extend(batch_items.get(batch_num, []))
+        
+        logger.info(f"EXTRACTION SUMMARY: Total {config.item_name}s extracted: {len(all_items)}")
+        
+        return {
+            "document_info": document_info,
+            f"{config.item_name}s": all_items
+        }
+    
+    def run_batches(self, pdf_part: Part, config: ExtractionConfig, batches: List[Tuple[int, int, int]],
+                    subject_extractor=None,
+                    on_batch: Optional[Callable[[int, List[Dict]], None]] = None) -> Dict[int, List[Dict]]:
+        """Extract the batches of one PDF, sharing a context cache between them when enabled"""
+        logger.info(f"Processing {len(batches)} batches with {config.batch_size} {config.item_name}s each using Vertex AI Gemini 2.5 Pro...")
+        
+        # With several batches, cache the PDF once instead of re-sending it with every call
+        cached_pdf = self.cache_pdf(pdf_part) if self.use_context_cache and len(batches) > 1 else None
+        batch_part = cached_pdf or pdf_part
+        
+        try:
+            if self.use_async:
+                return self.run_async(self.extract_batches_async(batch_part, config, batches, subject_extractor, on_batch))
+            return self.extract_batches(batch_part, config, batches, subject_extractor, on_batch)
+        finally:
+            if cached_pdf:
+                try:
+                    cached_pdf.cached_content.delete()
+                except Exception as e:
+                    logger.warning(f"Could not delete context cache {cached_pdf.cached_content.name}: {e}")
+    
+    def extract_all_content_to_file(self, pdf_part: Part, config: ExtractionConfig, output_path: str,
+                                    subject_extractor=None, use_section_range: bool = False) -> Dict:
+        """
+        Extract all content, streaming each batch to output_path as JSONL (see extract_all_content)
+        
+        The header line records document_info and the batch plan. An existing file is resumed
+        with that plan, without a new overview call, so its finished batches always match.
+        """
+        header, done = None, []
+        if os.path.exists(output_path):
+            header, done = read_batch_output(output_path)
+        
+        if header is not None and isinstance(header.get('batches'), list):
+            batches = [tuple(batch) for batch in header['batches']]
+            document_info = header['document_info']
+        else:
+            done = []
+            batches, document_info = self.plan_batches(pdf_part, config, subject_extractor, use_section_range)
+            header = {"document_info": document_info, "batches": [list(batch) for batch in batches]}
+        
+        done_ranges = {(record['start'], record['end']) for record in done}
+        pending = [batch for batch in batches if (batch[1], batch[2]) not in done_ranges]
+        if done:
+            logger.info(f"Resuming {output_path}: {len(batches) - len(pending)} of {len(batches)} batches already extracted")
+        
+        ranges = {batch_num: (start_num, end_num) for batch_num, start_num, end_num in batches}
+        item_count = sum(len(record['items']) for record in done)
+        
+        # Rewrite the header and the finished records, so new records are never appended to a
+        # line cut off by an interrupted run (which would make them unreadable)
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            for record in [header, *done]:
+                f.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        os.replace(tmp_path, output_path)
+        
+        with open(output_path, 'ab') as f:
+            def write_batch(batch_num: int, items: List[Dict]) -> None:
+                nonlocal item_count
+                start_num, end_num = ranges[batch_num]
+                f.write(orjson.dumps({"batch": batch_num, "start": start_num, "end": end_num, "items": items},
+                                     option=orjson.OPT_APPEND_NEWLINE))
+                f.flush()
+                item_count += len(items)
             
-            if raw_response:
-                batch_result = self.clean_json_response(raw_response)
-                
-                if batch_result and f'{config.item_name}s' in batch_result:
-                    items = batch_result[f'{config.item_name}s']
-                    all_items.extend(items)
-                    logger.info(f"Batch {batch_num}: {len(items)} {config.item_name}s extracted")
-                    
-                    # Show extracted item numbers for verification
-                    if items:
-                        number_field = f'{config.item_name}_number'
-                        numbers = [item.get(number_field) for item in items if item.get(number_field)]
-                        if numbers:
-                            logger.info(f"Extracted {config.item_name} numbers: {numbers}")
-                else:
-                    logger.error(f"Batch {batch_num}: Failed to parse response")
-                    # Try more aggressive JSON recovery
-                    logger.info(f"Attempting to recover batch {batch_num} data...")
+            if pending:
+                self.run_batches(pdf_part, config, pending, subject_extractor, on_batch=write_batch)
+        
+        logger.info(f"EXTRACTION SUMMARY: Total {config.item_name}s extracted: {item_count} (written to {output_path})")
+        
+        return {
+            "document_info": document_info,
+            "output_path": output_path,
+            "item_count": item_count
+        }
+    
+    @property
+    def storage_client(self) -> storage.Client:
+        """GCS client for batch prediction input and output, created on first use"""
+        if self._storage_client is None:
+            self._storage_client = storage.Client(project=self.project_id)
+        return self._storage_client
+    
+    def extract_all_content_batch_job(self, pdf_uri: str, config: ExtractionConfig, subject_extractor=None) -> Dict:
+        """
+        Extract all content of a gs:// PDF with one Gemini batch prediction job
+        
+        The overview is still an online call; every extraction batch becomes one line
+        of the job's JSONL input, and each output line is matched back to its batch by prompt.
+        """
+        pdf_part = Part.from_uri(uri=pdf_uri, mime_type="application/pdf")
+        batches, document_info = self.plan_batches(pdf_part, config, subject_extractor)
+        
+        prompts = {
+            self.create_extraction_prompt(config, batch_num, start_num, end_num, subject_extractor): batch_num
+            for batch_num, start_num, end_num in batches
+        }
+        lines = [
+            orjson.dumps({"request": {"contents": [{"role": "user", "parts": [
+                {"file_data": {"mime_type": "application/pdf", "file_uri": pdf_uri}},
+                {"text": prompt}
+            ]}]}})
+            for prompt in prompts
+        ]
+        
+        job_prefix = f"{self.batch_output_uri}/{uuid4().hex}"
+        input_uri = f"{job_prefix}/input.jsonl"
+        bucket_name, input_path = split_gcs_uri(input_uri)
+        self.storage_client.bucket(bucket_name).blob(input_path).upload_from_string(
+            b"\n".join(lines), content_type="application/jsonl"
+        )
+        
+        logger.info(f"Submitting batch prediction job with {len(lines)} requests for {pdf_uri}...")
+        job = BatchPredictionJob.submit(source_model=self.model_name, input_dataset=input_uri,
+                                        output_uri_prefix=f"{job_prefix}/output")
+        while not job.has_ended:
+            time.sleep(BATCH_POLL_SECONDS)
+            job.refresh()
+        
+        batch_items: Dict[int, List[Dict]] = {}
+        if not job.has_succeeded:
+            logger.error(f"Batch prediction job {job.resource_name} failed: {job.error}")
+        else:
+            bucket_name, output_prefix = split_gcs_uri(job.output_location)
+            for blob in self.storage_client.list_blobs(bucket_name, prefix=output_prefix):
+                if not blob.name.endswith('.jsonl'):
+                    continue
+                for line in blob.download_as_bytes().splitlines():
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    parts = record.get('request', {}).get('contents', [{}])[0].get('parts', [])
+                    prompt = next((part['text'] for part in parts if 'text' in part), None)
+                    batch_num = prompts.get(prompt)
+                    if batch_num is None:
+                        continue
                     try:
-                        # Try stripping all backticks and markdown formatting
-                        cleaned_response = re.sub(r'```[\s\S]*?```', '', raw_response)  # Remove all code blocks
-                        cleaned_response = re.sub(r'```[a-z]*\s*', '', cleaned_response) # Remove starting backticks
-                        cleaned_response = re.sub(r'```', '', cleaned_response)  # Remove any remaining backticks
-                        
-                        # Look for JSON-like structure
-                        json_match = re.search(r'({[\s\S]*})', cleaned_response)
-                        if json_match:
-                            try:
-                                recovered_json = json.loads(json_match.group(1))
-                                if f'{config.item_name}s' in recovered_json:
-                                    recovered_items = recovered_json[f'{config.item_name}s']
-                                    all_items.extend(recovered_items)
-                                    logger.info(f"Recovered {len(recovered_items)} {config.item_name}s from batch {batch_num}")
-                                    
-                                    # Show recovered item numbers
-                                    number_field = f'{config.item_name}_number'
-                                    numbers = [item.get(number_field) for item in recovered_items if item.get(number_field)]
-                                    if numbers:
-                                        logger.info(f"Recovered {config.item_name} numbers: {numbers}")
-                                    continue
-                            except json.JSONDecodeError:
-                                pass
-                        
-                        logger.error(f"Could not recover batch {batch_num} data - manual inspection required")
-                    except Exception as e:
-                        logger.error(f"Error during recovery attempt: {e}")
-            else:
-                logger.error(f"Batch {batch_num}: No response received")
+                        text = record['response']['candidates'][0]['content']['parts'][0]['text']
+                    except (KeyError, IndexError, TypeError):
+                        logger.error(f"Batch {batch_num}: No response received ({record.get('status', 'unknown status')})")
+                        continue
+                    batch_items[batch_num] = self.parse_batch_items(text.strip(), config, batch_num)
+        
+        # Merge in batch order so item numbers stay sorted
+        all_items = []
+        for batch_num, _, _ in batches:
+            all_items.extend(batch_items.get(batch_num, []))
         
         logger.info(f"EXTRACTION SUMMARY: Total {config.item_name}s extracted: {len(all_items)}")
         
@@ -346,18 +1151,125 @@ Return JSON only:
             f"{config.item_name}s": all_items
         }
     
-    def process_pdf(self, pdf_path: str, config: ExtractionConfig, subject_extractor=None) -> Optional[Dict]:
-        """Complete workflow using Vertex AI"""
-        logger.info(f"Processing {pdf_path} for {config.content_type} extraction with Vertex AI Gemini 2.5 Pro...")
+    def extract_chunk(self, chunk_data: bytes, config: ExtractionConfig, subject_extractor=None) -> Dict:
+        """Extract one page window of a split PDF, retrying it once if it yields nothing"""
+        pdf_part = self.pdf_part_from_data(chunk_data)
+        
+        result = self.extract_all_content(pdf_part, config, subject_extractor, use_section_range=True)
+        if not result.get(f'{config.item_name}s'):
+            logger.warning("Page window returned no items, retrying it once...")
+            result = self.extract_all_content(pdf_part, config, subject_extractor, use_section_range=True)
+        
+        return result
+    
+    def extract_chunked(self, chunks: List[bytes], config: ExtractionConfig, subject_extractor=None) -> Dict:
+        """
+        Extract page windows in parallel and merge them in page order
+        
+        An item cut across a window boundary is seen by both windows; the longer
+        copy of each item number is kept.
+        """
+        logger.info(f"Extracting {len(chunks)} page windows of {PAGES_PER_REQUEST} pages, {PAGE_CHUNK_WORKERS} at a time...")
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(PAGE_CHUNK_WORKERS, len(chunks)))) as executor:
+            chunk_results = list(executor.map(lambda chunk: self.extract_chunk(chunk, config, subject_extractor), chunks))
+        
+        number_field = f'{config.item_name}_number'
+        merged: Dict[Any, Dict] = {}
+        unnumbered = []
+        for chunk_result in chunk_results:
+            for item in chunk_result.get(f'{config.item_name}s', []):
+                number = item.get(number_field)
+                if number is None:
+                    unnumbered.append(item)
+                elif number not in merged or len(orjson.dumps(item)) > len(orjson.dumps(merged[number])):
+                    merged[number] = item
+        
+        items = list(merged.values()) + unnumbered
+        document_info = dict(chunk_results[0].get('document_info') or {})
+        document_info[f'total_{config.item_name}s'] = len(items)
+        
+        return {
+            "document_info": document_info,
+            f"{config.item_name}s": items
+        }
+    
+    def process_pdf(self, pdf_path: Union[str, bytes, BinaryIO], config: ExtractionConfig,
+                    subject_extractor=None, output_path: Optional[str] = None) -> Optional[Dict]:
+        """
+        Complete workflow using Vertex AI; pdf_path may also be a gs:// URI, raw PDF bytes or a binary file object
+        
+        With PAGES_PER_REQUEST set, local and in-memory PDFs longer than that are split into
+        page windows so each call stays within the context limit and a failure only
+        re-runs its window; gs:// URIs are always sent whole.
+        
+        output_path streams batches to a JSONL file (see extract_all_content); it applies
+        to whole-PDF extraction, while page windows and batch jobs still return their items.
+        """
+        source = pdf_path if isinstance(pdf_path, str) else "in-memory PDF"
+        logger.info(f"Processing {source} for {config.content_type} extraction with Vertex AI Gemini 2.5 Pro...")
+        
+        if self.use_batch_api and isinstance(pdf_path, str) and pdf_path.startswith('gs://'):
+            return self.log_result(self.extract_all_content_batch_job(pdf_path, config, subject_extractor), config)
+        
+        if PAGES_PER_REQUEST > 0 and not (isinstance(pdf_path, str) and pdf_path.startswith('gs://')):
+            try:
+                if isinstance(pdf_path, str):
+                    pdf_path = pathlib.Path(pdf_path).read_bytes()
+                elif not isinstance(pdf_path, bytes):
+                    pdf_path = pdf_path.read()
+                chunks = split_pdf_pages(pdf_path, PAGES_PER_REQUEST)
+            except Exception as e:
+                logger.error(f"Error splitting PDF into page windows: {e}")
+                return None
+            
+            if len(chunks) > 1:
+                return self.log_result(self.extract_chunked(chunks, config, subject_extractor), config)
+        
         pdf_part = self.upload_pdf(pdf_path)
         
         if not pdf_part:
             return None
             
-        result = self.extract_all_content(pdf_part, config, subject_extractor)
+        return self.log_result(self.extract_all_content(pdf_part, config, subject_extractor,
+                                                        output_path=output_path), config)
+    
+    def process_pdf_many(self, pdf_paths: List[str], config: ExtractionConfig, subject_extractor=None,
+                         max_workers: int = 4) -> Dict[str, Optional[Dict]]:
+        """
+        Run process_pdf over several PDFs at once
+        
+        Args:
+            pdf_paths: Local paths or gs:// URIs
+            config: Extraction configuration shared by all PDFs
+            subject_extractor: Optional subject-specific extractor
+            max_workers: PDFs extracted at the same time
+            
+        Returns:
+            Dict mapping each path to its result (None if it failed)
+        """
+        # Threads rather than processes: each document is network-bound, and the Vertex AI
+        # client, rate limiter and response/part caches are shared and not picklable
+        results: Dict[str, Optional[Dict]] = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pdf_paths)))) as executor:
+            futures = {
+                executor.submit(self.process_pdf, pdf_path, config, subject_extractor): pdf_path
+                for pdf_path in pdf_paths
+            }
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    results[pdf_path] = future.result()
+                except Exception as e:
+                    logger.error(f"Error processing {pdf_path}: {e}")
+                    results[pdf_path] = None
         
+        return results
+    
+    def log_result(self, result: Optional[Dict], config: ExtractionConfig) -> Optional[Dict]:
+        """Log the extraction outcome and warn when fewer items came back than expected"""
         if result:
-            item_count = len(result.get(f'{config.item_name}s', []))
+            item_count = result.get('item_count', len(result.get(f'{config.item_name}s', [])))
             logger.info(f"Successfully extracted {item_count} {config.item_name}s using Vertex AI Gemini 2.5 Pro!")
             
             # Check for completeness
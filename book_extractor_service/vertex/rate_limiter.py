@@ -0,0 +1,35 @@
+# Request Rate Limiter Module
+import time
+import threading
+
+class RateLimiter:
+    """
+    Spaces calls evenly so no more than `rps` start per second
+    
+    Shared by every thread calling Vertex AI; each acquire() reserves the next
+    free start time and sleeps until it arrives.
+    """
+    
+    def __init__(self, rps: float):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            rps: Maximum calls started per second (0 or less disables limiting)
+        """
+        self.delay = 1.0 / rps if rps > 0 else 0.0
+        self.lock = threading.Lock()
+        self.next = 0.0
+    
+    def acquire(self) -> None:
+        """Block until the caller may start its call"""
+        if not self.delay:
+            return
+        
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next)
+            self.next = start + self.delay
+        
+        if start > now:
+            time.sleep(start - now)
@@ -0,0 +1,61 @@
+# Gemini Response Cache Module
+import os
+import hashlib
+import tempfile
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Content-addressable disk cache of Gemini response texts
+    
+    Entries are keyed by a hash of (model, PDF identity, prompt), so re-running an
+    extraction on the same PDF with the same prompts costs no Vertex AI calls.
+    """
+    
+    def __init__(self, cache_dir: str):
+        """
+        Initialize the response cache
+        
+        Args:
+            cache_dir: Directory holding one file per cached response
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(*parts: Union[str, bytes]) -> str:
+        """Hash the parts, each prefixed with its 8-byte length so different splits can't collide"""
+        digest = hashlib.sha256()
+        for part in parts:
+            data = part.encode('utf-8') if isinstance(part, str) else part
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response text, or None on a miss"""
+        try:
+            text = (self.cache_dir / f"{key}.txt").read_text(encoding='utf-8')
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        return text
+    
+    def put(self, key: str, text: str) -> None:
+        """Store a response text; written to a temporary file and renamed so readers never see partial entries"""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self.cache_dir / f"{key}.txt")
+        except OSError as e:
+            logger.warning(f"Could not write response cache entry {key}: {e}")
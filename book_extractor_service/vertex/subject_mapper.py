@@ -1,4 +1,6 @@
-from typing import Dict, Type, Any
+import importlib
+from functools import lru_cache
+from typing import Dict, Type, Any, Optional
 from abc import ABC, abstractmethod
 from .extractor import ExtractionConfig
 
@@ -35,176 +37,110 @@ class SubjectExtractor(ABC):
         """Get the subject name"""
         pass
 
-class ComputerApplicationExtractor(SubjectExtractor):
-    """Extractor for Computer Applications subject"""
-    
-    def __init__(self):
-        from .subjects.computer_application.prompt import (
-            get_question_config, get_answer_config, get_question_extraction_prompt,
-            get_answer_extraction_prompt, get_document_overview_prompt, get_subject_name
-        )
-        self._get_question_config = get_question_config
-        self._get_answer_config = get_answer_config
-        self._get_question_extraction_prompt = get_question_extraction_prompt
-        self._get_answer_extraction_prompt = get_answer_extraction_prompt
-        self._get_document_overview_prompt = get_document_overview_prompt
-        self._get_subject_name = get_subject_name
+class ModuleBackedExtractor(SubjectExtractor):
+    """
+    Extractor backed by a subject prompt module
     
-    def get_question_config(self) -> ExtractionConfig:
-        return self._get_question_config()
+    The module (e.g. subjects/math/prompt.py) provides the six functions of the
+    SubjectExtractor interface; it is imported once and each method calls through to it,
+    so adding a subject needs only its prompt module and a subclass naming it.
+    """
     
-    def get_answer_config(self) -> ExtractionConfig:
-        return self._get_answer_config()
+    # Prompt module path relative to this package, set by subclasses
+    module_path: str = ""
     
-    def get_question_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_question_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_answer_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_answer_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_document_overview_prompt(self, content_type: str) -> str:
-        return self._get_document_overview_prompt(content_type)
-    
-    def get_subject_name(self) -> str:
-        return self._get_subject_name()
-
-class MathExtractor(SubjectExtractor):
-    """Extractor for Mathematics subject"""
-    
-    def __init__(self):
-        from .subjects.math.prompt import (
-            get_question_config, get_answer_config, get_question_extraction_prompt,
-            get_answer_extraction_prompt, get_document_overview_prompt, get_subject_name
-        )
-        self._get_question_config = get_question_config
-        self._get_answer_config = get_answer_config
-        self._get_question_extraction_prompt = get_question_extraction_prompt
-        self._get_answer_extraction_prompt = get_answer_extraction_prompt
-        self._get_document_overview_prompt = get_document_overview_prompt
-        self._get_subject_name = get_subject_name
+    def __init__(self, module_path: Optional[str] = None):
+        self._mod = importlib.import_module(module_path or self.module_path, __package__)
     
     def get_question_config(self) -> ExtractionConfig:
-        return self._get_question_config()
+        return self._mod.get_question_config()
     
     def get_answer_config(self) -> ExtractionConfig:
-        return self._get_answer_config()
+        return self._mod.get_answer_config()
     
     def get_question_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_question_extraction_prompt(batch_number, start_num, end_num)
+        return self._mod.get_question_extraction_prompt(batch_number, start_num, end_num)
     
     def get_answer_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_answer_extraction_prompt(batch_number, start_num, end_num)
+        return self._mod.get_answer_extraction_prompt(batch_number, start_num, end_num)
     
     def get_document_overview_prompt(self, content_type: str) -> str:
-        return self._get_document_overview_prompt(content_type)
+        return self._mod.get_document_overview_prompt(content_type)
     
     def get_subject_name(self) -> str:
-        return self._get_subject_name()
+        return self._mod.get_subject_name()
+
+class ComputerApplicationExtractor(ModuleBackedExtractor):
+    """Extractor for Computer Applications subject"""
+    module_path = ".subjects.computer_application.prompt"
 
-class CSBESocialScienceExtractor(SubjectExtractor):
+class MathExtractor(ModuleBackedExtractor):
+    """Extractor for Mathematics subject"""
+    module_path = ".subjects.math.prompt"
+
+class CSBESocialScienceExtractor(ModuleBackedExtractor):
     """Extractor for CSBE Social Science subject"""
-    
-    def __init__(self):
-        from .subjects.csbe_social_science.prompt import (
-            get_question_config, get_answer_config, get_question_extraction_prompt,
-            get_answer_extraction_prompt, get_document_overview_prompt, get_subject_name
-        )
-        self._get_question_config = get_question_config
-        self._get_answer_config = get_answer_config
-        self._get_question_extraction_prompt = get_question_extraction_prompt
-        self._get_answer_extraction_prompt = get_answer_extraction_prompt
-        self._get_document_overview_prompt = get_document_overview_prompt
-        self._get_subject_name = get_subject_name
-    
-    def get_question_config(self) -> ExtractionConfig:
-        return self._get_question_config()
-    
-    def get_answer_config(self) -> ExtractionConfig:
-        return self._get_answer_config()
-    
-    def get_question_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_question_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_answer_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_answer_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_document_overview_prompt(self, content_type: str) -> str:
-        return self._get_document_overview_prompt(content_type)
-    
-    def get_subject_name(self) -> str:
-        return self._get_subject_name()
+    module_path = ".subjects.csbe_social_science.prompt"
 
-class PoliticalScienceExtractor(SubjectExtractor):
+class PoliticalScienceExtractor(ModuleBackedExtractor):
     """Extractor for CBSE Political Science Class 12 subject"""
-    
-    def __init__(self):
-        from .subjects.Political_Science.prompt import (
-            get_question_config, get_answer_config, get_question_extraction_prompt,
-            get_answer_extraction_prompt, get_document_overview_prompt, get_subject_name
-        )
-        self._get_question_config = get_question_config
-        self._get_answer_config = get_answer_config
-        self._get_question_extraction_prompt = get_question_extraction_prompt
-        self._get_answer_extraction_prompt = get_answer_extraction_prompt
-        self._get_document_overview_prompt = get_document_overview_prompt
-        self._get_subject_name = get_subject_name
-    
-    def get_question_config(self) -> ExtractionConfig:
-        return self._get_question_config()
-    
-    def get_answer_config(self) -> ExtractionConfig:
-        return self._get_answer_config()
-    
-    def get_question_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_question_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_answer_extraction_prompt(self, batch_number: int, start_num: int, end_num: int) -> str:
-        return self._get_answer_extraction_prompt(batch_number, start_num, end_num)
-    
-    def get_document_overview_prompt(self, content_type: str) -> str:
-        return self._get_document_overview_prompt(content_type)
-    
-    def get_subject_name(self) -> str:
-        return self._get_subject_name()
+    module_path = ".subjects.Political_Science.prompt"
 
 class SubjectExtractorFactory:
     """Factory class for creating subject-specific extractors"""
     
+    # Canonical subject key -> extractor class
     _extractors: Dict[str, Type[SubjectExtractor]] = {
         "computer_applications": ComputerApplicationExtractor,
-        "computer_application": ComputerApplicationExtractor,
         "math": MathExtractor,
-        "mathematics": MathExtractor,
-        "maths": MathExtractor,
         "csbe_social_science": CSBESocialScienceExtractor,
-        "csbe_socialscience": CSBESocialScienceExtractor,
-        "social_science": CSBESocialScienceExtractor,
-        "socialscience": CSBESocialScienceExtractor,
-        "political_science": PoliticalScienceExtractor,
-        "politicalscience": PoliticalScienceExtractor,
-        "political_science_12": PoliticalScienceExtractor,
-        "cbse_political_science": PoliticalScienceExtractor,
-        "cbse_political_science_12": PoliticalScienceExtractor
+        "political_science": PoliticalScienceExtractor
+    }
+    
+    # Accepted subject names (lowercase) -> canonical key
+    _canonical: Dict[str, str] = {
+        "computer_applications": "computer_applications",
+        "computer_application": "computer_applications",
+        "math": "math",
+        "mathematics": "math",
+        "maths": "math",
+        "csbe_social_science": "csbe_social_science",
+        "csbe_socialscience": "csbe_social_science",
+        "social_science": "csbe_social_science",
+        "socialscience": "csbe_social_science",
+        "political_science": "political_science",
+        "politicalscience": "political_science",
+        "political_science_12": "political_science",
+        "cbse_political_science": "political_science",
+        "cbse_political_science_12": "political_science"
     }
     
+    # Used for subjects that are not registered
+    _default_subject = "computer_applications"
+    
     @classmethod
+    @lru_cache(maxsize=32)
     def get_extractor(cls, subject: str) -> SubjectExtractor:
-        """Get extractor for the specified subject"""
-        subject_lower = subject.lower().strip()
-        
-        if subject_lower not in cls._extractors:
-            # Default to Computer Applications if subject not found
-            return ComputerApplicationExtractor()
-        
-        extractor_class = cls._extractors[subject_lower]
-        return extractor_class()
+        """Get the extractor for the specified subject; all names of a subject share one instance"""
+        key = cls._canonical.get(subject.lower().strip(), cls._default_subject)
+        return cls._create_extractor(key)
+    
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _create_extractor(cls, key: str) -> SubjectExtractor:
+        """Construct the extractor for a canonical subject key, once"""
+        return cls._extractors[key]()
     
     @classmethod
     def get_available_subjects(cls) -> list:
         """Get list of available subjects"""
-        return list(cls._extractors.keys())
+        return list(cls._canonical.keys())
     
     @classmethod
     def register_extractor(cls, subject: str, extractor_class: Type[SubjectExtractor]):
         """Register a new subject extractor"""
-        cls._extractors[subject.lower()] = extractor_class
+        key = subject.lower().strip()
+        cls._canonical[key] = key
+        cls._extractors[key] = extractor_class
+        cls.get_extractor.cache_clear()
+        cls._create_extractor.cache_clear()
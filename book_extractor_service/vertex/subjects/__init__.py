@@ -1 +1,15 @@
 # Subject-specific prompt modules
+
+from types import MappingProxyType
+from typing import Mapping
+
+# Field descriptions every subject words the same way; subject modules reuse these entries
+COMMON_QUESTION_FIELDS: Mapping[str, str] = MappingProxyType({
+    "question_number": "exact question number as it appears in the document",
+    "marks": "exact marks notation as written in the document including brackets, time allocations, or any other details"
+})
+
+COMMON_ANSWER_FIELDS: Mapping[str, str] = MappingProxyType({
+    "answer_number": "exact answer number as it appears in the document",
+    "marks": "exact marks notation as written in the document including distribution, partial marks, or any other details"
+})
@@ -2,8 +2,27 @@
 CSBE Social Science subject-specific prompts and configurations
 """
 
+from types import MappingProxyType
 from typing import Dict
 from ...extractor import ExtractionConfig
+from .. import COMMON_QUESTION_FIELDS, COMMON_ANSWER_FIELDS
+
+# Field descriptions shared by every config built here (read-only)
+_QUESTION_FIELDS = MappingProxyType({
+    "question_number": COMMON_QUESTION_FIELDS["question_number"],
+    "question_text": "complete question text copied word-for-word including all multiple choice options (a), (b), (c), (d) if present, maintaining exact formatting and punctuation",
+    "diagram_explain": "detailed description of any maps, charts, graphs, timelines, or visual elements including all labels, captions, and geographical/historical references, or null if none present",
+    "section": "exact section name as written in the document (Social Science, History, Geography, Civics, Economics, etc.)",
+    "marks": COMMON_QUESTION_FIELDS["marks"]
+})
+
+_ANSWER_FIELDS = MappingProxyType({
+    "answer_number": COMMON_ANSWER_FIELDS["answer_number"],
+    "answer_text": "complete answer copied word-for-word including correct option, full explanation, reasoning, historical/geographical context, and any additional notes exactly as written",
+    "diagram_explain": "detailed description of any maps, charts, graphs, timelines, or visual elements including all labels, captions, and geographical/historical references, or null if none present",
+    "section": "exact section name as written in the document (Social Science, History, Geography, Civics, Economics, etc.)",
+    "marks": COMMON_ANSWER_FIELDS["marks"]
+})
 
 def get_question_config() -> ExtractionConfig:
     """Get configuration for extracting CSBE Social Science questions"""
@@ -12,13 +31,7 @@ def get_question_config() -> ExtractionConfig:
         item_name="question",
         batch_size=8,
         expected_total=35,
-        fields={
-            "question_number": "exact question number as it appears in the document",
-            "question_text": "complete question text copied word-for-word including all multiple choice options (a), (b), (c), (d) if present, maintaining exact formatting and punctuation",
-            "diagram_explain": "detailed description of any maps, charts, graphs, timelines, or visual elements including all labels, captions, and geographical/historical references, or null if none present",
-            "section": "exact section name as written in the document (Social Science, History, Geography, Civics, Economics, etc.)",
-            "marks": "exact marks notation as written in the document including brackets, time allocations, or any other details"
-        }
+        fields=_QUESTION_FIELDS
     )
 
 def get_answer_config() -> ExtractionConfig:
@@ -28,13 +41,7 @@ def get_answer_config() -> ExtractionConfig:
         item_name="answer", 
         batch_size=8,
         expected_total=35,
-        fields={
-            "answer_number": "exact answer number as it appears in the document",
-            "answer_text": "complete answer copied word-for-word including correct option, full explanation, reasoning, historical/geographical context, and any additional notes exactly as written",
-            "diagram_explain": "detailed description of any maps, charts, graphs, timelines, or visual elements including all labels, captions, and geographical/historical references, or null if none present",
-            "section": "exact section name as written in the document (Social Science, History, Geography, Civics, Economics, etc.)",
-            "marks": "exact marks notation as written in the document including distribution, partial marks, or any other details"
-        }
+        fields=_ANSWER_FIELDS
     )
 
 def get_question_extraction_prompt(batch_number: int, start_num: int, end_num: int) -> str:
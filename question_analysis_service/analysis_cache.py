@@ -0,0 +1,201 @@
+"""
+Analysis Cache - Reuses Gemini batch analyses for repeated or near-duplicate questions
+"""
+
+import orjson
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """
+    Two-tier cache in front of the Gemini analysis call
+
+    Tier 0 is an exact match on the SHA-256 of the request text. Tier 1 is an
+    opt-in cosine-similarity lookup over normalized question embeddings, so a batch
+    whose questions are near-duplicates of an earlier batch reuses its analysis.
+    Semantic hits return the earlier batch's text verbatim (including its question
+    numbers), so tier 1 stays off unless a similarity threshold is given.
+    """
+
+    def __init__(self, max_entries: int = 1000, similarity_threshold: Optional[float] = None,
+                 cache_path: Optional[str] = None):
+        """
+        Initialize the analysis cache
+
+        Args:
+            max_entries: Maximum number of cached analyses (least recently used are evicted)
+            similarity_threshold: Minimum cosine similarity for a semantic hit (None disables tier 1)
+            cache_path: Optional local JSON file used to persist the cache between runs
+        """
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.cache_path = Path(cache_path) if cache_path else None
+
+        # key -> {"result": str, "embedding": np.ndarray or None}
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Contiguous (N, D) float32 matrix of cached embeddings and the keys of its rows,
+        # rebuilt lazily after the entries change
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        if self.cache_path:
+            self.load()
+
+    @property
+    def semantic_enabled(self) -> bool:
+        """Whether the cosine-similarity tier is active"""
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Generate the exact-match key for a piece of request text"""
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        """Convert an embedding to a unit-length float32 vector"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    def get_exact(self, text: str) -> Optional[str]:
+        """Look up a cached analysis by exact request text"""
+        key = self.make_key(text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry["result"]
+
+    def get_similar(self, embedding: List[float]) -> Optional[str]:
+        """Look up a cached analysis whose question embedding is close enough"""
+        if not self.semantic_enabled:
+            return None
+
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            if self._matrix is None:
+                self._rebuild_matrix()
+            if not self._matrix_keys:
+                return None
+
+            scores = np.einsum('ij,j->i', self._matrix, query)
+            best = int(np.argmax(scores))
+
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            key = self._matrix_keys[best]
+            self._entries.move_to_end(key)
+            self.semantic_hits += 1
+            logger.debug(f"Semantic cache hit (similarity {scores[best]:.3f})")
+            return self._entries[key]["result"]
+
+    def _rebuild_matrix(self) -> None:
+        """Stack the cached embeddings into one contiguous matrix (caller holds the lock)"""
+        self._matrix_keys = [k for k, e in self._entries.items() if e["embedding"] is not None]
+        if self._matrix_keys:
+            self._matrix = np.ascontiguousarray(
+                np.stack([self._entries[k]["embedding"] for k in self._matrix_keys]), dtype=np.float32
+            )
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+
+    def add(self, text: str, result: str, embedding: Optional[List[float]] = None) -> None:
+        """Store an analysis result for the given request text"""
+        key = self.make_key(text)
+        vector = self._normalize(embedding) if embedding is not None else None
+
+        with self._lock:
+            # Every add follows a lookup that went to Gemini
+            self.misses += 1
+            self._entries[key] = {"result": result, "embedding": vector}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def load(self) -> bool:
+        """Load persisted entries from cache_path"""
+        if not self.cache_path or not self.cache_path.exists():
+            return False
+
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = orjson.loads(f.read())
+
+            with self._lock:
+                for item in data.get("entries", []):
+                    embedding = item.get("embedding")
+                    self._entries[item["key"]] = {
+                        "result": item["result"],
+                        "embedding": np.asarray(embedding, dtype=np.float32) if embedding else None
+                    }
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                self._matrix = None
+
+            logger.info(f"Loaded {len(self._entries)} cached analyses from {self.cache_path}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not load analysis cache from {self.cache_path}: {str(e)}")
+            return False
+
+    def save(self) -> bool:
+        """Persist entries to cache_path"""
+        if not self.cache_path:
+            return False
+
+        try:
+            with self._lock:
+                entries = [
+                    {
+                        "key": key,
+                        "result": entry["result"],
+                        "embedding": entry["embedding"]
+                    }
+                    for key, entry in self._entries.items()
+                ]
+
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Embeddings are written straight from the float32 arrays
+            with open(self.cache_path, 'wb') as f:
+                f.write(orjson.dumps({"entries": entries}, option=orjson.OPT_SERIALIZE_NUMPY))
+
+            logger.info(f"Saved {len(entries)} cached analyses to {self.cache_path}")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not save analysis cache to {self.cache_path}: {str(e)}")
+            return False
+
+    def stats(self) -> dict:
+        """Get hit/miss counters"""
+        return {
+            "entries": len(self._entries),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses
+        }
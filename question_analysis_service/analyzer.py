@@ -5,7 +5,7 @@ Detailed batch analysis for accuracy, then concise final report
 
 import os
 import sys
-import json
+import orjson
 import argparse
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
@@ -17,9 +17,13 @@ import logging
 logger = logging.getLogger(__name__)
 
 class CBSEQuestionAnalyzer:
-    def __init__(self, project_id: str = None, location: str = "us-central1", content_retriever=None):
+    def __init__(self, project_id: str = None, location: str = "us-central1", content_retriever=None,
+                 analysis_cache=None, embedding_fn=None, batch_content_retriever=None):
         self.setup_vertex_ai(project_id, location)
         self.content_retriever = content_retriever  # Function to retrieve relevant content
+        self.batch_content_retriever = batch_content_retriever  # Function to retrieve content for many questions at once
+        self.analysis_cache = analysis_cache  # Optional AnalysisCache in front of Gemini
+        self.embedding_fn = embedding_fn  # Function to embed question text for semantic cache lookups
         
     def setup_vertex_ai(self, project_id: str = None, location: str = "us-central1"):
         """Initialize Vertex AI"""
@@ -45,8 +49,8 @@ class CBSEQuestionAnalyzer:
     def load_json_file(self, file_path):
         """Load and parse JSON file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
             return data
         except Exception as e:
             raise ValueError(f"Error reading {file_path}: {str(e)}")
@@ -94,10 +98,13 @@ class CBSEQuestionAnalyzer:
         relevant_content = ""
         
         for q_data in questions_batch:
-            # Retrieve relevant content for this question if content retriever is available
-            if self.content_retriever:
+            # Use prefetched content, or retrieve relevant content for this question if a retriever is available
+            if 'relevant_content' in q_data or self.content_retriever:
                 try:
-                    content_results = self.content_retriever(q_data['text'], limit=2)
+                    if 'relevant_content' in q_data:
+                        content_results = q_data['relevant_content']
+                    else:
+                        content_results = self.content_retriever(q_data['text'], limit=2)
                     if content_results:
                         relevant_content += f"\n--- RELEVANT CONTENT FOR QUESTION {q_data['number']} ---\n"
                         for i, result in enumerate(content_results, 1):
@@ -233,6 +240,15 @@ REMEMBER: Your job is to catch EVERY possible issue. Be extremely critical and t
 """
         return prompt
 
+    def get_batch_cache_text(self, questions_batch, batch_num, total_batches):
+        """Canonical per-question text of a batch, embedded for semantic cache lookups"""
+        lines = [f"BATCH {batch_num} of {total_batches}"]
+        lines.extend(
+            f"Q{q_data['number']}|{q_data['section']}|{q_data['marks']}|{q_data['text']}|{q_data['diagram_explain'] or ''}"
+            for q_data in questions_batch
+        )
+        return "\n".join(lines)
+
     def analyze_question_batch(self, questions_batch, batch_num, total_batches, verbose=False):
         """Analyze a batch of questions in detail"""
         try:
@@ -245,13 +261,34 @@ REMEMBER: Your job is to catch EVERY possible issue. Be extremely critical and t
             
             prompt = self.create_detailed_batch_prompt(questions_batch, batch_num, total_batches)
             
+            # Check the analysis cache before calling Gemini. The exact tier is keyed on the
+            # rendered prompt, so question numbers, the batch header and the retrieved
+            # content all take part in the key.
+            cache_embedding = None
+            if self.analysis_cache is not None:
+                cached = self.analysis_cache.get_exact(prompt)
+                if cached is None and self.embedding_fn and self.analysis_cache.semantic_enabled:
+                    cache_embedding = self.embedding_fn(
+                        self.get_batch_cache_text(questions_batch, batch_num, total_batches)
+                    )
+                    if cache_embedding:
+                        cached = self.analysis_cache.get_similar(cache_embedding)
+                if cached is not None:
+                    if verbose:
+                        logger.info(f"♻️ Reusing cached analysis for batch {batch_num}")
+                    return cached
+            
             # Use Vertex AI to generate content
             response = self.model.generate_content([prompt])
             
             if not response.text:
                 return f"[ERROR: Empty response for batch {batch_num}]"
             
-            return response.text.strip()
+            result = response.text.strip()
+            if self.analysis_cache is not None:
+                self.analysis_cache.add(prompt, result, cache_embedding)
+            
+            return result
             
         except Exception as e:
             error_msg = f"[ERROR: Failed to analyze batch {batch_num} - {str(e)}]"
@@ -375,6 +412,12 @@ OUTPUT FORMAT (Use Markdown):
             questions, document_info = self.extract_questions_from_json(file_path)
             total_questions = len(questions)
             
+            # Prefetch relevant content for every question in one batched lookup
+            if self.batch_content_retriever and questions:
+                content_results = self.batch_content_retriever([q['text'] for q in questions], limit=2)
+                for q_data, results in zip(questions, content_results):
+                    q_data['relevant_content'] = results
+            
             # Step 2: Create batches for detailed analysis
             batches = self.create_questions_batches(questions, batch_size)
             total_batches = len(batches)
@@ -4,7 +4,8 @@ Processes multiple JSON files in a folder and stores results in Qdrant
 """
 
 import os
-import json
+import orjson
+import asyncio
 import logging
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -12,6 +13,7 @@ from datetime import datetime
 import uuid
 
 from analyzer import CBSEQuestionAnalyzer
+from analysis_cache import AnalysisCache
 from vector_store import VectorStore
 from embedding_generator import EmbeddingGenerator
 import sys
@@ -53,11 +55,23 @@ class BatchQuestionProcessor:
             self.embedding_generator = None
             logger.warning("Qdrant not configured - content retrieval will be disabled")
         
+        # Cache Gemini analyses so repeated question batches skip the model. Persisting the
+        # cache (ANALYSIS_CACHE_PATH) and near-duplicate reuse (ANALYSIS_CACHE_SIMILARITY)
+        # are both opt-in.
+        similarity = os.getenv('ANALYSIS_CACHE_SIMILARITY')
+        self.analysis_cache = AnalysisCache(
+            similarity_threshold=float(similarity) if similarity else None,
+            cache_path=os.getenv('ANALYSIS_CACHE_PATH')
+        )
+        
         # Initialize analyzer with Vertex AI and content retriever
         self.analyzer = CBSEQuestionAnalyzer(
             project_id, 
             location, 
-            content_retriever=self.retrieve_relevant_content if self.vector_store else None
+            content_retriever=self.retrieve_relevant_content if self.vector_store else None,
+            batch_content_retriever=self.retrieve_relevant_content_batch if self.vector_store else None,
+            analysis_cache=self.analysis_cache,
+            embedding_fn=self.embedding_generator.generate_single_embedding if self.embedding_generator else None
         )
         
         # Initialize bucket manager
@@ -105,6 +119,47 @@ class BatchQuestionProcessor:
             logger.error(f"Error retrieving relevant content: {str(e)}")
             return []
     
+    def retrieve_relevant_content_batch(self, question_texts: List[str], limit: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve relevant book content for several questions at once
+        
+        All question embeddings are generated in batched requests and the
+        Qdrant lookups are sent as a single batch search.
+        
+        Args:
+            question_texts: The question texts to find relevant content for
+            limit: Maximum number of relevant passages per question
+            
+        Returns:
+            One list of relevant content passages per question, in the same order
+        """
+        if not self.vector_store or not self.embedding_generator:
+            logger.warning("Vector store not available - skipping content retrieval")
+            return [[] for _ in question_texts]
+        
+        try:
+            embeddings = self.embedding_generator.generate_embeddings(question_texts)
+            if len(embeddings) != len(question_texts):
+                logger.warning("Failed to generate embeddings for questions")
+                return [[] for _ in question_texts]
+            
+            results = self.vector_store.search_similar_batch(
+                collection_name=self.content_collection_name,
+                query_embeddings=embeddings,
+                limit=limit,
+                score_threshold=0.7  # Only return highly relevant content
+            )
+            
+            found = sum(1 for r in results if r)
+            if found:
+                logger.info(f"Retrieved relevant content for {found}/{len(question_texts)} questions")
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error retrieving relevant content: {str(e)}")
+            return [[] for _ in question_texts]
+    
     def process_json_file(self, file_path: str, verbose: bool = False) -> Dict[str, Any]:
         """
         Process a single JSON file and return analysis results
@@ -126,8 +181,8 @@ class BatchQuestionProcessor:
             )
             
             # Load the original JSON to get metadata
-            with open(file_path, 'r', encoding='utf-8') as f:
-                original_data = json.load(f)
+            with open(file_path, 'rb') as f:
+                original_data = orjson.loads(f.read())
             
             # Create analysis result document
             analysis_result = {
@@ -244,10 +299,12 @@ class BatchQuestionProcessor:
                 "results": results
             }
             
+            self.analysis_cache.save()
+            
             # Save summary to file
             summary_path = folder / "batch_analysis_summary.json"
-            with open(summary_path, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            with open(summary_path, 'wb') as f:
+                f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
             
             logger.info(f"✅ Batch processing completed!")
             logger.info(f"📊 Processed: {processed_count}/{len(json_files)} files")
@@ -260,6 +317,104 @@ class BatchQuestionProcessor:
             logger.error(f"❌ Error during batch processing: {str(e)}")
             raise
     
+    def _list_gcs_json_files(self, gcs_folder_path: str) -> List[str]:
+        """List the JSON files in a GCS folder"""
+        gcs_files = self.bucket_manager.list_files_in_folder(gcs_folder_path)
+        return [f for f in gcs_files if f.endswith('.json')]
+    
+    def _prefetch_gcs_files(self, gcs_files: List[str], temp_dir: Path, max_workers: int = 32) -> set:
+        """
+        Download JSON files from GCS in parallel ahead of analysis
+        
+        Args:
+            gcs_files: GCS paths of the JSON files
+            temp_dir: Local temporary directory for the downloads
+            max_workers: Maximum number of parallel downloads
+            
+        Returns:
+            Set of GCS paths that were downloaded successfully
+        """
+        local_paths = [str(temp_dir / Path(gcs_file).name) for gcs_file in gcs_files]
+        downloaded = self.bucket_manager.download_files(gcs_files, local_paths, max_workers=max_workers)
+        return {gcs_file for gcs_file, ok in zip(gcs_files, downloaded) if ok}
+    
+    def _process_gcs_file(self, gcs_file: str, temp_dir: Path, verbose: bool = False,
+                          prefetched: bool = False) -> Dict[str, Any]:
+        """
+        Download a single JSON file from GCS and analyze it
+        
+        Args:
+            gcs_file: GCS path of the JSON file
+            temp_dir: Local temporary directory for the download
+            verbose: Whether to show detailed logging
+            prefetched: Whether the file was already downloaded to temp_dir
+            
+        Returns:
+            Dictionary containing analysis results and metadata
+        """
+        try:
+            # Extract filename from GCS path
+            file_name = Path(gcs_file).name
+            local_file_path = temp_dir / file_name
+            
+            # Download file from GCS unless it was prefetched
+            if not prefetched and not self.bucket_manager.download_file(gcs_file, str(local_file_path)):
+                logger.error(f"❌ Failed to download {gcs_file}")
+                return {
+                    "gcs_source_path": gcs_file,
+                    "file_name": file_name,
+                    "analysis_date": datetime.now().isoformat(),
+                    "error": f"Failed to download {gcs_file}",
+                    "status": "failed"
+                }
+            
+            # Process the file
+            analysis_result = self.process_json_file(str(local_file_path), verbose)
+            analysis_result["gcs_source_path"] = gcs_file
+            
+            # Clean up local file
+            local_file_path.unlink()
+            
+            return analysis_result
+            
+        except Exception as e:
+            logger.error(f"❌ Error processing {gcs_file}: {str(e)}")
+            return {
+                "gcs_source_path": gcs_file,
+                "file_name": Path(gcs_file).name,
+                "analysis_date": datetime.now().isoformat(),
+                "error": str(e),
+                "status": "failed"
+            }
+    
+    def _finalize_gcs_summary(self, gcs_folder_path: str, total_files: int, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the GCS processing summary and save it next to the source files"""
+        processed_count = sum(1 for r in results if r.get("status") == "completed")
+        failed_count = total_files - processed_count
+        
+        # Create summary
+        summary = {
+            "gcs_folder_path": gcs_folder_path,
+            "total_files": total_files,
+            "processed_files": processed_count,
+            "failed_files": failed_count,
+            "processing_date": datetime.now().isoformat(),
+            "results": results
+        }
+        
+        self.analysis_cache.save()
+        
+        # Save summary to GCS
+        summary_gcs_path = f"{gcs_folder_path.rstrip('/')}/analysis_summary.json"
+        self.bucket_manager.upload_json(summary, summary_gcs_path)
+        
+        logger.info(f"✅ GCS batch processing completed!")
+        logger.info(f"📊 Processed: {processed_count}/{total_files} files")
+        logger.info(f"❌ Failed: {failed_count}/{total_files} files")
+        logger.info(f"💾 Summary saved to GCS: gs://{self.bucket_manager.bucket_name}/{summary_gcs_path}")
+        
+        return summary
+    
     def process_gcs_folder(self, 
                           gcs_folder_path: str,
                           local_temp_dir: str = "/tmp/question_analysis",
@@ -290,8 +445,7 @@ class BatchQuestionProcessor:
             temp_dir.mkdir(parents=True, exist_ok=True)
             
             # List files in GCS folder
-            gcs_files = self.bucket_manager.list_files_in_folder(gcs_folder_path)
-            json_files = [f for f in gcs_files if f.endswith('.json')]
+            json_files = self._list_gcs_json_files(gcs_folder_path)
             
             if not json_files:
                 logger.warning(f"No JSON files found in GCS folder: {gcs_folder_path}")
@@ -307,72 +461,108 @@ class BatchQuestionProcessor:
             
             # Note: Qdrant is used for content retrieval, not for storing analysis results
             
-            # Process each file
-            results = []
-            processed_count = 0
-            failed_count = 0
+            # Download all files in parallel, then process each file
+            prefetched = self._prefetch_gcs_files(json_files, temp_dir)
             
+            results = []
             for i, gcs_file in enumerate(json_files, 1):
-                try:
-                    # Extract filename from GCS path
-                    file_name = Path(gcs_file).name
-                    local_file_path = temp_dir / file_name
-                    
-                    logger.info(f"📄 Processing file {i}/{len(json_files)}: {file_name}")
-                    
-                    # Download file from GCS
-                    if not self.bucket_manager.download_file(gcs_file, str(local_file_path)):
-                        logger.error(f"❌ Failed to download {gcs_file}")
-                        failed_count += 1
-                        continue
-                    
-                    # Process the file
-                    analysis_result = self.process_json_file(str(local_file_path), verbose)
-                    analysis_result["gcs_source_path"] = gcs_file
-                    results.append(analysis_result)
-                    
-                    if analysis_result["status"] == "completed":
-                        processed_count += 1
-                    else:
-                        failed_count += 1
-                    
-                    # Clean up local file
-                    local_file_path.unlink()
-                    
-                except Exception as e:
-                    logger.error(f"❌ Error processing {gcs_file}: {str(e)}")
-                    failed_count += 1
-                    results.append({
-                        "gcs_source_path": gcs_file,
-                        "file_name": Path(gcs_file).name,
-                        "analysis_date": datetime.now().isoformat(),
-                        "error": str(e),
-                        "status": "failed"
-                    })
+                logger.info(f"📄 Processing file {i}/{len(json_files)}: {Path(gcs_file).name}")
+                results.append(self._process_gcs_file(gcs_file, temp_dir, verbose, gcs_file in prefetched))
             
-            # Create summary
-            summary = {
-                "gcs_folder_path": gcs_folder_path,
-                "total_files": len(json_files),
-                "processed_files": processed_count,
-                "failed_files": failed_count,
-                "processing_date": datetime.now().isoformat(),
-                "results": results
-            }
+            return self._finalize_gcs_summary(gcs_folder_path, len(json_files), results)
             
-            # Save summary to GCS
-            summary_gcs_path = f"{gcs_folder_path.rstrip('/')}/analysis_summary.json"
-            self.bucket_manager.upload_json(summary, summary_gcs_path)
+        except Exception as e:
+            logger.error(f"❌ Error during GCS batch processing: {str(e)}")
+            raise
+        finally:
+            # Clean up temp directory
+            try:
+                import shutil
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            except:
+                pass
+    
+    async def process_gcs_folder_async(self, 
+                                       gcs_folder_path: str,
+                                       local_temp_dir: str = "/tmp/question_analysis",
+                                       file_pattern: str = "*.json",
+                                       batch_size: int = 5,
+                                       verbose: bool = False,
+                                       concurrency: int = 16) -> Dict[str, Any]:
+        """
+        Process JSON files from a GCS folder concurrently
+        
+        A producer downloads files in parallel chunks into a bounded queue
+        while ``concurrency`` workers analyze them in worker threads, so
+        downloads overlap with Gemini calls and at most a few chunks of
+        files sit on local disk at once.
+        
+        Args:
+            gcs_folder_path: GCS folder path (e.g., "book_ip_sqp/extracted_questions/")
+            local_temp_dir: Local temporary directory for downloads
+            file_pattern: File pattern to match (default: "*.json")
+            batch_size: Number of questions per batch for analysis
+            verbose: Whether to show detailed logging
+            concurrency: Maximum number of files analyzed at the same time
             
-            logger.info(f"✅ GCS batch processing completed!")
-            logger.info(f"📊 Processed: {processed_count}/{len(json_files)} files")
-            logger.info(f"❌ Failed: {failed_count}/{len(json_files)} files")
-            logger.info(f"💾 Summary saved to GCS: gs://{self.bucket_manager.bucket_name}/{summary_gcs_path}")
+        Returns:
+            Dictionary containing processing summary and results
+        """
+        if not self.bucket_manager:
+            raise ValueError("Bucket manager not initialized. Provide GCP project ID and bucket name.")
+        
+        try:
+            logger.info(f"🚀 Starting async GCS batch processing of folder: {gcs_folder_path} (concurrency={concurrency})")
             
-            return summary
+            # Create local temp directory
+            temp_dir = Path(local_temp_dir)
+            temp_dir.mkdir(parents=True, exist_ok=True)
+            
+            # List files in GCS folder
+            json_files = await asyncio.to_thread(self._list_gcs_json_files, gcs_folder_path)
+            
+            if not json_files:
+                logger.warning(f"No JSON files found in GCS folder: {gcs_folder_path}")
+                return {
+                    "gcs_folder_path": gcs_folder_path,
+                    "total_files": 0,
+                    "processed_files": 0,
+                    "failed_files": 0,
+                    "results": []
+                }
+            
+            logger.info(f"📁 Found {len(json_files)} JSON files in GCS folder")
+            
+            concurrency = max(1, concurrency)
+            queue: asyncio.Queue = asyncio.Queue(maxsize=2 * concurrency)
+            results: List[Optional[Dict[str, Any]]] = [None] * len(json_files)
+            
+            async def _producer():
+                # Backpressure: put() waits while the workers are behind
+                for start in range(0, len(json_files), concurrency):
+                    chunk = json_files[start:start + concurrency]
+                    prefetched = await asyncio.to_thread(self._prefetch_gcs_files, chunk, temp_dir)
+                    for offset, gcs_file in enumerate(chunk):
+                        await queue.put((start + offset, gcs_file, gcs_file in prefetched))
+                for _ in range(concurrency):
+                    await queue.put(None)
+            
+            async def _worker():
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        return
+                    index, gcs_file, prefetched = item
+                    logger.info(f"📄 Processing file {index + 1}/{len(json_files)}: {Path(gcs_file).name}")
+                    results[index] = await asyncio.to_thread(self._process_gcs_file, gcs_file, temp_dir,
+                                                             verbose, prefetched)
+            
+            await asyncio.gather(_producer(), *(_worker() for _ in range(concurrency)))
+            
+            return await asyncio.to_thread(self._finalize_gcs_summary, gcs_folder_path, len(json_files), results)
             
         except Exception as e:
-            logger.error(f"❌ Error during GCS batch processing: {str(e)}")
+            logger.error(f"❌ Error during async GCS batch processing: {str(e)}")
             raise
         finally:
             # Clean up temp directory
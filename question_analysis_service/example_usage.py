@@ -6,114 +6,209 @@ Demonstrates how to analyze questions and search results using the existing Qdra
 
 import os
 import sys
-import json
+import asyncio
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+# GCS folder holding the extracted question JSON files
+EXTRACTED_QUESTIONS_FOLDER = "book_ip_sqp/extracted_questions"
+
+def _create_analysis_processor():
+    """Create a batch processor for analysis, or None if the environment is incomplete"""
+    from batch_processor import BatchQuestionProcessor
+    
+    # Get API keys from environment
+    gemini_api_key = os.getenv('GEMINI_API_KEY')
+    qdrant_api_key = os.getenv('QDRANT_API_KEY')
+    
+    if not gemini_api_key:
+        print("❌ Please set GEMINI_API_KEY environment variable")
+        return None
+    
+    if not qdrant_api_key:
+        print("❌ Please set QDRANT_API_KEY environment variable")
+        return None
+    
+    return BatchQuestionProcessor(
+        project_id=os.getenv('GCP_PROJECT_ID', 'book-qc-cf'),
+        qdrant_api_key=qdrant_api_key,
+        qdrant_url=os.getenv('QDRANT_URL'),
+        bucket_name=os.getenv('BUCKET_NAME', 'book-qc-cf-pdf-storage')
+    )
+
+def _print_analysis_summary(summary):
+    """Print the summary returned by a GCS folder run"""
+    print(f"\n📊 Analysis Summary:")
+    print(f"   Total files: {summary['total_files']}")
+    print(f"   Successfully processed: {summary['processed_files']}")
+    print(f"   Failed: {summary['failed_files']}")
+    if summary['total_files']:
+        print(f"   Success rate: {(summary['processed_files']/summary['total_files']*100):.1f}%")
+
 def analyze_extracted_questions():
     """Analyze the extracted questions from the GCS bucket"""
     print("🔍 Analyzing extracted questions from GCS...")
     
     try:
-        from batch_processor import BatchQuestionProcessor
-        
-        # Get API keys from environment
-        gemini_api_key = os.getenv('GEMINI_API_KEY')
-        qdrant_api_key = os.getenv('QDRANT_API_KEY')
-        
-        if not gemini_api_key:
-            print("❌ Please set GEMINI_API_KEY environment variable")
+        processor = _create_analysis_processor()
+        if processor is None:
             return
         
-        if not qdrant_api_key:
-            print("❌ Please set QDRANT_API_KEY environment variable")
-            return
+        print(f"📁 Processing GCS folder: {EXTRACTED_QUESTIONS_FOLDER}")
         
-        # Initialize processor
-        processor = BatchQuestionProcessor(
-            gemini_api_key=gemini_api_key,
-            qdrant_api_key=qdrant_api_key,
-            qdrant_url=os.getenv('QDRANT_URL'),
-            gcp_project_id=os.getenv('GCP_PROJECT_ID', 'book-qc-cf'),
-            bucket_name=os.getenv('BUCKET_NAME', 'book-qc-cf-pdf-storage')
+        summary = processor.process_gcs_folder(
+            gcs_folder_path=EXTRACTED_QUESTIONS_FOLDER,
+            local_temp_dir="/tmp/question_analysis",
+            file_pattern="*.json",
+            batch_size=5,
+            verbose=True
         )
         
-        # Process the extracted questions folder
-        gcs_folder_path = "book_ip_sqp/extracted_questions"
+        _print_analysis_summary(summary)
+        return summary
         
-        print(f"📁 Processing GCS folder: {gcs_folder_path}")
+    except Exception as e:
+        print(f"❌ Error analyzing questions: {str(e)}")
+        return None
+
+async def analyze_extracted_questions_async(concurrency: int = 16, processor=None):
+    """Analyze the extracted questions from the GCS bucket with bounded concurrency"""
+    print(f"🔍 Analyzing extracted questions from GCS (concurrency={concurrency})...")
+    
+    try:
+        if processor is None:
+            processor = _create_analysis_processor()
+        if processor is None:
+            return
         
-        summary = processor.process_gcs_folder(
-            gcs_folder_path=gcs_folder_path,
+        print(f"📁 Processing GCS folder: {EXTRACTED_QUESTIONS_FOLDER}")
+        
+        summary = await processor.process_gcs_folder_async(
+            gcs_folder_path=EXTRACTED_QUESTIONS_FOLDER,
             local_temp_dir="/tmp/question_analysis",
             file_pattern="*.json",
             batch_size=5,
-            verbose=True
+            verbose=True,
+            concurrency=concurrency
         )
         
-        print(f"\n📊 Analysis Summary:")
-        print(f"   Total files: {summary['total_files']}")
-        print(f"   Successfully processed: {summary['processed_files']}")
-        print(f"   Failed: {summary['failed_files']}")
-        print(f"   Success rate: {(summary['processed_files']/summary['total_files']*100):.1f}%")
-        
+        _print_analysis_summary(summary)
         return summary
         
     except Exception as e:
         print(f"❌ Error analyzing questions: {str(e)}")
         return None
 
-def search_analysis_results(query: str, limit: int = 5):
+def _create_search_processor():
+    """Create a batch processor for Qdrant lookups, or None if QDRANT_API_KEY is missing"""
+    from batch_processor import BatchQuestionProcessor
+    
+    # Get API keys
+    qdrant_api_key = os.getenv('QDRANT_API_KEY')
+    
+    if not qdrant_api_key:
+        print("❌ Please set QDRANT_API_KEY environment variable")
+        return None
+    
+    # No bucket needed for search or listing
+    return BatchQuestionProcessor(
+        project_id=os.getenv('GCP_PROJECT_ID', 'book-qc-cf'),
+        qdrant_api_key=qdrant_api_key,
+        qdrant_url=os.getenv('QDRANT_URL')
+    )
+
+def _print_search_results(results):
+    """Print search hits returned by Qdrant"""
+    if not results:
+        print("❌ No results found")
+        return
+    
+    print(f"✅ Found {len(results)} results:")
+    
+    for i, result in enumerate(results, 1):
+        print(f"\n{i}. Score: {result['score']:.3f}")
+        print(f"   File: {result['metadata'].get('file_name', 'Unknown')}")
+        print(f"   Analysis ID: {result['metadata'].get('analysis_id', 'Unknown')}")
+        print(f"   Questions: {result['metadata'].get('total_questions', 'Unknown')}")
+        print(f"   Document: {result['metadata'].get('document_title', 'Unknown')}")
+        print(f"   Content preview: {result['content'][:200]}...")
+
+def _print_collections(collections, infos):
+    """Print collection names with their point counts and status"""
+    print(f"✅ Found {len(collections)} collections:")
+    for collection, info in zip(collections, infos):
+        print(f"   - {collection}")
+        if info:
+            print(f"     Points: {info.get('points_count', 'Unknown')}")
+            print(f"     Status: {info.get('status', 'Unknown')}")
+
+def _chapter_filter(chapter: int = None):
+    """Get the shared Qdrant filter restricting results to one chapter"""
+    if chapter is None:
+        return None
+    from vector_store import build_match_filter
+    return build_match_filter('chapter', chapter)
+
+def search_analysis_results(query: str, limit: int = 5, chapter: int = None):
     """Search analysis results in Qdrant"""
     print(f"\n🔍 Searching for: '{query}'")
     
     try:
-        from batch_processor import BatchQuestionProcessor
-        from embedding_generator import EmbeddingGenerator
-        
-        # Get API keys
-        qdrant_api_key = os.getenv('QDRANT_API_KEY')
-        
-        if not qdrant_api_key:
-            print("❌ Please set QDRANT_API_KEY environment variable")
+        processor = _create_search_processor()
+        if processor is None:
             return
         
-        # Initialize processor
-        processor = BatchQuestionProcessor(
-            gemini_api_key="dummy",  # Not needed for search
-            qdrant_api_key=qdrant_api_key,
-            qdrant_url=os.getenv('QDRANT_URL')
-        )
-        
         # Generate query embedding
-        embedding_gen = EmbeddingGenerator()
-        query_embedding = embedding_gen.generate_embedding(query)
+        query_embedding = processor.embedding_generator.generate_single_embedding(query)
         
         # Search in Qdrant
         results = processor.vector_store.search_similar(
-            collection_name=processor.collection_name,
+            collection_name=processor.content_collection_name,
             query_embedding=query_embedding,
+            query_filter=_chapter_filter(chapter),
             limit=limit,
             score_threshold=0.7
         )
         
-        if not results:
-            print("❌ No results found")
-            return
+        _print_search_results(results)
+        return results or None
         
-        print(f"✅ Found {len(results)} results:")
+    except Exception as e:
+        print(f"❌ Error searching results: {str(e)}")
+        return None
+
+async def search_analysis_results_async(query: str, limit: int = 5, chapter: int = None, processor=None):
+    """Search analysis results in Qdrant using the shared async client (a passed-in processor stays open)"""
+    print(f"\n🔍 Searching for: '{query}'")
+    
+    try:
+        owns_processor = processor is None
+        if owns_processor:
+            processor = _create_search_processor()
+        if processor is None:
+            return
         
-        for i, result in enumerate(results, 1):
-            print(f"\n{i}. Score: {result['score']:.3f}")
-            print(f"   File: {result['metadata'].get('file_name', 'Unknown')}")
-            print(f"   Analysis ID: {result['metadata'].get('analysis_id', 'Unknown')}")
-            print(f"   Questions: {result['metadata'].get('total_questions', 'Unknown')}")
-            print(f"   Document: {result['metadata'].get('document_title', 'Unknown')}")
-            print(f"   Content preview: {result['content'][:200]}...")
+        try:
+            # Embedding generation is a blocking Vertex AI call
+            query_embedding = await asyncio.to_thread(
+                processor.embedding_generator.generate_single_embedding, query
+            )
+            
+            results = await processor.vector_store.search_similar_async(
+                collection_name=processor.content_collection_name,
+                query_embedding=query_embedding,
+                query_filter=_chapter_filter(chapter),
+                limit=limit,
+                score_threshold=0.7
+            )
+        finally:
+            if owns_processor:
+                await processor.vector_store.aclose()
         
-        return results
+        _print_search_results(results)
+        return results or None
         
     except Exception as e:
         print(f"❌ Error searching results: {str(e)}")
@@ -124,35 +219,43 @@ def list_collections():
     print("\n📚 Listing Qdrant collections...")
     
     try:
-        from batch_processor import BatchQuestionProcessor
-        
-        # Get API keys
-        qdrant_api_key = os.getenv('QDRANT_API_KEY')
-        
-        if not qdrant_api_key:
-            print("❌ Please set QDRANT_API_KEY environment variable")
+        processor = _create_search_processor()
+        if processor is None:
             return
         
-        # Initialize processor
-        processor = BatchQuestionProcessor(
-            gemini_api_key="dummy",  # Not needed for listing
-            qdrant_api_key=qdrant_api_key,
-            qdrant_url=os.getenv('QDRANT_URL')
-        )
-        
         # List collections
         collections = processor.vector_store.list_collections()
+        infos = [processor.vector_store.get_collection_info(c) for c in collections]
         
-        print(f"✅ Found {len(collections)} collections:")
-        for collection in collections:
-            print(f"   - {collection}")
-            
-            # Get collection info
-            info = processor.vector_store.get_collection_info(collection)
-            if info:
-                print(f"     Points: {info.get('points_count', 'Unknown')}")
-                print(f"     Status: {info.get('status', 'Unknown')}")
+        _print_collections(collections, infos)
+        return collections
+        
+    except Exception as e:
+        print(f"❌ Error listing collections: {str(e)}")
+        return None
+
+async def list_collections_async(processor=None):
+    """List all collections in Qdrant, fetching collection info concurrently (a passed-in processor stays open)"""
+    print("\n📚 Listing Qdrant collections...")
+    
+    try:
+        owns_processor = processor is None
+        if owns_processor:
+            processor = _create_search_processor()
+        if processor is None:
+            return
+        
+        vector_store = processor.vector_store
+        try:
+            collections = await vector_store.list_collections_async()
+            infos = await asyncio.gather(
+                *(vector_store.get_collection_info_async(c) for c in collections)
+            )
+        finally:
+            if owns_processor:
+                await vector_store.aclose()
         
+        _print_collections(collections, infos)
         return collections
         
     except Exception as e:
@@ -4,10 +4,11 @@ Cloud Run service for analyzing CBSE question papers
 """
 
 import os
-import json
 import logging
 from typing import Dict, Any
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from datetime import datetime
 
 from .batch_processor import BatchQuestionProcessor
@@ -19,7 +20,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+    
+    def loads(self, s, **kwargs) -> Any:
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Global processor instance
 processor = None
@@ -0,0 +1,102 @@
+"""
+Query Cache - Reuses Qdrant search results for repeated or near-identical queries
+"""
+
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class QueryCache:
+    """
+    LRU cache with per-entry expiry for vector search results
+
+    Entries are keyed on a quantized form of the query embedding, so queries
+    whose embeddings round to the same int8 vector share a cached result.
+    Result lists are copied item by item (a shallow dict copy each) on the way in
+    and out, so callers may reorder, extend or set keys on the results they are
+    handed; values nested inside a result dict are shared and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: float = 300, quantization_scale: int = 127):
+        """
+        Initialize the query cache
+
+        Args:
+            max_entries: Maximum number of cached results (least recently used are evicted)
+            ttl_seconds: Seconds a cached result stays valid
+            quantization_scale: Scale applied before rounding embeddings to int8;
+                lower values make matching more tolerant (at most 127)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.quantization_scale = min(quantization_scale, 127)
+
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def embedding_key(self, embedding: List[float]) -> bytes:
+        """Reduce an embedding to an 8-byte key, tolerant to tiny numeric differences"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector = vector / norm
+        quantized = np.round(vector * self.quantization_scale).astype(np.int8)
+        return hashlib.blake2b(quantized.tobytes(), digest_size=8).digest()
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        """Copy a result list and the dicts in it, one level deep; other values are returned as is"""
+        if isinstance(value, list):
+            return [dict(item) if isinstance(item, dict) else item for item in value]
+        return value
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value (see the class docstring for what may be mutated), or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return self._copy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a copy of a value under the given key"""
+        value = self._copy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Get hit/miss counters"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -6,6 +6,7 @@ Demonstrates usage of the service with sample data
 
 import os
 import json
+import time
 import tempfile
 from pathlib import Path
 import sys
@@ -159,6 +160,59 @@ def test_batch_processing():
     except Exception as e:
         print(f"❌ Error in batch processing: {str(e)}")
 
+def test_query_cache():
+    """Test the Qdrant query result cache"""
+    print("\n🧪 Testing Query Cache...")
+    
+    try:
+        from query_cache import QueryCache
+        
+        errors = []
+        
+        cache = QueryCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", [{"id": 1}])
+        cache.put("b", [{"id": 2}])
+        if cache.get("a") != [{"id": 1}]:
+            errors.append("stored result not returned")
+        # "a" was used last, so adding "c" evicts "b"
+        cache.put("c", [{"id": 3}])
+        if cache.get("b") is not None or cache.get("a") is None:
+            errors.append("least recently used entry not evicted")
+        
+        # Changing a returned or stored result must not change the cached one
+        result = cache.get("a")
+        result[0]["id"] = 99
+        result.append({"id": 4})
+        stored = [{"id": 5}]
+        cache.put("d", stored)
+        stored[0]["id"] = 99
+        if cache.get("a") != [{"id": 1}] or cache.get("d") != [{"id": 5}]:
+            errors.append("modifying a result changed the cache")
+        
+        expiring = QueryCache(ttl_seconds=0.05)
+        expiring.put("a", [])
+        time.sleep(0.1)
+        if expiring.get("a") is not None:
+            errors.append("expired entry returned")
+        
+        # Scaling and tiny numeric noise don't change the key; a different direction does
+        embedding = [0.1, -0.4, 0.25, 0.9]
+        key = cache.embedding_key(embedding)
+        if cache.embedding_key([2 * x for x in embedding]) != key:
+            errors.append("scaled embedding got another key")
+        if cache.embedding_key([x + 1e-6 for x in embedding]) != key:
+            errors.append("tiny numeric difference got another key")
+        if cache.embedding_key([0.9, 0.25, -0.4, 0.1]) == key:
+            errors.append("different embedding shares the key")
+        
+        if errors:
+            print(f"❌ Query cache: {errors}")
+        else:
+            print("✅ Query cache hits, evicts and expires as expected")
+            
+    except Exception as e:
+        print(f"❌ Error in query cache test: {str(e)}")
+
 def test_api_endpoints():
     """Test API endpoints (requires running service)"""
     print("\n🧪 Testing API Endpoints...")
@@ -205,6 +259,7 @@ def main():
     print()
     
     # Run tests
+    test_query_cache()
     test_single_file_analysis()
     test_batch_processing()
     test_api_endpoints()
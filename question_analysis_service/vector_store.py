@@ -5,22 +5,51 @@ Vector Store using Qdrant
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 import uuid
-from qdrant_client import QdrantClient
+from functools import lru_cache
+from qdrant_client import QdrantClient, AsyncQdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import Distance, VectorParams, PointStruct
 
+from query_cache import QueryCache
+
 logger = logging.getLogger(__name__)
 
+# Namespace for deterministic point IDs, so re-ingesting a chunk overwrites its point
+POINT_NAMESPACE = uuid.UUID('5b0f6c1e-8d3a-5f47-9e21-4a7c3d2b1f60')
+
+# Quantized copies of the vectors are kept in RAM; rescoring against the
+# original vectors with 2x oversampling keeps recall close to unquantized search
+QUANTIZED_SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
+@lru_cache(maxsize=256)
+def build_match_filter(key: str, value: Any) -> models.Filter:
+    """
+    Build a payload filter matching ``key == value``, reusing it across searches
+    
+    Args:
+        key: Payload field name (e.g. "chapter", "book_name")
+        value: Value the field must match
+        
+    Returns:
+        A Qdrant Filter object; callers must not mutate it
+    """
+    return models.Filter(
+        must=[models.FieldCondition(key=key, match=models.MatchValue(value=value))]
+    )
+
 class VectorStore:
     """Manages vector storage using Qdrant"""
     
-    def __init__(self, api_key: str, url: str = None):
+    def __init__(self, api_key: str, url: str = None, query_cache: Optional[QueryCache] = None):
         """
         Initialize the vector store
         
         Args:
             api_key: Qdrant API key
             url: Qdrant cluster URL (if None, will try to extract from API key)
+            query_cache: Cache for search results (defaults to 1000 entries, 5 minute TTL)
         """
         self.api_key = api_key
         
@@ -43,18 +72,42 @@ class VectorStore:
             logger.error(f"Failed to connect to Qdrant at {url}: {str(e)}")
             raise
         
+        # Async client is created on first use and shared by all async calls
+        self._async_client = None
+        
+        # Repeated searches are served from memory until they expire
+        self.query_cache = query_cache or QueryCache()
+        
         self.embedding_dimension = 768  # text-embedding-004 dimension
         
         # Test connection
         self._test_connection()
     
-    def create_collection(self, collection_name: str, book_name: str) -> bool:
+    @property
+    def async_client(self) -> AsyncQdrantClient:
+        """Shared async Qdrant client (one connection pool per vector store)"""
+        if self._async_client is None:
+            self._async_client = AsyncQdrantClient(
+                url=self.url,
+                api_key=self.api_key,
+                timeout=30
+            )
+        return self._async_client
+    
+    async def aclose(self) -> None:
+        """Close the shared async client, if it was created"""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+    
+    def create_collection(self, collection_name: str, book_name: str, quantization: Optional[str] = "int8") -> bool:
         """
         Create a new collection for a book
         
         Args:
             collection_name: Name of the collection
             book_name: Name of the book
+            quantization: Vector quantization ("int8", "binary" or None for full float32)
             
         Returns:
             True if successful, False otherwise
@@ -74,7 +127,8 @@ class VectorStore:
                 vectors_config=VectorParams(
                     size=self.embedding_dimension,
                     distance=Distance.COSINE
-                )
+                ),
+                quantization_config=self._quantization_config(quantization)
             )
             
             logger.info(f"Created collection {collection_name} for book {book_name}")
@@ -84,6 +138,25 @@ class VectorStore:
             logger.error(f"Error creating collection {collection_name}: {str(e)}")
             return False
     
+    @staticmethod
+    def _quantization_config(quantization: Optional[str]) -> Optional[models.QuantizationConfig]:
+        """Map a quantization name to the Qdrant quantization config"""
+        if quantization is None:
+            return None
+        if quantization == "int8":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        if quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    
     def _test_connection(self) -> bool:
         """Test connection to Qdrant"""
         try:
@@ -95,7 +168,15 @@ class VectorStore:
             logger.error(f"Qdrant connection test failed: {str(e)}")
             return False
     
-    def upsert_chunks(self, collection_name: str, chunks: List[Any], embeddings: List[List[float]]) -> bool:
+    @staticmethod
+    def point_id_for_chunk(chunk: Any) -> str:
+        """Derive a stable point ID from a chunk's book, chapter and content"""
+        book_name = chunk.metadata.get('book_name', '')
+        chapter = chunk.metadata.get('chapter', '')
+        return str(uuid.uuid5(POINT_NAMESPACE, f"{book_name}:{chapter}:{chunk.content}"))
+    
+    def upsert_chunks(self, collection_name: str, chunks: List[Any], embeddings: List[List[float]],
+                      batch_size: int = 100) -> bool:
         """
         Upsert chunks and their embeddings to the collection
         
@@ -103,6 +184,7 @@ class VectorStore:
             collection_name: Name of the collection
             chunks: List of Chunk objects
             embeddings: List of embedding vectors
+            batch_size: Maximum number of points sent per upsert request
             
         Returns:
             True if successful, False otherwise
@@ -115,7 +197,7 @@ class VectorStore:
             # Prepare points for upsert
             points = []
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                point_id = str(uuid.uuid4())
+                point_id = self.point_id_for_chunk(chunk)
                 
                 # Prepare payload with chunk metadata
                 payload = {
@@ -133,11 +215,15 @@ class VectorStore:
                 )
                 points.append(point)
             
-            # Upsert points
-            self.client.upsert(
-                collection_name=collection_name,
-                points=points
-            )
+            # Upsert points in bounded batches
+            for i in range(0, len(points), batch_size):
+                self.client.upsert(
+                    collection_name=collection_name,
+                    points=points[i:i + batch_size]
+                )
+            
+            # Cached searches may no longer reflect the collection
+            self.query_cache.clear()
             
             logger.info(f"Upserted {len(points)} chunks to collection {collection_name}")
             return True
@@ -147,7 +233,8 @@ class VectorStore:
             return False
     
     def search_similar(self, collection_name: str, query_embedding: List[float], 
-                      limit: int = 10, score_threshold: float = 0.7) -> List[Dict[str, Any]]:
+                      limit: int = 10, score_threshold: float = 0.7,
+                      query_filter: Optional[models.Filter] = None) -> List[Dict[str, Any]]:
         """
         Search for similar chunks
         
@@ -156,33 +243,142 @@ class VectorStore:
             query_embedding: Query embedding vector
             limit: Maximum number of results
             score_threshold: Minimum similarity score
+            query_filter: Optional payload filter, e.g. from build_match_filter
             
         Returns:
             List of similar chunks with metadata
         """
+        cache_key = self._search_cache_key(collection_name, query_embedding, limit, score_threshold, query_filter)
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             search_result = self.client.search(
                 collection_name=collection_name,
                 query_vector=query_embedding,
+                search_params=QUANTIZED_SEARCH_PARAMS,
+                query_filter=query_filter,
                 limit=limit,
                 score_threshold=score_threshold
             )
             
-            results = []
-            for hit in search_result:
-                results.append({
-                    "id": hit.id,
-                    "score": hit.score,
-                    "content": hit.payload.get("content", ""),
-                    "metadata": {k: v for k, v in hit.payload.items() if k != "content"}
-                })
+            results = [self._hit_to_result(hit) for hit in search_result]
+            self.query_cache.put(cache_key, results)
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error searching in {collection_name}: {str(e)}")
+            return []
+    
+    def search_similar_batch(self, collection_name: str, query_embeddings: List[List[float]],
+                             limit: int = 10, score_threshold: float = 0.7,
+                             query_filter: Optional[models.Filter] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Search for similar chunks for several query embeddings in one request
+        
+        Args:
+            collection_name: Name of the collection
+            query_embeddings: Query embedding vectors
+            limit: Maximum number of results per query
+            score_threshold: Minimum similarity score
+            query_filter: Optional payload filter applied to every query
             
+        Returns:
+            One list of similar chunks per query embedding, in the same order
+        """
+        if not query_embeddings:
+            return []
+        
+        try:
+            search_results = self.client.search_batch(
+                collection_name=collection_name,
+                requests=[
+                    models.SearchRequest(
+                        vector=embedding,
+                        filter=query_filter,
+                        params=QUANTIZED_SEARCH_PARAMS,
+                        limit=limit,
+                        score_threshold=score_threshold,
+                        with_payload=True
+                    )
+                    for embedding in query_embeddings
+                ]
+            )
+            
+            return [[self._hit_to_result(hit) for hit in hits] for hits in search_results]
+            
+        except Exception as e:
+            logger.error(f"Error batch searching in {collection_name}: {str(e)}")
+            return [[] for _ in query_embeddings]
+    
+    async def search_similar_async(self, collection_name: str, query_embedding: List[float],
+                                   limit: int = 10, score_threshold: float = 0.7,
+                                   query_filter: Optional[models.Filter] = None) -> List[Dict[str, Any]]:
+        """
+        Search for similar chunks using the shared async client
+        
+        Args:
+            collection_name: Name of the collection
+            query_embedding: Query embedding vector
+            limit: Maximum number of results
+            score_threshold: Minimum similarity score
+            query_filter: Optional payload filter, e.g. from build_match_filter
+            
+        Returns:
+            List of similar chunks with metadata
+        """
+        cache_key = self._search_cache_key(collection_name, query_embedding, limit, score_threshold, query_filter)
+        cached = self.query_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            search_result = await self.async_client.search(
+                collection_name=collection_name,
+                query_vector=query_embedding,
+                search_params=QUANTIZED_SEARCH_PARAMS,
+                query_filter=query_filter,
+                limit=limit,
+                score_threshold=score_threshold
+            )
+            
+            results = [self._hit_to_result(hit) for hit in search_result]
+            self.query_cache.put(cache_key, results)
             return results
             
         except Exception as e:
             logger.error(f"Error searching in {collection_name}: {str(e)}")
             return []
     
+    def _search_cache_key(self, collection_name: str, query_embedding: List[float], limit: int,
+                          score_threshold: float, query_filter: Optional[models.Filter]) -> Tuple:
+        """Build the query cache key for a search"""
+        filter_id = repr(query_filter) if query_filter is not None else None
+        return (collection_name, self.query_cache.embedding_key(query_embedding), limit, score_threshold, filter_id)
+    
+    @staticmethod
+    def _hit_to_result(hit) -> Dict[str, Any]:
+        """Convert a Qdrant scored point into a result dictionary"""
+        return {
+            "id": hit.id,
+            "score": hit.score,
+            "content": hit.payload.get("content", ""),
+            "metadata": {k: v for k, v in hit.payload.items() if k != "content"}
+        }
+    
+    @staticmethod
+    def _collection_info_to_dict(collection_name: str, collection_info) -> Dict[str, Any]:
+        """Convert Qdrant collection info into a dictionary"""
+        return {
+            "name": collection_name,
+            "vectors_count": collection_info.vectors_count,
+            "indexed_vectors_count": collection_info.indexed_vectors_count,
+            "points_count": collection_info.points_count,
+            "segments_count": collection_info.segments_count,
+            "status": collection_info.status
+        }
+    
     def get_collection_info(self, collection_name: str) -> Optional[Dict[str, Any]]:
         """
         Get information about a collection
@@ -195,14 +391,24 @@ class VectorStore:
         """
         try:
             collection_info = self.client.get_collection(collection_name)
-            return {
-                "name": collection_name,
-                "vectors_count": collection_info.vectors_count,
-                "indexed_vectors_count": collection_info.indexed_vectors_count,
-                "points_count": collection_info.points_count,
-                "segments_count": collection_info.segments_count,
-                "status": collection_info.status
-            }
+            return self._collection_info_to_dict(collection_name, collection_info)
+        except Exception as e:
+            logger.error(f"Error getting collection info for {collection_name}: {str(e)}")
+            return None
+    
+    async def get_collection_info_async(self, collection_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Get information about a collection using the shared async client
+        
+        Args:
+            collection_name: Name of the collection
+            
+        Returns:
+            Collection information or None if not found
+        """
+        try:
+            collection_info = await self.async_client.get_collection(collection_name)
+            return self._collection_info_to_dict(collection_name, collection_info)
         except Exception as e:
             logger.error(f"Error getting collection info for {collection_name}: {str(e)}")
             return None
@@ -219,6 +425,7 @@ class VectorStore:
         """
         try:
             self.client.delete_collection(collection_name)
+            self.query_cache.clear()
             logger.info(f"Deleted collection {collection_name}")
             return True
         except Exception as e:
@@ -238,3 +445,17 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Error listing collections: {str(e)}")
             return []
+    
+    async def list_collections_async(self) -> List[str]:
+        """
+        List all collections using the shared async client
+        
+        Returns:
+            List of collection names
+        """
+        try:
+            collections = await self.async_client.get_collections()
+            return [col.name for col in collections.collections]
+        except Exception as e:
+            logger.error(f"Error listing collections: {str(e)}")
+            return []
@@ -112,6 +112,31 @@ def process_pdf_to_vector(pdf_path: str, book_name: str, chapter: Optional[int]
                 "step": "chunking"
             }
         
+        collection_name = f"book_{book_name.lower().replace(' ', '_')}"
+        if chapter is not None:
+            collection_name += f"_chapter_{chapter}"
+        
+        # Skip embedding and storage when every chunk is already stored from a previous run
+        existing_ids = set()
+        if vector_store is not None:
+            point_ids = [vector_store.point_id_for_chunk(chunk) for chunk in chunks]
+            existing_ids = vector_store.existing_point_ids(collection_name, point_ids)
+            if existing_ids and existing_ids.issuperset(point_ids):
+                logger.info(f"⏭️ All {len(chunks)} chunks already stored in {collection_name}, skipping embeddings")
+                return {
+                    "status": "success",
+                    "book_name": book_name,
+                    "chapter": chapter,
+                    "chunks_created": len(chunks),
+                    "embeddings_generated": 0,
+                    "embeddings_cached": False,
+                    "embeddings_from_cache": False,
+                    "markdown_gcs_path": gcs_path,
+                    "vector_storage_status": "already_stored",
+                    "collection_info": vector_store.get_collection_info(collection_name),
+                    "vector_store_error": vector_store_error
+                }
+        
         # Step 4: Check embeddings cache first
         logger.info(f"Checking embeddings cache for {len(chunks)} chunks")
         cached_result = embeddings_cache.load_embeddings(book_name, chapter, chunks)
@@ -148,18 +173,21 @@ def process_pdf_to_vector(pdf_path: str, book_name: str, chapter: Optional[int]
         
         if vector_store is not None:
             try:
-                collection_name = f"book_{book_name.lower().replace(' ', '_')}"
-                if chapter is not None:
-                    collection_name += f"_chapter_{chapter}"
-                
                 logger.info(f"🗄️ Creating/updating vector collection: {collection_name}")
                 
                 if vector_store.create_collection(collection_name, book_name):
                     logger.info("✅ Vector collection created successfully")
                     
                     # Store chunks and embeddings
-                    logger.info("📤 Storing chunks and embeddings in vector database")
-                    if vector_store.upsert_chunks(collection_name, chunks, embeddings):
+                    new_points = [
+                        (chunk, embedding) for chunk, embedding in zip(chunks, embeddings)
+                        if vector_store.point_id_for_chunk(chunk) not in existing_ids
+                    ]
+                    logger.info(f"📤 Storing {len(new_points)} new chunks in vector database "
+                                f"({len(chunks) - len(new_points)} already stored)")
+                    new_chunks = [chunk for chunk, _ in new_points]
+                    new_embeddings = [embedding for _, embedding in new_points]
+                    if vector_store.upsert_chunks(collection_name, new_chunks, new_embeddings):
                         logger.info("✅ Chunks stored in vector database successfully")
                         collection_info = vector_store.get_collection_info(collection_name)
                         vector_storage_status = "success"
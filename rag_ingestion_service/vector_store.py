@@ -11,6 +11,15 @@ from qdrant_client.http.models import Distance, VectorParams, PointStruct
 
 logger = logging.getLogger(__name__)
 
+# Namespace for deterministic point IDs, so re-ingesting a chunk overwrites its point
+POINT_NAMESPACE = uuid.UUID('5b0f6c1e-8d3a-5f47-9e21-4a7c3d2b1f60')
+
+# Quantized copies of the vectors are kept in RAM; rescoring against the
+# original vectors with 2x oversampling keeps recall close to unquantized search
+QUANTIZED_SEARCH_PARAMS = models.SearchParams(
+    quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+)
+
 class VectorStore:
     """Manages vector storage using Qdrant"""
     
@@ -48,13 +57,14 @@ class VectorStore:
         # Test connection
         self._test_connection()
     
-    def create_collection(self, collection_name: str, book_name: str) -> bool:
+    def create_collection(self, collection_name: str, book_name: str, quantization: Optional[str] = "int8") -> bool:
         """
         Create a new collection for a book
         
         Args:
             collection_name: Name of the collection
             book_name: Name of the book
+            quantization: Vector quantization ("int8", "binary" or None for full float32)
             
         Returns:
             True if successful, False otherwise
@@ -74,7 +84,8 @@ class VectorStore:
                 vectors_config=VectorParams(
                     size=self.embedding_dimension,
                     distance=Distance.COSINE
-                )
+                ),
+                quantization_config=self._quantization_config(quantization)
             )
             
             logger.info(f"Created collection {collection_name} for book {book_name}")
@@ -84,6 +95,25 @@ class VectorStore:
             logger.error(f"Error creating collection {collection_name}: {str(e)}")
             return False
     
+    @staticmethod
+    def _quantization_config(quantization: Optional[str]) -> Optional[models.QuantizationConfig]:
+        """Map a quantization name to the Qdrant quantization config"""
+        if quantization is None:
+            return None
+        if quantization == "int8":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+        if quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        raise ValueError(f"Unsupported quantization: {quantization}")
+    
     def _test_connection(self) -> bool:
         """Test connection to Qdrant"""
         try:
@@ -95,6 +125,41 @@ class VectorStore:
             logger.error(f"Qdrant connection test failed: {str(e)}")
             return False
     
+    @staticmethod
+    def point_id_for_chunk(chunk: Any) -> str:
+        """Derive a stable point ID from a chunk's book, chapter and content"""
+        book_name = chunk.metadata.get('book_name', '')
+        chapter = chunk.metadata.get('chapter', '')
+        return str(uuid.uuid5(POINT_NAMESPACE, f"{book_name}:{chapter}:{chunk.content}"))
+    
+    def existing_point_ids(self, collection_name: str, point_ids: List[str], batch_size: int = 100) -> set:
+        """
+        Find which of the given point IDs are already stored in a collection
+        
+        Args:
+            collection_name: Name of the collection
+            point_ids: Point IDs to look up
+            batch_size: Maximum number of IDs per retrieve request
+            
+        Returns:
+            Set of IDs present in the collection (empty if the collection does not exist)
+        """
+        existing = set()
+        try:
+            for i in range(0, len(point_ids), batch_size):
+                points = self.client.retrieve(
+                    collection_name=collection_name,
+                    ids=point_ids[i:i + batch_size],
+                    with_payload=False,
+                    with_vectors=False
+                )
+                existing.update(str(point.id) for point in points)
+        except Exception as e:
+            logger.info(f"Could not look up existing points in {collection_name}: {str(e)}")
+            return set()
+        
+        return existing
+    
     def upsert_chunks(self, collection_name: str, chunks: List[Any], embeddings: List[List[float]]) -> bool:
         """
         Upsert chunks and their embeddings to the collection
@@ -115,7 +180,7 @@ class VectorStore:
             # Prepare points for upsert
             points = []
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-                point_id = str(uuid.uuid4())
+                point_id = self.point_id_for_chunk(chunk)
                 
                 # Prepare payload with chunk metadata
                 payload = {
@@ -164,6 +229,7 @@ class VectorStore:
             search_result = self.client.search(
                 collection_name=collection_name,
                 query_vector=query_embedding,
+                search_params=QUANTIZED_SEARCH_PARAMS,
                 limit=limit,
                 score_threshold=score_threshold
             )
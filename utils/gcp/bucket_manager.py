@@ -4,30 +4,113 @@ Handles all bucket operations for PDF processing pipeline
 """
 
 import os
-import json
-from typing import Optional, List, Dict, Any
+import io
+import orjson
+import msgpack
+from typing import Optional, List, Dict, Any, Tuple, Iterator, BinaryIO
 from google.cloud import storage
+from google.cloud.storage import transfer_manager
+from google.cloud.storage.retry import DEFAULT_RETRY
 from google.cloud.exceptions import NotFound
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Same layout as the previous json.dumps(indent=2) output; non-string keys are stringified as json did
+JSON_DUMP_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Formats extraction documents can be stored in: format -> (file extension, content type)
+DOCUMENT_FORMATS = {
+    'json': ('.json', 'application/json'),
+    'msgpack': ('.msgpack', 'application/msgpack'),
+    'ndjson': ('.ndjson', 'application/x-ndjson'),
+}
+
+# Objects requested per list page (the API maximum) and the only object field name listings need,
+# so a folder listing costs one small response per 1000 objects
+LIST_PAGE_SIZE = 1000
+LIST_NAME_FIELDS = 'items(name),nextPageToken'
+
+# Item arrays written one object per line in NDJSON documents; the header line names which one
+NDJSON_ITEM_KEYS = ('questions', 'answers')
+NDJSON_ITEMS_FIELD = 'items_key'
+
+def iter_ndjson(data: Dict[str, Any]) -> Iterator[bytes]:
+    """
+    Serialize a document as NDJSON lines
+    
+    The first line holds every top-level field except the item array, plus
+    NDJSON_ITEMS_FIELD naming that array; each following line is one item.
+    """
+    items_key = next((k for k in NDJSON_ITEM_KEYS if isinstance(data.get(k), list)), None)
+    header = {k: v for k, v in data.items() if k != items_key}
+    header[NDJSON_ITEMS_FIELD] = items_key
+    yield orjson.dumps(header, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    for item in data[items_key] if items_key else ():
+        yield orjson.dumps(item, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+
+def parse_ndjson(payload: bytes) -> Dict[str, Any]:
+    """Rebuild a document written by iter_ndjson"""
+    lines = payload.splitlines()
+    data = orjson.loads(lines[0])
+    items_key = data.pop(NDJSON_ITEMS_FIELD, None)
+    if items_key:
+        data[items_key] = [orjson.loads(line) for line in lines[1:] if line]
+    return data
+
+def serialize_document(data: Any, fmt: str = 'json') -> bytes:
+    """Serialize a document as indented JSON, MessagePack or NDJSON"""
+    if fmt == 'msgpack':
+        return msgpack.packb(data, use_bin_type=True)
+    if fmt == 'ndjson':
+        return b''.join(iter_ndjson(data))
+    return orjson.dumps(data, option=JSON_DUMP_OPTIONS)
+
+# JSON larger than this is sent as a chunked resumable upload instead of one multipart request body
+JSON_UPLOAD_CHUNK_SIZE = 8 << 20
+
 class BucketManager:
     """Manages GCP Cloud Storage bucket operations"""
     
-    def __init__(self, project_id: str, bucket_name: str):
+    def __init__(self, project_id: str, bucket_name: str, pool_size: int = 32):
         """
         Initialize bucket manager
         
         Args:
             project_id: GCP project ID
             bucket_name: Name of the GCS bucket
+            pool_size: HTTP connections kept open to GCS; size it to the number of threads
+                sharing this manager (the requests default of 10 forces reconnects beyond that)
         """
         self.project_id = project_id
         self.bucket_name = bucket_name
         self.client = storage.Client(project=project_id)
+        
+        # Widen the connection pool of the adapter the authorized session already
+        # mounted for https:// (replacing it would drop its mTLS configuration)
+        adapter = self.client._http.get_adapter('https://')
+        adapter.init_poolmanager(pool_size, pool_size, block=adapter._pool_block)
+        
         self.bucket = self.client.bucket(bucket_name)
     
+    def _object_name(self, gcs_path: str) -> Optional[str]:
+        """
+        Get the object name of a relative path or a full gs://bucket/path in this bucket
+        
+        Returns:
+            The path relative to the bucket, or None (logged) if a full path names another bucket
+        """
+        if not gcs_path.startswith('gs://'):
+            return gcs_path
+        
+        parts = gcs_path.split('/', 3)
+        if len(parts) >= 4 and parts[2] == self.bucket_name:
+            return parts[3]
+        
+        logger.error(f"Bucket name in path {gcs_path} doesn't match configured bucket {self.bucket_name}")
+        return None
+    
     def upload_file(self, local_file_path: str, gcs_path: str) -> bool:
         """
         Upload a file to GCS bucket
@@ -60,18 +143,14 @@ class BucketManager:
             bool: True if successful, False otherwise
         """
         try:
-            # Handle full GCS paths (gs://bucket/path)
-            if gcs_path.startswith('gs://'):
-                # Extract the path part after the bucket name
-                parts = gcs_path.split('/', 3)
-                if len(parts) >= 4 and parts[2] == self.bucket_name:
-                    gcs_path = parts[3]  # Get the path after bucket name
-                else:
-                    logger.error(f"Bucket name in path {gcs_path} doesn't match configured bucket {self.bucket_name}")
-                    return False
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return False
             
+            # No chunk_size: one streamed GET written to the file as it arrives, not one request per chunk
             blob = self.bucket.blob(gcs_path)
-            blob.download_to_filename(local_file_path)
+            with open(local_file_path, 'wb') as f:
+                blob.download_to_file(f)
             logger.info(f"Downloaded gs://{self.bucket_name}/{gcs_path} to {local_file_path}")
             return True
         except NotFound:
@@ -81,32 +160,210 @@ class BucketManager:
             logger.error(f"Failed to download {gcs_path}: {str(e)}")
             return False
     
-    def upload_json(self, data: Dict[Any, Any], gcs_path: str) -> bool:
+    def download_to_fileobj(self, gcs_path: str, file_obj: BinaryIO) -> bool:
+        """
+        Download a file from GCS bucket into an open binary file object
+        
+        Args:
+            gcs_path: Source path in GCS bucket (relative path) or full GCS path
+            file_obj: Writable binary file object (e.g. a SpooledTemporaryFile)
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return False
+            
+            blob = self.bucket.blob(gcs_path)
+            blob.download_to_file(file_obj)
+            logger.info(f"Downloaded gs://{self.bucket_name}/{gcs_path} to file object")
+            return True
+        except NotFound:
+            logger.error(f"File not found: gs://{self.bucket_name}/{gcs_path}")
+            return False
+        except Exception as e:
+            logger.error(f"Failed to download {gcs_path}: {str(e)}")
+            return False
+    
+    def download_files(self, gcs_paths: List[str], local_file_paths: List[str], max_workers: int = 32) -> List[bool]:
+        """
+        Download several files from GCS bucket concurrently
+        
+        Args:
+            gcs_paths: Source paths in GCS bucket (relative paths) or full GCS paths
+            local_file_paths: Destination paths for local files, in the same order
+            max_workers: Maximum number of parallel downloads
+            
+        Returns:
+            List[bool]: One success flag per file, in the same order
+        """
+        success = [False] * len(gcs_paths)
+        pairs = []
+        indices = []
+        
+        for i, (gcs_path, local_file_path) in enumerate(zip(gcs_paths, local_file_paths)):
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                continue
+            pairs.append((self.bucket.blob(gcs_path), local_file_path))
+            indices.append(i)
+        
+        if not pairs:
+            return success
+        
+        try:
+            results = transfer_manager.download_many(
+                pairs,
+                max_workers=max_workers,
+                worker_type=transfer_manager.THREAD,
+                raise_exception=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to download {len(pairs)} files: {str(e)}")
+            return success
+        
+        for i, (blob, _), result in zip(indices, pairs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to download gs://{self.bucket_name}/{blob.name}: {str(result)}")
+            else:
+                success[i] = True
+        
+        logger.info(f"Downloaded {sum(success)}/{len(gcs_paths)} files from gs://{self.bucket_name}")
+        return success
+    
+    def download_files_to_memory(self, gcs_paths: List[str], max_workers: int = 16) -> List[Optional[bytes]]:
+        """
+        Download several files from GCS bucket into memory concurrently
+        
+        Args:
+            gcs_paths: Source paths in GCS bucket (relative paths) or full GCS paths
+            max_workers: Maximum number of parallel downloads
+            
+        Returns:
+            List of file contents (None for failed downloads), in the same order
+        """
+        contents: List[Optional[bytes]] = [None] * len(gcs_paths)
+        pairs = []
+        indices = []
+        
+        for i, gcs_path in enumerate(gcs_paths):
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                continue
+            pairs.append((self.bucket.blob(gcs_path), io.BytesIO()))
+            indices.append(i)
+        
+        if not pairs:
+            return contents
+        
+        try:
+            results = transfer_manager.download_many(
+                pairs,
+                max_workers=max_workers,
+                worker_type=transfer_manager.THREAD,
+                raise_exception=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to download {len(pairs)} files: {str(e)}")
+            return contents
+        
+        for i, (blob, buffer), result in zip(indices, pairs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to download gs://{self.bucket_name}/{blob.name}: {str(result)}")
+            else:
+                contents[i] = buffer.getvalue()
+        
+        logger.info(f"Downloaded {sum(c is not None for c in contents)}/{len(gcs_paths)} files from gs://{self.bucket_name}")
+        return contents
+    
+    def upload_json_many(self, items: List[Tuple[Dict[Any, Any], str]], max_workers: int = 16,
+                         fmt: str = 'json') -> List[bool]:
+        """
+        Upload several JSON documents to GCS bucket concurrently
+        
+        Args:
+            items: (data, gcs_path) pairs; paths are relative or full GCS paths
+            max_workers: Maximum number of parallel uploads
+            fmt: Storage format, 'json', 'msgpack' or 'ndjson' (see DOCUMENT_FORMATS)
+            
+        Returns:
+            List[bool]: One success flag per item, in the same order
+        """
+        success = [False] * len(items)
+        pairs = []
+        indices = []
+        
+        for i, (data, gcs_path) in enumerate(items):
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                continue
+            buffer = io.BytesIO(serialize_document(data, fmt))
+            pairs.append((buffer, self.bucket.blob(gcs_path)))
+            indices.append(i)
+        
+        if not pairs:
+            return success
+        
+        try:
+            results = transfer_manager.upload_many(
+                pairs,
+                upload_kwargs={'content_type': DOCUMENT_FORMATS[fmt][1]},
+                max_workers=max_workers,
+                worker_type=transfer_manager.THREAD,
+                raise_exception=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to upload {len(pairs)} JSON files: {str(e)}")
+            return success
+        
+        for i, (_, blob), result in zip(indices, pairs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to upload JSON to gs://{self.bucket_name}/{blob.name}: {str(result)}")
+            else:
+                success[i] = True
+        
+        logger.info(f"Uploaded {sum(success)}/{len(items)} JSON files to gs://{self.bucket_name}")
+        return success
+    
+    def upload_json(self, data: Dict[Any, Any], gcs_path: str, fmt: str = 'json') -> bool:
         """
         Upload JSON data to GCS bucket
         
         Args:
             data: Dictionary to upload as JSON
             gcs_path: Destination path in GCS bucket (relative path) or full GCS path
+            fmt: Storage format, 'json', 'msgpack' or 'ndjson' (see DOCUMENT_FORMATS)
             
         Returns:
             bool: True if successful, False otherwise
         """
         try:
-            # Handle full GCS paths (gs://bucket/path)
-            if gcs_path.startswith('gs://'):
-                # Extract the path part after the bucket name
-                parts = gcs_path.split('/', 3)
-                if len(parts) >= 4 and parts[2] == self.bucket_name:
-                    gcs_path = parts[3]  # Get the path after bucket name
-                else:
-                    logger.error(f"Bucket name in path {gcs_path} doesn't match configured bucket {self.bucket_name}")
-                    return False
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return False
             
-            blob = self.bucket.blob(gcs_path)
-            blob.upload_from_string(
-                json.dumps(data, indent=2),
-                content_type='application/json'
+            if fmt == 'ndjson':
+                # Written line by line, so only one item is serialized at a time
+                blob = self.bucket.blob(gcs_path)
+                with blob.open('wb', chunk_size=JSON_UPLOAD_CHUNK_SIZE,
+                               content_type=DOCUMENT_FORMATS[fmt][1]) as writer:
+                    for line in iter_ndjson(data):
+                        writer.write(line)
+                logger.info(f"Uploaded NDJSON to gs://{self.bucket_name}/{gcs_path}")
+                return True
+            
+            payload = serialize_document(data, fmt)
+            
+            # Large documents are streamed from the serialized bytes in chunks, so the
+            # multipart request never holds a second full copy of the payload
+            chunk_size = JSON_UPLOAD_CHUNK_SIZE if len(payload) > JSON_UPLOAD_CHUNK_SIZE else None
+            blob = self.bucket.blob(gcs_path, chunk_size=chunk_size)
+            blob.upload_from_file(
+                io.BytesIO(payload),
+                size=len(payload),
+                content_type=DOCUMENT_FORMATS[fmt][1]
             )
             logger.info(f"Uploaded JSON to gs://{self.bucket_name}/{gcs_path}")
             return True
@@ -114,30 +371,55 @@ class BucketManager:
             logger.error(f"Failed to upload JSON to {gcs_path}: {str(e)}")
             return False
     
+    def download_bytes(self, gcs_path: str) -> Optional[bytes]:
+        """
+        Download a file from GCS bucket into memory
+        
+        Args:
+            gcs_path: Source path in GCS bucket (relative path) or full GCS path
+            
+        Returns:
+            bytes or None if failed
+        """
+        try:
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return None
+            
+            blob = self.bucket.blob(gcs_path)
+            data = blob.download_as_bytes()
+            logger.info(f"Downloaded gs://{self.bucket_name}/{gcs_path} ({len(data)} bytes)")
+            return data
+        except NotFound:
+            logger.error(f"File not found: gs://{self.bucket_name}/{gcs_path}")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to download {gcs_path}: {str(e)}")
+            return None
+    
     def download_json(self, gcs_path: str) -> Optional[Dict[Any, Any]]:
         """
         Download and parse JSON from GCS bucket
         
         Args:
-            gcs_path: Source path in GCS bucket (relative path) or full GCS path
+            gcs_path: Source path in GCS bucket (relative path) or full GCS path;
+                .msgpack and .ndjson files are decoded from their format
             
         Returns:
             Dict or None if failed
         """
         try:
-            # Handle full GCS paths (gs://bucket/path)
-            if gcs_path.startswith('gs://'):
-                # Extract the path part after the bucket name
-                parts = gcs_path.split('/', 3)
-                if len(parts) >= 4 and parts[2] == self.bucket_name:
-                    gcs_path = parts[3]  # Get the path after bucket name
-                else:
-                    logger.error(f"Bucket name in path {gcs_path} doesn't match configured bucket {self.bucket_name}")
-                    return None
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return None
             
             blob = self.bucket.blob(gcs_path)
-            json_str = blob.download_as_text()
-            data = json.loads(json_str)
+            if gcs_path.endswith(DOCUMENT_FORMATS['msgpack'][0]):
+                data = msgpack.unpackb(blob.download_as_bytes(), raw=False)
+            elif gcs_path.endswith(DOCUMENT_FORMATS['ndjson'][0]):
+                data = parse_ndjson(blob.download_as_bytes())
+            else:
+                data = orjson.loads(blob.download_as_bytes())
             logger.info(f"Downloaded JSON from gs://{self.bucket_name}/{gcs_path}")
             return data
         except NotFound:
@@ -158,7 +440,8 @@ class BucketManager:
             List of file paths
         """
         try:
-            blobs = self.client.list_blobs(self.bucket_name, prefix=prefix)
+            blobs = self.client.list_blobs(self.bucket_name, prefix=prefix, page_size=LIST_PAGE_SIZE,
+                                           fields=LIST_NAME_FIELDS, retry=DEFAULT_RETRY)
             return [blob.name for blob in blobs]
         except Exception as e:
             logger.error(f"Failed to list files with prefix {prefix}: {str(e)}")
@@ -181,6 +464,27 @@ class BucketManager:
             logger.error(f"Failed to check if file exists {gcs_path}: {str(e)}")
             return False
     
+    def get_updated_time(self, gcs_path: str) -> Optional[datetime]:
+        """
+        Get the last modification time of a file in the bucket
+        
+        Args:
+            gcs_path: Path in GCS bucket (relative path) or full GCS path
+            
+        Returns:
+            datetime or None if the file doesn't exist or the lookup failed
+        """
+        try:
+            gcs_path = self._object_name(gcs_path)
+            if gcs_path is None:
+                return None
+            
+            blob = self.bucket.get_blob(gcs_path)
+            return blob.updated if blob else None
+        except Exception as e:
+            logger.error(f"Failed to get metadata for {gcs_path}: {str(e)}")
+            return None
+    
     def delete_file(self, gcs_path: str) -> bool:
         """
         Delete file from bucket
@@ -228,15 +532,9 @@ class BucketManager:
             List[str]: List of file paths in the folder
         """
         try:
-            # Handle full GCS paths (gs://bucket/path)
-            if folder_path.startswith('gs://'):
-                # Extract the path part after the bucket name
-                parts = folder_path.split('/', 3)
-                if len(parts) >= 4 and parts[2] == self.bucket_name:
-                    folder_path = parts[3]  # Get the path after bucket name
-                else:
-                    logger.error(f"Bucket name in path {folder_path} doesn't match configured bucket {self.bucket_name}")
-                    return []
+            folder_path = self._object_name(folder_path)
+            if folder_path is None:
+                return []
             
             # Ensure folder_path doesn't start with slash
             if folder_path.startswith('/'):
@@ -246,23 +544,25 @@ class BucketManager:
             if not folder_path.endswith('/'):
                 folder_path += '/'
             
-            blobs = self.bucket.list_blobs(prefix=folder_path)
+            # Paged listing of names only; filtering happens client side
+            blobs = self.client.list_blobs(self.bucket_name, prefix=folder_path, page_size=LIST_PAGE_SIZE,
+                                           fields=LIST_NAME_FIELDS, retry=DEFAULT_RETRY)
+            extension = file_extension.lower() if file_extension else None
             files = []
             
             for blob in blobs:
+                name = blob.name
+                
                 # Skip if it's a directory (ends with /)
-                if blob.name.endswith('/'):
+                if name.endswith('/'):
                     continue
                 
                 # Apply file extension filter if provided
-                if file_extension and not blob.name.lower().endswith(file_extension.lower()):
+                if extension and not name.lower().endswith(extension):
                     continue
                 
                 # Return full GCS path or relative path based on parameter
-                if return_full_paths:
-                    files.append(f"gs://{self.bucket_name}/{blob.name}")
-                else:
-                    files.append(blob.name)
+                files.append(f"gs://{self.bucket_name}/{name}" if return_full_paths else name)
             
             logger.info(f"Found {len(files)} files in folder gs://{self.bucket_name}/{folder_path}")
             return files